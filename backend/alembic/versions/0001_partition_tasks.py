@@ -0,0 +1,115 @@
+"""partition tasks by created_at
+
+Переводит существующую таблицу tasks на секционирование по диапазонам
+created_at (по месяцам). Для новой БД ничего не делает: таблица создается
+сразу секционированной при старте приложения.
+
+Revision ID: 0001_partition_tasks
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_partition_tasks"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, name, description, priority, status, created_at, "
+    "started_at, completed_at, result, error_message"
+)
+
+
+def _relkind() -> Union[str, None]:
+    return op.get_bind().execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = 'tasks' AND relkind IN ('r', 'p')")
+    ).scalar()
+
+
+def upgrade() -> None:
+    if _relkind() != "r":
+        return
+
+    op.execute("ALTER TABLE tasks RENAME TO tasks_legacy")
+    op.execute("ALTER TABLE tasks_legacy RENAME CONSTRAINT tasks_pkey TO tasks_legacy_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE tasks (
+            id UUID NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            priority taskpriority NOT NULL,
+            status taskstatus NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            started_at TIMESTAMP WITHOUT TIME ZONE,
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            result JSON,
+            error_message TEXT,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE INDEX ix_tasks_created_at ON tasks (created_at)")
+
+    # Секции на весь диапазон существующих данных и три месяца вперед
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month_start DATE;
+            last_month DATE;
+        BEGIN
+            SELECT date_trunc('month', COALESCE(MIN(created_at), now()))::date
+              INTO month_start FROM tasks_legacy;
+            last_month := (date_trunc('month', now()) + interval '3 months')::date;
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)',
+                    'tasks_p' || to_char(month_start, 'YYYYMM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$;
+        """
+    )
+    op.execute("CREATE TABLE IF NOT EXISTS tasks_default PARTITION OF tasks DEFAULT")
+
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_legacy")
+    op.execute("DROP TABLE tasks_legacy")
+
+
+def downgrade() -> None:
+    if _relkind() != "p":
+        return
+
+    op.execute("ALTER TABLE tasks RENAME TO tasks_partitioned")
+    op.execute("ALTER TABLE tasks_partitioned RENAME CONSTRAINT tasks_pkey TO tasks_partitioned_pkey")
+    op.execute("ALTER INDEX ix_tasks_created_at RENAME TO ix_tasks_partitioned_created_at")
+    op.execute(
+        """
+        CREATE TABLE tasks (
+            id UUID NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            priority taskpriority NOT NULL,
+            status taskstatus NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            started_at TIMESTAMP WITHOUT TIME ZONE,
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            result JSON,
+            error_message TEXT
+        )
+        """
+    )
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_partitioned")
+    op.execute("DROP TABLE tasks_partitioned CASCADE")
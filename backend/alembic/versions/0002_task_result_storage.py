@@ -0,0 +1,41 @@
+"""task result storage
+
+Добавляет колонки для результатов, вынесенных во внешнее хранилище.
+
+Revision ID: 0002_task_result_storage
+Revises: 0001_partition_tasks
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_task_result_storage"
+down_revision: Union[str, None] = "0001_partition_tasks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE tasks
+            ADD COLUMN IF NOT EXISTS result_ref VARCHAR(255),
+            ADD COLUMN IF NOT EXISTS result_size BIGINT,
+            ADD COLUMN IF NOT EXISTS result_checksum VARCHAR(64)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE tasks
+            DROP COLUMN IF EXISTS result_checksum,
+            DROP COLUMN IF EXISTS result_size,
+            DROP COLUMN IF EXISTS result_ref
+        """
+    )
@@ -0,0 +1,33 @@
+"""task result jsonb
+
+Переводит колонку result в JSONB и добавляет GIN индекс (jsonb_path_ops)
+для фильтра result_contains (оператор @>). Изменение типа переписывает
+все секции таблицы.
+
+Revision ID: 0003_task_result_jsonb
+Revises: 0002_task_result_storage
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_task_result_jsonb"
+down_revision: Union[str, None] = "0002_task_result_storage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tasks ALTER COLUMN result TYPE JSONB USING result::jsonb")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_result ON tasks USING gin (result jsonb_path_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_result")
+    op.execute("ALTER TABLE tasks ALTER COLUMN result TYPE JSON USING result::json")
@@ -0,0 +1,96 @@
+"""task stats rollups
+
+Создает поминутные агрегаты task_stats и task_latency_stats и заполняет
+их по существующим задачам (по created_at, started_at и completed_at).
+
+Revision ID: 0005_task_stats
+Revises: 0004_task_search_vector
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_task_stats"
+down_revision: Union[str, None] = "0004_task_search_vector"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия backend.repository.stats_repository.latency_bin на SQL (4 корзины на удвоение)
+LATENCY_BIN_SQL = "CASE WHEN {ms} <= 1 THEN 0 ELSE ceil(log(2, ({ms})::numeric) * 4)::smallint END"
+
+
+def _ms(start: str, end: str) -> str:
+    return f"GREATEST(EXTRACT(EPOCH FROM ({end} - {start})) * 1000, 0)"
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_stats (
+            bucket TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            status taskstatus NOT NULL,
+            priority taskpriority NOT NULL,
+            count BIGINT NOT NULL,
+            PRIMARY KEY (bucket, status, priority)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_latency_stats (
+            bucket TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            metric VARCHAR(32) NOT NULL,
+            bin SMALLINT NOT NULL,
+            count BIGINT NOT NULL,
+            PRIMARY KEY (bucket, metric, bin)
+        )
+        """
+    )
+
+    # Исторические переходы восстанавливаются по временным меткам задач
+    op.execute(
+        """
+        INSERT INTO task_stats (bucket, status, priority, count)
+        SELECT bucket, status, priority, count(*) FROM (
+            SELECT date_trunc('minute', created_at) AS bucket, 'NEW'::taskstatus AS status, priority
+              FROM tasks
+            UNION ALL
+            SELECT date_trunc('minute', started_at), 'IN_PROGRESS'::taskstatus, priority
+              FROM tasks WHERE started_at IS NOT NULL
+            UNION ALL
+            SELECT date_trunc('minute', completed_at), status, priority
+              FROM tasks WHERE completed_at IS NOT NULL
+        ) transitions
+        GROUP BY bucket, status, priority
+        ON CONFLICT DO NOTHING
+        """
+    )
+    queue_wait = _ms("created_at", "started_at")
+    run_duration = _ms("started_at", "completed_at")
+    op.execute(
+        f"""
+        INSERT INTO task_latency_stats (bucket, metric, bin, count)
+        SELECT bucket, metric, bin, count(*) FROM (
+            SELECT date_trunc('minute', started_at) AS bucket, 'queue_wait' AS metric,
+                   {LATENCY_BIN_SQL.format(ms=queue_wait)} AS bin
+              FROM tasks WHERE started_at IS NOT NULL
+            UNION ALL
+            SELECT date_trunc('minute', completed_at), 'run_duration',
+                   {LATENCY_BIN_SQL.format(ms=run_duration)}
+              FROM tasks
+             WHERE started_at IS NOT NULL AND completed_at IS NOT NULL
+               AND status IN ('COMPLETED', 'FAILED')
+        ) latencies
+        GROUP BY bucket, metric, bin
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS task_latency_stats")
+    op.execute("DROP TABLE IF EXISTS task_stats")
@@ -0,0 +1,39 @@
+"""scheduled tasks
+
+Добавляет статус SCHEDULED, колонку run_at и частичный индекс по времени
+запуска запланированных задач.
+
+Revision ID: 0007_scheduled_tasks
+Revises: 0006_idempotency_keys
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_scheduled_tasks"
+down_revision: Union[str, None] = "0006_idempotency_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Новое значение enum нельзя использовать в той же транзакции
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE taskstatus ADD VALUE IF NOT EXISTS 'SCHEDULED' AFTER 'NEW'")
+
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS run_at TIMESTAMP WITHOUT TIME ZONE")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_scheduled_run_at ON tasks (run_at) "
+        "WHERE status = 'SCHEDULED'"
+    )
+
+
+def downgrade() -> None:
+    # Значение SCHEDULED остается в типе taskstatus: Postgres не удаляет значения enum
+    op.execute("UPDATE tasks SET status = 'PENDING' WHERE status = 'SCHEDULED'")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_scheduled_run_at")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS run_at")
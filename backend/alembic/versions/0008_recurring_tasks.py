@@ -0,0 +1,46 @@
+"""recurring tasks
+
+Создает таблицу определений повторяющихся задач с расписанием cron.
+
+Revision ID: 0008_recurring_tasks
+Revises: 0007_scheduled_tasks
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_recurring_tasks"
+down_revision: Union[str, None] = "0007_scheduled_tasks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recurring_tasks (
+            id UUID PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            priority taskpriority NOT NULL,
+            cron VARCHAR(100) NOT NULL,
+            jitter_seconds INTEGER NOT NULL,
+            enabled BOOLEAN NOT NULL,
+            next_run_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            last_run_at TIMESTAMP WITHOUT TIME ZONE,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_recurring_tasks_next_run_at "
+        "ON recurring_tasks (next_run_at) WHERE enabled"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS recurring_tasks")
@@ -0,0 +1,45 @@
+"""task dependencies
+
+Добавляет статус WAITING, счетчик незавершенных родителей и таблицу
+зависимостей задач.
+
+Revision ID: 0009_task_dependencies
+Revises: 0008_recurring_tasks
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_task_dependencies"
+down_revision: Union[str, None] = "0008_recurring_tasks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Новое значение enum нельзя использовать в той же транзакции
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE taskstatus ADD VALUE IF NOT EXISTS 'WAITING' AFTER 'SCHEDULED'")
+
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS pending_parents INTEGER NOT NULL DEFAULT 0")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_dependencies (
+            parent_id UUID NOT NULL,
+            child_id UUID NOT NULL,
+            child_created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (parent_id, child_id)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    # Значение WAITING остается в типе taskstatus: Postgres не удаляет значения enum
+    op.execute("UPDATE tasks SET status = 'CANCELLED' WHERE status = 'WAITING'")
+    op.execute("DROP TABLE IF EXISTS task_dependencies")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS pending_parents")
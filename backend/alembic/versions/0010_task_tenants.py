@@ -0,0 +1,31 @@
+"""task tenants
+
+Добавляет арендатора задач и повторяющихся задач.
+
+Revision ID: 0010_task_tenants
+Revises: 0009_task_dependencies
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_task_tenants"
+down_revision: Union[str, None] = "0009_task_dependencies"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS tenant_id VARCHAR(64) NOT NULL DEFAULT 'default'")
+    op.execute(
+        "ALTER TABLE recurring_tasks ADD COLUMN IF NOT EXISTS tenant_id VARCHAR(64) NOT NULL DEFAULT 'default'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE recurring_tasks DROP COLUMN IF EXISTS tenant_id")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS tenant_id")
@@ -0,0 +1,49 @@
+"""task leases
+
+Добавляет аренду задач worker, счетчик попыток и реестр worker.
+
+Revision ID: 0011_task_leases
+Revises: 0010_task_tenants
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_task_leases"
+down_revision: Union[str, None] = "0010_task_tenants"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS lease_owner VARCHAR(128)")
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITHOUT TIME ZONE")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_lease_expires_at ON tasks (lease_expires_at) "
+        "WHERE status = 'IN_PROGRESS'"
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS workers (
+            id VARCHAR(128) PRIMARY KEY,
+            hostname VARCHAR(255) NOT NULL,
+            pid INTEGER NOT NULL,
+            started_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            heartbeat_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            in_flight INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS workers")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_lease_expires_at")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS lease_expires_at")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS lease_owner")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS attempts")
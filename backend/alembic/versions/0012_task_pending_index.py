@@ -0,0 +1,30 @@
+"""task pending index
+
+Добавляет частичный индекс задач в PENDING для подсчета глубины очереди.
+
+Revision ID: 0012_task_pending_index
+Revises: 0011_task_leases
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_task_pending_index"
+down_revision: Union[str, None] = "0011_task_leases"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_pending_created_at ON tasks (created_at) "
+        "WHERE status = 'PENDING'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_pending_created_at")
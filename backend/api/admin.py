@@ -0,0 +1,96 @@
+"""Служебные API маршруты."""
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from backend.config import settings
+from backend.database import get_pool_stats
+from backend.profiler import profiler
+from backend.services.lease_service import WorkerRegistryServiceDep
+from backend.schemas import (
+    ConflictErrorResponse,
+    PoolStatsResponse,
+    ValidationErrorResponse,
+    WorkerResponse,
+)
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+
+
+@router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Снять профиль процесса API",
+    description=(
+        "Включает встроенный сэмплирующий профилировщик на заданное время и возвращает "
+        "агрегированные стеки всех потоков процесса (включая event loop) в формате "
+        "collapsed stacks, совместимом с flamegraph.pl и speedscope.\n\n"
+        "Параметры запроса:\n"
+        "- **seconds** (по умолчанию: 10) — длительность профилирования в секундах.\n\n"
+        "Одновременно может выполняться только одно профилирование."
+    ),
+    responses={
+        200: {
+            "description": "Профиль в формате collapsed stacks",
+            "content": {"text/plain": {}},
+        },
+        409: {
+            "description": "Профилировщик уже запущен",
+            "model": ConflictErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации параметров запроса",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def profile(
+    seconds: int = Query(10, ge=1, le=settings.profiler_max_duration),
+):
+    """Снять профиль процесса API."""
+    profiler.start(seconds)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": 'attachment; filename="api.collapsed"'},
+    )
+
+
+@router.get(
+    "/db/pool",
+    response_model=PoolStatsResponse,
+    summary="Статистика пула соединений БД",
+    description=(
+        "Возвращает текущее состояние пула соединений процесса API: размер пула, "
+        "количество выданных и свободных соединений, overflow, а также количество "
+        "выдач соединений, таймаутов и время ожидания соединения.\n\n"
+        "Используется для подбора DB_POOL_SIZE и DB_MAX_OVERFLOW под число реплик API "
+        "и конкурентность worker."
+    ),
+)
+async def pool_stats():
+    """Получить статистику пула соединений БД."""
+    return get_pool_stats()
+
+
+@router.get(
+    "/workers",
+    response_model=List[WorkerResponse],
+    summary="Реестр worker",
+    description=(
+        "Возвращает работающие worker: те, что прислали heartbeat в пределах "
+        "длительности аренды задач (TASK_LEASE_TTL), с количеством задач в обработке "
+        "на момент последнего heartbeat.\n\n"
+        "Worker обновляет запись вместе с продлением аренды своих задач раз в "
+        "TASK_HEARTBEAT_INTERVAL секунд."
+    ),
+)
+async def list_workers(service: WorkerRegistryServiceDep):
+    """Получить список работающих worker."""
+    return await service.get_live()
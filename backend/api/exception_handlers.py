@@ -1,4 +1,6 @@
 """Обработчики исключений для API."""
+import math
+
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 
@@ -6,6 +8,15 @@ from backend.exceptions import (
     TaskNotFoundError,
     TaskCannotBeCancelledError,
     TaskServiceError,
+    ProfilerAlreadyRunningError,
+    TaskResultUnavailableError,
+    InvalidTaskFilterError,
+    IdempotencyKeyReusedError,
+    InvalidTaskDependencyError,
+    TenantRateLimitedError,
+    QueueOverloadedError,
+    RecurringTaskNotFoundError,
+    InvalidCronExpressionError,
 )
 
 
@@ -28,6 +39,107 @@ async def task_cannot_be_cancelled_handler(
     )
 
 
+async def invalid_task_filter_handler(
+    request: Request,
+    exc: InvalidTaskFilterError,
+) -> JSONResponse:
+    """Обработчик для InvalidTaskFilterError."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+async def profiler_already_running_handler(
+    request: Request,
+    exc: ProfilerAlreadyRunningError,
+) -> JSONResponse:
+    """Обработчик для ProfilerAlreadyRunningError."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc)},
+    )
+
+
+async def task_result_unavailable_handler(
+    request: Request,
+    exc: TaskResultUnavailableError,
+) -> JSONResponse:
+    """Обработчик для TaskResultUnavailableError."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc)},
+    )
+
+
+async def invalid_task_dependency_handler(
+    request: Request,
+    exc: InvalidTaskDependencyError,
+) -> JSONResponse:
+    """Обработчик для InvalidTaskDependencyError."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+async def tenant_rate_limited_handler(
+    request: Request,
+    exc: TenantRateLimitedError,
+) -> JSONResponse:
+    """Обработчик для TenantRateLimitedError."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+async def queue_overloaded_handler(
+    request: Request,
+    exc: QueueOverloadedError,
+) -> JSONResponse:
+    """Обработчик для QueueOverloadedError."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+async def recurring_task_not_found_handler(
+    request: Request,
+    exc: RecurringTaskNotFoundError,
+) -> JSONResponse:
+    """Обработчик для RecurringTaskNotFoundError."""
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={"detail": str(exc)},
+    )
+
+
+async def invalid_cron_expression_handler(
+    request: Request,
+    exc: InvalidCronExpressionError,
+) -> JSONResponse:
+    """Обработчик для InvalidCronExpressionError."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+async def idempotency_key_reused_handler(
+    request: Request,
+    exc: IdempotencyKeyReusedError,
+) -> JSONResponse:
+    """Обработчик для IdempotencyKeyReusedError."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc)},
+    )
+
+
 async def task_service_error_handler(
     request: Request,
     exc: TaskServiceError,
@@ -48,5 +160,14 @@ def register_exception_handlers(app: FastAPI) -> None:
     """
     app.add_exception_handler(TaskNotFoundError, task_not_found_handler)
     app.add_exception_handler(TaskCannotBeCancelledError, task_cannot_be_cancelled_handler)
+    app.add_exception_handler(InvalidTaskFilterError, invalid_task_filter_handler)
+    app.add_exception_handler(ProfilerAlreadyRunningError, profiler_already_running_handler)
+    app.add_exception_handler(TaskResultUnavailableError, task_result_unavailable_handler)
+    app.add_exception_handler(IdempotencyKeyReusedError, idempotency_key_reused_handler)
+    app.add_exception_handler(InvalidTaskDependencyError, invalid_task_dependency_handler)
+    app.add_exception_handler(TenantRateLimitedError, tenant_rate_limited_handler)
+    app.add_exception_handler(QueueOverloadedError, queue_overloaded_handler)
+    app.add_exception_handler(RecurringTaskNotFoundError, recurring_task_not_found_handler)
+    app.add_exception_handler(InvalidCronExpressionError, invalid_cron_expression_handler)
     app.add_exception_handler(TaskServiceError, task_service_error_handler)
 
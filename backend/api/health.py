@@ -0,0 +1,49 @@
+"""Маршруты liveness и readiness проверок."""
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from backend.schemas.health import LivenessResponse, ReadinessResponse
+from backend.services.health_service import health_monitor
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get(
+    "/healthz",
+    response_model=LivenessResponse,
+    summary="Liveness-проверка",
+    description=(
+        "Подтверждает, что процесс API жив и обрабатывает запросы. "
+        "Не обращается к базе данных и брокеру."
+    ),
+)
+async def healthz():
+    """Liveness-проверка."""
+    return LivenessResponse()
+
+
+@router.get(
+    "/readyz",
+    response_model=ReadinessResponse,
+    summary="Readiness-проверка",
+    description=(
+        "Возвращает закэшированное состояние зависимостей: доступность базы данных, "
+        "соединение с RabbitMQ и размер очереди задач. Состояние обновляется в фоне "
+        "(HEALTH_CHECK_INTERVAL), сам запрос не выполняет I/O.\n\n"
+        "Возвращает 503, если зависимость недоступна, очередь превышает "
+        "HEALTH_MAX_QUEUE_BACKLOG или состояние давно не обновлялось."
+    ),
+    responses={
+        200: {"description": "Сервис готов принимать трафик", "model": ReadinessResponse},
+        503: {"description": "Сервис не готов", "model": ReadinessResponse},
+    },
+)
+async def readyz():
+    """Readiness-проверка."""
+    readiness = health_monitor.readiness()
+    if readiness.status != "ready":
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=readiness.model_dump(mode="json"),
+        )
+    return readiness
@@ -0,0 +1,133 @@
+"""API маршруты повторяющихся задач."""
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, status
+
+from backend.services.recurring_service import RecurringTaskServiceDep
+from backend.schemas import (
+    RecurringTaskCreate,
+    RecurringTaskResponse,
+    BadRequestErrorResponse,
+    NotFoundErrorResponse,
+    InternalServerErrorResponse,
+    ValidationErrorResponse,
+)
+
+router = APIRouter(prefix="/api/v1/recurring-tasks", tags=["Recurring tasks"])
+
+
+@router.post(
+    "",
+    response_model=RecurringTaskResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Создать повторяющуюся задачу",
+    description=(
+        "Создает определение задачи, которая запускается по расписанию cron.\n\n"
+        "Параметры запроса:\n"
+        "- **name** (обязательный) — название задачи (1-255 символов).\n"
+        "- **description** (опциональный) — описание задачи.\n"
+        "- **priority** (опциональный) — приоритет задачи: LOW, MEDIUM, HIGH (по умолчанию MEDIUM).\n"
+        "- **cron** (обязательный) — расписание в формате cron из 5 полей в UTC "
+        "(например, `*/15 * * * *`) или алиас `@hourly`, `@daily` и т.п.\n"
+        "- **jitter_seconds** (опциональный) — максимальная случайная задержка запуска "
+        "в секундах (0-3600, по умолчанию 0), чтобы запуски многих задач не совпадали.\n"
+        "- **enabled** (опциональный) — включено ли расписание (по умолчанию true).\n\n"
+        "К каждому времени по расписанию создается обычная задача: она получает статус "
+        "SCHEDULED и отправляется в очередь при наступлении времени запуска с учетом "
+        "задержки. Пропущенные запуски (например, при недоступности worker) не догоняются."
+    ),
+    responses={
+        201: {
+            "description": "Повторяющаяся задача создана",
+            "model": RecurringTaskResponse,
+        },
+        400: {
+            "description": "Некорректное cron-выражение",
+            "model": BadRequestErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации входных данных",
+            "model": ValidationErrorResponse,
+        },
+        500: {
+            "description": "Внутренняя ошибка сервера",
+            "model": InternalServerErrorResponse,
+        },
+    },
+)
+async def create_recurring_task(
+    data: RecurringTaskCreate,
+    service: RecurringTaskServiceDep,
+):
+    """Создать повторяющуюся задачу."""
+    return await service.create(data)
+
+
+@router.get(
+    "",
+    response_model=List[RecurringTaskResponse],
+    summary="Получить список повторяющихся задач",
+    description="Возвращает все определения повторяющихся задач в порядке создания.",
+)
+async def list_recurring_tasks(service: RecurringTaskServiceDep):
+    """Получить список повторяющихся задач."""
+    return await service.get_all()
+
+
+@router.get(
+    "/{recurring_id}",
+    response_model=RecurringTaskResponse,
+    summary="Получить повторяющуюся задачу",
+    description=(
+        "Возвращает определение повторяющейся задачи, включая время следующего "
+        "(next_run_at) и последнего (last_run_at) запуска."
+    ),
+    responses={
+        404: {
+            "description": "Повторяющаяся задача с указанным ID не найдена",
+            "model": NotFoundErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации UUID",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def get_recurring_task(
+    recurring_id: UUID,
+    service: RecurringTaskServiceDep,
+):
+    """Получить повторяющуюся задачу."""
+    return await service.get(recurring_id)
+
+
+@router.delete(
+    "/{recurring_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Удалить повторяющуюся задачу",
+    description=(
+        "Удаляет определение повторяющейся задачи. Новые запуски больше не создаются, "
+        "уже созданные задачи остаются и выполняются."
+    ),
+    responses={
+        204: {
+            "description": "Повторяющаяся задача удалена",
+        },
+        404: {
+            "description": "Повторяющаяся задача с указанным ID не найдена",
+            "model": NotFoundErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации UUID",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def delete_recurring_task(
+    recurring_id: UUID,
+    service: RecurringTaskServiceDep,
+):
+    """Удалить повторяющуюся задачу."""
+    await service.delete(recurring_id)
+    return None
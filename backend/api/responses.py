@@ -0,0 +1,74 @@
+"""Классы ответов API."""
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Sequence
+from uuid import UUID
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+Batches = AsyncIterator[List[Dict[str, Any]]]
+
+
+def _default(value: Any) -> Any:
+    """Сериализация типов, которые orjson не поддерживает напрямую."""
+    # asyncpg возвращает собственный подкласс UUID, который orjson не распознает
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON-ответ через orjson для строк, прочитанных напрямую из БД."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+
+
+async def ndjson_stream(batches: Batches) -> AsyncIterator[bytes]:
+    """
+    Преобразовать пачки строк в NDJSON (одна строка JSON на запись).
+
+    Каждая пачка отдается одним фрагментом ответа.
+    """
+    async for batch in batches:
+        yield b"".join(
+            orjson.dumps(row, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value, default=_default).decode()
+    return value
+
+
+async def csv_stream(batches: Batches, fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """
+    Преобразовать пачки строк в CSV с заголовком.
+
+    Вложенные JSON-значения записываются в ячейку строкой JSON.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[field]) for field in fields] for row in batch)
+        yield buffer.getvalue().encode()
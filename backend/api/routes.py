@@ -1,17 +1,52 @@
 """API маршруты."""
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, status
+from fastapi import (
+    APIRouter,
+    Header,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+
+from backend.config import settings
+from backend.exceptions import InvalidTaskFilterError
 
-from backend.services.task_service import TaskServiceDep
+from backend.api.responses import FastJSONResponse, csv_stream, ndjson_stream
+from backend.models import TaskStatus
+from backend.services.admission_service import admission_controller
+from backend.services.export_service import EXPORT_FIELDS, TaskExportService
+from backend.services.rate_limit import tenant_rate_limiter
+from backend.services.replica_service import replica_router
+from backend.services.stats_service import StatsServiceDep
+from backend.services.task_events_service import (
+    TaskEvent,
+    task_event_hub,
+    task_status_events,
+)
+from backend.services.task_service import ReadTaskServiceDep, TaskServiceDep
 from backend.schemas import (
+    TaskBulkRequest,
+    TaskBulkResponse,
+    TaskBulkStatusRequest,
     TaskCreate,
     TaskResponse,
     TaskStatusResponse,
     TaskListResponse,
+    TaskStatsResponse,
     TaskFilterDepends,
+    TaskExportFilterDepends,
     NotFoundErrorResponse,
     BadRequestErrorResponse,
+    ConflictErrorResponse,
+    TooManyRequestsErrorResponse,
     InternalServerErrorResponse,
     ValidationErrorResponse,
 )
@@ -19,6 +54,35 @@ from backend.schemas import (
 router = APIRouter(prefix="/api/v1/tasks", tags=["Tasks"])
 
 
+def _check_subscription(task_ids: List[UUID]) -> List[UUID]:
+    """Проверить список задач подписки."""
+    task_ids = list(dict.fromkeys(task_ids))
+    if len(task_ids) > settings.task_events_max_task_ids:
+        raise InvalidTaskFilterError(
+            f"Too many task_id values, maximum is {settings.task_events_max_task_ids}"
+        )
+    return task_ids
+
+
+async def _sse_stream(events: AsyncIterator[TaskEvent]) -> AsyncIterator[bytes]:
+    """Преобразовать события в формат text/event-stream."""
+    async for event in events:
+        if event is None:
+            yield b": ping\n\n"
+            continue
+        name, data = event
+        yield f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """Проверить, принимает ли клиент ответ в gzip."""
+    for part in request.headers.get("accept-encoding", "").split(","):
+        encoding, _, params = part.strip().partition(";")
+        if encoding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
 @router.post(
     "",
     response_model=TaskResponse,
@@ -29,19 +93,38 @@ router = APIRouter(prefix="/api/v1/tasks", tags=["Tasks"])
         "Параметры запроса:\n"
         "- **name** (обязательный) — название задачи (1-255 символов).\n"
         "- **description** (опциональный) — описание задачи.\n"
-        "- **priority** (опциональный) — приоритет задачи: LOW, MEDIUM, HIGH (по умолчанию MEDIUM).\n\n"
+        "- **priority** (опциональный) — приоритет задачи: LOW, MEDIUM, HIGH (по умолчанию MEDIUM).\n"
+        "- **tenant_id** (опциональный) — арендатор (клиент) задачи, по умолчанию `default`.\n\n"
         "После создания задача получает статус PENDING и отправляется в очередь RabbitMQ для обработки. "
-        "Если RabbitMQ недоступен, задача останется в статусе PENDING до восстановления соединения."
+        "Если RabbitMQ недоступен, задача останется в статусе PENDING до восстановления соединения.\n\n"
+        "Заголовок **Idempotency-Key** (опциональный) защищает от повторного создания при "
+        "повторе запроса: пока ключ действует (IDEMPOTENCY_KEY_TTL), запрос с тем же ключом "
+        "и телом возвращает исходную задачу с заголовком `Idempotent-Replayed: true`, "
+        "не создавая новую и не отправляя её в очередь. Такой повтор не учитывается в лимитах "
+        "ниже и не получает 429.\n\n"
+        "Частота создания задач ограничена для каждого арендатора (TENANT_RATE_LIMIT, "
+        "TENANT_RATE_BURST): при превышении возвращается 429 с заголовком `Retry-After`.\n\n"
+        "При перегрузке очереди (глубина больше ADMISSION_MAX_QUEUE_DEPTH или ожидаемое время "
+        "ожидания больше ADMISSION_MAX_QUEUE_WAIT) задачи не принимаются: возвращается 429 "
+        "с заголовком `Retry-After` — оценкой времени, за которое worker разберут очередь."
     ),
     responses={
         201: {
-            "description": "Задача успешно создана",
+            "description": "Задача успешно создана (или возвращена исходная задача по ключу идемпотентности)",
             "model": TaskResponse,
         },
+        409: {
+            "description": "Ключ идемпотентности уже использован с другим телом запроса",
+            "model": ConflictErrorResponse,
+        },
         422: {
             "description": "Ошибка валидации входных данных",
             "model": ValidationErrorResponse,
         },
+        429: {
+            "description": "Превышен лимит частоты создания задач арендатора или очередь перегружена",
+            "model": TooManyRequestsErrorResponse,
+        },
         500: {
             "description": "Внутренняя ошибка сервера",
             "model": InternalServerErrorResponse,
@@ -51,14 +134,32 @@ router = APIRouter(prefix="/api/v1/tasks", tags=["Tasks"])
 async def create_task(
     task_data: TaskCreate,
     service: TaskServiceDep,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
 ):
     """Создать новую задачу."""
-    return await service.create_task(task_data)
+    if idempotency_key is not None:
+        replay = await service.find_replay(task_data, idempotency_key)
+        if replay is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return replay
+    
+    # Лимиты применяются только к запросам, которые создают задачу
+    admission_controller.check()
+    tenant_rate_limiter.check(task_data.tenant_id)
+    if idempotency_key is None:
+        return await service.create_task(task_data)
+    
+    task, created = await service.create_task_once(task_data, idempotency_key)
+    if not created:
+        response.headers["Idempotent-Replayed"] = "true"
+    return task
 
 
 @router.get(
     "",
     response_model=TaskListResponse,
+    response_class=FastJSONResponse,
     summary="Получить список задач",
     description=(
         "Возвращает список задач с возможностью фильтрации и пагинации.\n\n"
@@ -66,7 +167,13 @@ async def create_task(
         "- **status** (опциональный) — фильтр по статусу: NEW, PENDING, IN_PROGRESS, COMPLETED, FAILED, CANCELLED.\n"
         "- **priority** (опциональный) — фильтр по приоритету: LOW, MEDIUM, HIGH.\n"
         "- **created_from** (опциональный) — фильтр по дате создания (от), формат ISO 8601.\n"
-        "- **created_to** (опциональный) — фильтр по дате создания (до), формат ISO 8601.\n\n"
+        "- **created_to** (опциональный) — фильтр по дате создания (до), формат ISO 8601.\n"
+        "- **result_contains** (опциональный) — JSON-объект, который должен входить в результат "
+        "задачи (оператор `@>`), например `{\"status\": \"partial\"}`. Результаты, вынесенные "
+        "во внешнее хранилище, по этому фильтру не находятся.\n"
+        "- **q** (опциональный) — полнотекстовый поиск по названию и описанию "
+        "(синтаксис веб-поиска: `\"точная фраза\"`, `or`, `-исключить`). "
+        "Результаты сортируются по релевантности.\n\n"
         "Параметры пагинации:\n"
         "- **page** (по умолчанию: 1) — номер страницы (минимум 1).\n"
         "- **page_size** (по умолчанию: 10) — количество задач на странице (от 1 до 100).\n\n"
@@ -77,6 +184,10 @@ async def create_task(
             "description": "Список задач успешно получен",
             "model": TaskListResponse,
         },
+        400: {
+            "description": "Некорректный фильтр result_contains",
+            "model": BadRequestErrorResponse,
+        },
         422: {
             "description": "Ошибка валидации параметров запроса",
             "model": ValidationErrorResponse,
@@ -88,18 +199,199 @@ async def create_task(
     },
 )
 async def get_tasks(
-    service: TaskServiceDep,
+    service: ReadTaskServiceDep,
     filters: TaskFilterDepends,
 ):
     """Получить список задач с фильтрацией и пагинацией."""
-    return await service.get_tasks(
+    page = await service.get_tasks_page(
         status=filters.status,
         priority=filters.priority,
         created_from=filters.created_from,
         created_to=filters.created_to,
+        result_contains=filters.result_filter(),
+        q=filters.q,
         page=filters.page,
         page_size=filters.page_size,
     )
+    return FastJSONResponse(page)
+
+
+@router.get(
+    "/export",
+    summary="Выгрузить задачи",
+    description=(
+        "Потоково выгружает все задачи, подходящие под фильтры, в формате NDJSON или CSV.\n\n"
+        "Параметры фильтрации те же, что у списка задач: **status**, **priority**, "
+        "**created_from**, **created_to**, **result_contains**, **q**.\n\n"
+        "Параметры выгрузки:\n"
+        "- **format** (по умолчанию: ndjson) — `ndjson` (одна задача JSON на строку) или `csv`.\n\n"
+        "Строки читаются из БД через серверный курсор пачками, без пагинации и подсчета "
+        "общего количества, поэтому память сервера не зависит от размера выгрузки. "
+        "Порядок строк такой же, как у списка задач."
+    ),
+    responses={
+        200: {
+            "description": "Поток задач",
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+        },
+        400: {
+            "description": "Некорректный фильтр result_contains",
+            "model": BadRequestErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации параметров запроса",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def export_tasks(
+    filters: TaskExportFilterDepends,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    """Выгрузить задачи в NDJSON или CSV."""
+    batches = TaskExportService(session_factory=replica_router.session_factory()).stream_batches(
+        status=filters.status,
+        priority=filters.priority,
+        created_from=filters.created_from,
+        created_to=filters.created_to,
+        result_contains=filters.result_filter(),
+        q=filters.q,
+    )
+    
+    if export_format == "csv":
+        return StreamingResponse(
+            csv_stream(batches, EXPORT_FIELDS),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="tasks.csv"'},
+        )
+    return StreamingResponse(
+        ndjson_stream(batches),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'},
+    )
+
+
+@router.get(
+    "/stats",
+    response_model=TaskStatsResponse,
+    summary="Получить статистику задач",
+    description=(
+        "Возвращает статистику задач за окно времени по поминутным агрегатам, "
+        "которые обновляются при каждой смене статуса задачи.\n\n"
+        "Параметры запроса:\n"
+        "- **from** (опциональный) — начало окна, формат ISO 8601 (по умолчанию: час назад).\n"
+        "- **to** (опциональный) — конец окна, формат ISO 8601 (по умолчанию: сейчас).\n\n"
+        "Ответ содержит количество переходов в каждый статус по приоритетам, количество "
+        "завершенных и проваленных задач по минутам и перцентили p50/p95/p99 времени ожидания "
+        "в очереди и времени выполнения в миллисекундах (оценка по логарифмической гистограмме, "
+        "погрешность до ~19%). Таблица задач при этом не сканируется."
+    ),
+    responses={
+        200: {
+            "description": "Статистика успешно получена",
+            "model": TaskStatsResponse,
+        },
+        400: {
+            "description": "Начало окна не раньше конца",
+            "model": BadRequestErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации параметров запроса",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def get_task_stats(
+    service: StatsServiceDep,
+    window_from: Optional[datetime] = Query(None, alias="from"),
+    window_to: Optional[datetime] = Query(None, alias="to"),
+):
+    """Получить статистику задач за окно времени."""
+    return await service.get_stats(window_from=window_from, window_to=window_to)
+
+
+@router.get(
+    "/events",
+    summary="Подписаться на статусы задач (SSE)",
+    description=(
+        "Открывает поток Server-Sent Events со статусами указанных задач вместо опроса "
+        "`GET /{task_id}/status`.\n\n"
+        "Параметры запроса:\n"
+        "- **task_id** (обязательный, можно несколько) — UUID задач.\n\n"
+        "Сначала для каждой задачи отправляется текущий статус (событие `status`, данные как у "
+        "`/status`) или событие `not_found`, затем — каждая смена статуса. Раз в "
+        "TASK_EVENTS_HEARTBEAT_INTERVAL секунд отправляется комментарий `: ping`. "
+        "Поток закрывается, когда все задачи пришли в конечный статус "
+        "(COMPLETED, FAILED, CANCELLED)."
+    ),
+    responses={
+        200: {
+            "description": "Поток событий",
+            "content": {"text/event-stream": {}},
+        },
+        400: {
+            "description": "Слишком много задач в подписке",
+            "model": BadRequestErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации UUID",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def task_events_sse(
+    task_id: List[UUID] = Query(...),
+):
+    """Подписаться на статусы задач через SSE."""
+    task_ids = _check_subscription(task_id)
+    events = task_status_events(
+        task_event_hub,
+        task_ids,
+        settings.task_events_heartbeat_interval,
+    )
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/events/ws")
+async def task_events_ws(
+    websocket: WebSocket,
+    task_id: List[UUID] = Query(...),
+):
+    """
+    Подписаться на статусы задач через WebSocket.
+    
+    Сообщения — JSON вида {"event": "status" | "not_found" | "ping", "data": {...}},
+    те же события, что и в SSE. Соединение закрывается сервером, когда все
+    задачи пришли в конечный статус.
+    """
+    try:
+        task_ids = _check_subscription(task_id)
+    except InvalidTaskFilterError:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    events = task_status_events(
+        task_event_hub,
+        task_ids,
+        settings.task_events_heartbeat_interval,
+    )
+    try:
+        async for event in events:
+            if event is None:
+                await websocket.send_json({"event": "ping"})
+                continue
+            name, data = event
+            await websocket.send_json({"event": name, "data": data})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await events.aclose()
 
 
 @router.get(
@@ -137,6 +429,7 @@ async def get_task(
     service: TaskServiceDep,
 ):
     """Получить информацию о задаче."""
+    # Чтение после записи (отмена, завершение): только основная БД
     return await service.get_task_by_id(task_id)
 
 
@@ -176,9 +469,89 @@ async def get_task_status(
     service: TaskServiceDep,
 ):
     """Получить статус задачи."""
+    # Чтение после записи (отмена, завершение): только основная БД
     return await service.get_task_by_id(task_id)
 
 
+@router.get(
+    "/{task_id}/result",
+    summary="Получить результат задачи",
+    description=(
+        "Возвращает результат выполнения задачи.\n\n"
+        "Параметры пути:\n"
+        "- **task_id** (обязательный) — UUID задачи.\n\n"
+        "Крупные результаты хранятся сжатыми во внешнем хранилище и отдаются потоком. "
+        "Если клиент передает `Accept-Encoding: gzip`, результат отдается без распаковки "
+        "с заголовком `Content-Encoding: gzip`. Заголовок `ETag` содержит SHA-256 результата.\n\n"
+        "Параметры запроса:\n"
+        "- **wait** (по умолчанию: 0) — сколько секунд ждать завершения задачи (long-poll; "
+        "значения больше RESULT_MAX_WAIT ограничиваются им). Запрос возвращается сразу после "
+        "завершения задачи, без опроса БД. При выключенных событиях статусов "
+        "(TASK_EVENTS_ENABLED=false) ожидания нет: возвращается текущее состояние задачи.\n\n"
+        "Если задача еще не завершена (или время ожидания вышло), возвращается 202 "
+        "и текущий статус задачи."
+    ),
+    responses={
+        200: {
+            "description": "Результат задачи (JSON)",
+            "content": {"application/json": {}},
+        },
+        202: {
+            "description": "Задача еще выполняется",
+            "model": TaskStatusResponse,
+        },
+        404: {
+            "description": "Задача с указанным ID не найдена",
+            "model": NotFoundErrorResponse,
+        },
+        409: {
+            "description": "Задача провалена или отменена, результата нет",
+            "model": ConflictErrorResponse,
+        },
+        422: {
+            "description": "Ошибка валидации UUID",
+            "model": ValidationErrorResponse,
+        },
+        500: {
+            "description": "Внутренняя ошибка сервера",
+            "model": InternalServerErrorResponse,
+        },
+    },
+)
+async def get_task_result(
+    task_id: UUID,
+    request: Request,
+    service: TaskServiceDep,
+    wait: int = Query(0, ge=0),
+):
+    """Получить результат задачи."""
+    wait = min(wait, settings.result_max_wait)
+    if wait > 0:
+        task = await service.wait_for_result(task_id, wait)
+    else:
+        task = await service.get_task_result(task_id)
+    
+    if task.status != TaskStatus.COMPLETED:
+        return FastJSONResponse(
+            TaskStatusResponse.model_validate(task).model_dump(mode="json"),
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+    
+    if task.result_ref is None:
+        return FastJSONResponse(task.result)
+    
+    headers = {"ETag": f'"{task.result_checksum}"', "Vary": "Accept-Encoding"}
+    compressed = _accepts_gzip(request)
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        await service.stream_result(task, compressed=compressed),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
 @router.delete(
     "/{task_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -190,7 +563,7 @@ async def get_task_status(
         "Задачу можно отменить только если её статус: NEW, PENDING или IN_PROGRESS. "
         "Задачи со статусами COMPLETED, FAILED или CANCELLED отменить нельзя.\n\n"
         "После отмены задача получает статус CANCELLED. Если задача уже обрабатывается, "
-        "она будет отменена, но обработка может продолжиться до завершения текущей операции."
+        "worker получает сигнал отмены и прерывает обработку."
     ),
     responses={
         204: {
@@ -223,3 +596,67 @@ async def cancel_task(
     return None
 
 
+@router.post(
+    "/bulk/cancel",
+    response_model=TaskBulkResponse,
+    summary="Отменить несколько задач",
+    description=(
+        "Отменяет задачи по списку ID или по фильтру одним запросом к БД.\n\n"
+        "Параметры запроса (ровно одно из task_ids и filter):\n"
+        "- **task_ids** — список UUID задач (до 10000).\n"
+        "- **filter** — фильтр задач: status, priority, tenant_id, created_from, created_to.\n"
+        "- **limit** (по умолчанию: 1000, до 10000) — максимум задач за запрос при выборе "
+        "по фильтру; если отменено ровно limit задач, запрос можно повторить.\n\n"
+        "Отменяются только незавершенные задачи (NEW, SCHEDULED, WAITING, PENDING, "
+        "IN_PROGRESS), остальные пропускаются без ошибки. Ожидающие зависимые задачи "
+        "отменяются вместе с ними. Worker, обрабатывающие отмененные задачи, получают "
+        "один общий сигнал отмены.\n\n"
+        "Возвращает ID задач, статус которых изменен."
+    ),
+    responses={
+        200: {
+            "description": "Задачи отменены",
+            "model": TaskBulkResponse,
+        },
+        422: {
+            "description": "Ошибка валидации входных данных",
+            "model": ValidationErrorResponse,
+        },
+        500: {
+            "description": "Внутренняя ошибка сервера",
+            "model": InternalServerErrorResponse,
+        },
+    },
+)
+async def bulk_cancel_tasks(
+    data: TaskBulkRequest,
+    service: TaskServiceDep,
+):
+    """Отменить несколько задач."""
+    task_ids = await service.bulk_cancel(data)
+    return TaskBulkResponse(task_ids=task_ids, count=len(task_ids))
+
+
+@router.post(
+    "/bulk/status",
+    response_model=List[TaskStatusResponse],
+    summary="Получить статусы нескольких задач",
+    description=(
+        "Возвращает статусы задач по списку ID (до 10000) одним запросом.\n\n"
+        "Несуществующие задачи в ответ не попадают. Статусы читаются с основной БД, "
+        "чтобы опрос после отмены не получал устаревший статус с реплики."
+    ),
+    responses={
+        422: {
+            "description": "Ошибка валидации входных данных",
+            "model": ValidationErrorResponse,
+        },
+    },
+)
+async def bulk_task_statuses(
+    data: TaskBulkStatusRequest,
+    service: TaskServiceDep,
+):
+    """Получить статусы нескольких задач."""
+    rows = await service.get_statuses(list(dict.fromkeys(data.task_ids)))
+    return [TaskStatusResponse.model_validate(row) for row in rows]
@@ -0,0 +1,101 @@
+"""
+Бенчмарк сериализации ответа GET /api/v1/tasks.
+
+Сравнивает CPU на один запрос для исходного пути (ORM-объекты ->
+TaskListResponse -> повторная валидация response_model -> стандартный
+JSON-энкодер) и быстрого пути (строки-словари -> orjson).
+
+Запуск:
+    python -m backend.benchmarks.task_list_serialization [page_size] [result_kb]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from backend.api.responses import FastJSONResponse
+from backend.models import Task, TaskPriority, TaskStatus
+from backend.repository.task_repository import TASK_LIST_COLUMNS
+from backend.schemas import TaskListResponse
+
+
+def make_rows(page_size: int, result_kb: int) -> list[dict]:
+    """Сгенерировать строки задач с результатом заданного размера."""
+    now = datetime.utcnow()
+    payload = {f"key_{i}": "x" * 100 for i in range(result_kb * 1024 // 110)}
+    return [
+        {
+            "id": uuid4(),
+            "name": f"Task {i}",
+            "description": "Benchmark task",
+            "priority": TaskPriority.MEDIUM,
+            "status": TaskStatus.COMPLETED,
+            "created_at": now,
+            "started_at": now + timedelta(seconds=1),
+            "completed_at": now + timedelta(seconds=3),
+            "result": dict(payload, index=i),
+            "error_message": None,
+        }
+        for i in range(page_size)
+    ]
+
+
+def run_legacy(rows: list[dict], field, loop: asyncio.AbstractEventLoop) -> bytes:
+    """Исходный путь сериализации."""
+    tasks = [Task(**row) for row in rows]
+    response = TaskListResponse(
+        items=tasks, total=len(tasks), page=1, page_size=len(tasks), pages=1
+    )
+    content = loop.run_until_complete(
+        serialize_response(field=field, response_content=response, is_coroutine=True)
+    )
+    return JSONResponse(content).body
+
+
+def run_fast(rows: list[dict]) -> bytes:
+    """Быстрый путь сериализации."""
+    items = [dict(row) for row in rows]
+    page = {
+        "items": items, "total": len(items), "page": 1, "page_size": len(items), "pages": 1,
+    }
+    return FastJSONResponse(page).body
+
+
+def measure(fn, iterations: int) -> float:
+    """Измерить CPU-время на итерацию в миллисекундах."""
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1000
+
+
+def main() -> None:
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    result_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    iterations = 50
+
+    assert [column.key for column in TASK_LIST_COLUMNS] == list(make_rows(1, 0)[0])
+
+    rows = make_rows(page_size, result_kb)
+    field = create_response_field(name="response", type_=TaskListResponse)
+
+    loop = asyncio.new_event_loop()
+    try:
+        legacy_ms = measure(lambda: run_legacy(rows, field, loop), iterations)
+    finally:
+        loop.close()
+    fast_ms = measure(lambda: run_fast(rows), iterations)
+
+    print(f"page_size={page_size} result_kb={result_kb} iterations={iterations}")
+    print(f"legacy: {legacy_ms:8.2f} ms CPU/request")
+    print(f"fast:   {fast_ms:8.2f} ms CPU/request")
+    print(f"speedup: {legacy_ms / fast_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Конфигурация приложения через переменные окружения."""
 import sys
 import logging
+from typing import Optional
 
 from pydantic import AmqpDsn, PostgresDsn, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -17,6 +18,19 @@ class DatabaseSettings(BaseSettings):
     postgres_password: str
     postgres_db: str
     
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False
+    
+    postgres_replica_host: Optional[str] = None
+    postgres_replica_port: Optional[int] = None
+    db_replica_max_lag: float = 5.0
+    db_replica_check_interval: float = 1.0
+    
     @property
     def database_url(self) -> str:
         """URL для подключения к базе данных."""
@@ -29,6 +43,20 @@ class DatabaseSettings(BaseSettings):
             path=self.postgres_db,
         ).unicode_string()
     
+    @property
+    def replica_database_url(self) -> Optional[str]:
+        """URL для подключения к реплике только для чтения (если настроена)."""
+        if not self.postgres_replica_host:
+            return None
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=self.postgres_user,
+            password=self.postgres_password,
+            host=self.postgres_replica_host,
+            port=self.postgres_replica_port or self.postgres_port,
+            path=self.postgres_db,
+        ).unicode_string()
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -82,6 +110,246 @@ class LoggingSettings(BaseSettings):
     
     log_level: str = "INFO"
     log_file: str = "logs/app.log"
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    log_task_sample_rate: float = 1.0
+    log_task_rate_limit: int = 0
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class ProfilerSettings(BaseSettings):
+    """Настройки встроенного профилировщика."""
+    
+    profiler_interval_ms: int = 10
+    profiler_max_duration: int = 120
+    profiler_signal_duration: int = 30
+    profiler_output_dir: str = "logs"
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class HealthSettings(BaseSettings):
+    """Настройки проверок состояния."""
+    
+    health_check_interval: float = 5.0
+    health_check_timeout: float = 2.0
+    health_max_queue_backlog: int = 10000
+    worker_health_host: str = "0.0.0.0"
+    worker_health_port: int = 8001
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class PartitionSettings(BaseSettings):
+    """Настройки секционирования таблицы задач."""
+    
+    tasks_partition_months_ahead: int = 3
+    tasks_retention_days: int = 0
+    partition_maintenance_interval: int = 3600
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class ResultStorageSettings(BaseSettings):
+    """Настройки хранения результатов задач."""
+    
+    result_inline_max_bytes: int = 16384
+    result_storage_dir: str = "data/results"
+    result_compress_level: int = 6
+    result_max_wait: int = 60
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class ExportSettings(BaseSettings):
+    """Настройки выгрузки задач."""
+    
+    export_batch_size: int = 1000
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class StatsSettings(BaseSettings):
+    """Настройки статистики задач."""
+    
+    stats_default_window_minutes: int = 60
+    stats_retention_days: int = 90
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class EventsSettings(BaseSettings):
+    """Настройки push-уведомлений о статусах задач."""
+    
+    task_events_enabled: bool = True
+    task_events_channel: str = "task_events"
+    task_events_database_url: Optional[str] = None
+    task_events_queue_size: int = 100
+    task_events_max_task_ids: int = 100
+    task_events_heartbeat_interval: float = 15.0
+    task_events_reconnect_delay: float = 2.0
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class IdempotencySettings(BaseSettings):
+    """Настройки ключей идемпотентности создания задач."""
+    
+    idempotency_key_ttl: int = 86400
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class WorkerDedupSettings(BaseSettings):
+    """Настройки объединения одинаковых задач в worker."""
+    
+    worker_dedup_enabled: bool = False
+    worker_dedup_cache_ttl: float = 0.0
+    worker_dedup_cache_size: int = 1024
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class SchedulerSettings(BaseSettings):
+    """Настройки планировщика отложенных задач."""
+    
+    scheduler_enabled: bool = True
+    scheduler_window: float = 60.0
+    scheduler_tick: float = 0.1
+    scheduler_batch_size: int = 1000
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class RecurringSettings(BaseSettings):
+    """Настройки повторяющихся задач."""
+    
+    recurring_enabled: bool = True
+    recurring_interval: float = 1.0
+    recurring_lookahead: float = 60.0
+    recurring_batch_size: int = 100
+    recurring_lock_key: int = 4301
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class TenantSettings(BaseSettings):
+    """Настройки лимитов и справедливой обработки по арендаторам."""
+    
+    tenant_rate_limit: float = 0.0
+    tenant_rate_burst: int = 100
+    tenant_rate_max_tenants: int = 10000
+    task_queue_shards: int = 1
+    worker_concurrency: int = 16
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class AdmissionSettings(BaseSettings):
+    """Настройки контроля приема задач."""
+    
+    admission_max_queue_depth: int = 0
+    admission_max_queue_wait: float = 0.0
+    admission_rate_window: int = 300
+    admission_check_interval: float = 5.0
+    admission_max_retry_after: int = 300
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class LeaseSettings(BaseSettings):
+    """Настройки аренды задач, возврата зависших задач и реестра worker."""
+    
+    task_lease_ttl: float = 60.0
+    task_heartbeat_interval: float = 15.0
+    task_max_attempts: int = 4
+    task_reaper_enabled: bool = True
+    task_reaper_interval: float = 30.0
+    task_reaper_batch_size: int = 100
+    worker_registry_ttl: float = 300.0
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class MessageSettings(BaseSettings):
+    """Настройки формата сообщений очереди задач."""
+    
+    task_message_format: str = "binary"
+    task_message_batch_size: int = 8
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class WorkerBatchSettings(BaseSettings):
+    """Настройки пакетной обработки задач в worker."""
+    
+    worker_batch_size: int = 8
+    worker_batch_wait_ms: int = 20
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -95,6 +363,22 @@ class Settings(
     RabbitMQSettings,
     ApplicationSettings,
     LoggingSettings,
+    ProfilerSettings,
+    HealthSettings,
+    PartitionSettings,
+    ResultStorageSettings,
+    ExportSettings,
+    StatsSettings,
+    EventsSettings,
+    IdempotencySettings,
+    WorkerDedupSettings,
+    SchedulerSettings,
+    RecurringSettings,
+    TenantSettings,
+    AdmissionSettings,
+    LeaseSettings,
+    MessageSettings,
+    WorkerBatchSettings,
 ):
     """Объединенные настройки приложения."""
     
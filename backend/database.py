@@ -1,22 +1,89 @@
 """Настройка подключения к базе данных."""
+import time
 from collections.abc import AsyncGenerator
-from typing import Annotated
+from typing import Annotated, Any, Dict, Optional
+from uuid import uuid4
 
 from fastapi import Depends
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.config import DatabaseSettings, settings
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, собирающий статистику ожидания при checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.checkouts += 1
+            self.checkout_wait_total += elapsed
+            self.checkout_wait_max = max(self.checkout_wait_max, elapsed)
+
+
+def build_engine_options(db_settings: DatabaseSettings) -> Dict[str, Any]:
+    """
+    Собрать параметры create_async_engine из настроек.
+
+    В режиме PgBouncer (transaction pooling) отключаются кэши prepared
+    statements asyncpg и SQLAlchemy, а имена statements делаются уникальными,
+    чтобы они не конфликтовали между серверными соединениями.
+
+    Args:
+        db_settings: Настройки базы данных
+
+    Returns:
+        Словарь с параметрами движка
+    """
+    if db_settings.db_pgbouncer_mode:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": db_settings.db_statement_cache_size,
+            "prepared_statement_cache_size": db_settings.db_statement_cache_size,
+        }
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": db_settings.db_pool_size,
+        "max_overflow": db_settings.db_max_overflow,
+        "pool_timeout": db_settings.db_pool_timeout,
+        "pool_recycle": db_settings.db_pool_recycle,
+        "pool_pre_ping": db_settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
 
-from backend.config import settings
 
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
-    pool_pre_ping=True,
+    **build_engine_options(settings),
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -27,9 +94,52 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Реплика только для чтения (опционально), см. backend.services.replica_service
+replica_engine: Optional[AsyncEngine] = None
+ReplicaSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+
+if settings.replica_database_url:
+    replica_engine = create_async_engine(
+        settings.replica_database_url,
+        echo=settings.debug,
+        future=True,
+        **build_engine_options(settings),
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 Base = declarative_base()
 
 
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Получить текущую статистику пула соединений.
+
+    Returns:
+        Словарь со статистикой пула
+    """
+    pool = engine.pool
+    checkouts = getattr(pool, "checkouts", 0)
+    wait_total = getattr(pool, "checkout_wait_total", 0.0)
+
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": checkouts,
+        "checkout_timeouts": getattr(pool, "checkout_timeouts", 0),
+        "checkout_wait_avg_ms": wait_total / checkouts * 1000 if checkouts else 0.0,
+        "checkout_wait_max_ms": getattr(pool, "checkout_wait_max", 0.0) * 1000,
+    }
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency для получения сессии БД."""
     async with AsyncSessionLocal() as async_session:
@@ -37,4 +147,3 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 DBSession = Annotated[AsyncSession, Depends(get_async_session)]
-
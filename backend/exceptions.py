@@ -16,3 +16,53 @@ class TaskCannotBeCancelledError(TaskServiceError):
     pass
 
 
+class ProfilerAlreadyRunningError(TaskServiceError):
+    """Исключение, когда профилировщик уже запущен."""
+    pass
+
+
+
+class TaskResultUnavailableError(TaskServiceError):
+    """Исключение, когда у задачи нет результата (провалена или отменена)."""
+    pass
+
+
+class InvalidTaskFilterError(TaskServiceError):
+    """Исключение, когда параметр фильтра задан некорректно."""
+    pass
+
+
+class InvalidTaskDependencyError(TaskServiceError):
+    """Исключение, когда родительская задача не найдена или не может завершиться успешно."""
+    pass
+
+
+class TenantRateLimitedError(TaskServiceError):
+    """Исключение, когда арендатор превысил лимит частоты создания задач."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueOverloadedError(TaskServiceError):
+    """Исключение, когда очередь задач перегружена и новые задачи не принимаются."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RecurringTaskNotFoundError(TaskServiceError):
+    """Исключение, когда повторяющаяся задача не найдена."""
+    pass
+
+
+class InvalidCronExpressionError(TaskServiceError):
+    """Исключение, когда cron-выражение некорректно."""
+    pass
+
+
+class IdempotencyKeyReusedError(TaskServiceError):
+    """Исключение, когда ключ идемпотентности повторно использован с другим запросом."""
+    pass
@@ -0,0 +1,199 @@
+"""Неблокирующая настройка логирования для API и worker."""
+import atexit
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from backend.config import settings
+
+# Стандартные атрибуты LogRecord, которые не попадают в структурированные поля
+_RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None)).keys()
+) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматтер, сериализующий запись лога в одну строку JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TaskLogSampler(logging.Filter):
+    """
+    Сэмплирование и ограничение частоты INFO-логов по задачам.
+
+    Применяется только к записям уровня INFO и ниже, у которых есть поле
+    ``task_id`` (передается через ``extra``). Решение о сэмплировании
+    принимается по хэшу task_id, поэтому для выбранной задачи сохраняются
+    все её строки. Поверх сэмплирования работает token bucket.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, rate_limit: int = 0):
+        """
+        Args:
+            sample_rate: Доля задач, для которых пишутся INFO-логи (0..1)
+            rate_limit: Максимум записей в секунду (0 — без ограничения)
+        """
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self._tokens = float(rate_limit)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _sampled(self, task_id) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        bucket = zlib.crc32(str(task_id).encode()) % 10_000
+        return bucket < self.sample_rate * 10_000
+
+    def _take_token(self) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.rate_limit),
+                self._tokens + (now - self._updated_at) * self.rate_limit,
+            )
+            self._updated_at = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        task_id = getattr(record, "task_id", None)
+        if task_id is None:
+            return True
+        if self._sampled(task_id) and self._take_token():
+            return True
+        self.dropped += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler, который никогда не блокирует вызывающий поток.
+
+    Если очередь переполнена (например, диск не успевает), запись
+    отбрасывается и учитывается в счетчике ``dropped``.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Подготовить запись к передаче в другой поток без форматирования."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_formatter() -> logging.Formatter:
+    if settings.log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+def setup_logging(log_file: Optional[str] = None) -> QueueListener:
+    """
+    Настроить логирование через очередь и фоновый listener.
+
+    Корневой логгер получает только NonBlockingQueueHandler, а запись в файл
+    и в консоль выполняется в отдельном потоке QueueListener.
+
+    Args:
+        log_file: Путь к файлу логов (по умолчанию settings.log_file)
+
+    Returns:
+        Запущенный QueueListener
+    """
+    global _listener
+
+    if _listener is not None:
+        return _listener
+
+    formatter = _build_formatter()
+
+    file_handler = logging.FileHandler(log_file or settings.log_file)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(
+        TaskLogSampler(
+            sample_rate=settings.log_task_sample_rate,
+            rate_limit=settings.log_task_rate_limit,
+        )
+    )
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, settings.log_level))
+
+    _listener = QueueListener(
+        log_queue,
+        file_handler,
+        stream_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Остановить listener и дописать оставшиеся записи."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -6,19 +6,23 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.config import settings
-from backend.database import engine, Base
+from backend.database import engine, replica_engine, Base
 from backend.api.routes import router
+from backend.api.admin import router as admin_router
+from backend.api.recurring import router as recurring_router
+from backend.api.health import router as health_router
 from backend.api.exception_handlers import register_exception_handlers
+from backend.logging_config import setup_logging, shutdown_logging
+from backend.services.admission_service import admission_controller
+from backend.services.health_service import health_monitor
+# Регистрирует создание секций вместе с таблицей tasks в create_all
+from backend.services.partition_service import create_initial_partitions  # noqa: F401
+from backend.services.rabbitmq_service import rabbitmq_service
+from backend.services.replica_service import replica_router
+from backend.services.task_events_service import task_event_hub
 
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(settings.log_file),
-        logging.StreamHandler(),
-    ],
-)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -28,15 +32,31 @@ async def lifespan(app: FastAPI):
     """Управление жизненным циклом приложения."""
     logger.info("Starting application...")
     app.include_router(router)
+    app.include_router(recurring_router)
+    app.include_router(admin_router)
+    app.include_router(health_router)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    health_monitor.start()
+    admission_controller.start()
+    replica_router.start()
+    if settings.task_events_enabled:
+        task_event_hub.start()
     logger.info("Application started")
     
     yield
     
     logger.info("Shutting down application...")
+    await health_monitor.stop()
+    await admission_controller.stop()
+    await replica_router.stop()
+    await task_event_hub.stop()
+    await rabbitmq_service.disconnect()
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
     logger.info("Application shut down")
+    shutdown_logging()
 
 
 app = FastAPI(
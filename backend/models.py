@@ -3,16 +3,35 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import Optional
 
-from sqlalchemy import Column, String, DateTime, Text, Enum as SQLEnum, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Column,
+    String,
+    DateTime,
+    Text,
+    Enum as SQLEnum,
+    Index,
+    BigInteger,
+    Boolean,
+    Computed,
+    Integer,
+    SmallInteger,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 import uuid
 
 from backend.database import Base
 
+# Арендатор задач, созданных без tenant_id
+DEFAULT_TENANT = "default"
+
 
 class TaskStatus(str, PyEnum):
     """Статусы задач."""
     NEW = "NEW"
+    SCHEDULED = "SCHEDULED"
+    WAITING = "WAITING"
     PENDING = "PENDING"
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
@@ -27,22 +46,209 @@ class TaskPriority(str, PyEnum):
     HIGH = "HIGH"
 
 
+# Выражение для полнотекстового поиска по названию (вес A) и описанию (вес B).
+# Конфигурация 'simple' не зависит от языка текста задач.
+TASK_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+TASK_SEARCH_CONFIG = "simple"
+
+
 class Task(Base):
-    """Модель задачи."""
+    """
+    Модель задачи.
+    
+    Таблица секционирована по диапазонам created_at (по месяцам), поэтому
+    created_at входит в первичный ключ. Секции создаются заранее и удаляются
+    по истечении срока хранения, см. PartitionService.
+    
+    Крупные результаты хранятся сжатыми во внешнем хранилище (BlobStore):
+    в строке остаются только ключ объекта, размер и контрольная сумма,
+    а колонка result пуста.
+    
+    search_vector — генерируемая колонка для полнотекстового поиска,
+    не загружается вместе с задачей.
+    
+    Задача с run_at в будущем создается в статусе SCHEDULED и отправляется
+    в очередь планировщиком (TaskScheduler) при наступлении run_at.
+    
+    Worker, начавший обработку, берет задачу в аренду (lease_owner,
+    lease_expires_at) и продлевает её, пока обрабатывает. Задачи в
+    IN_PROGRESS с истекшей арендой возвращает в очередь TaskReaper.
+    """
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_at", "created_at"),
+        Index(
+            "ix_tasks_result",
+            "result",
+            postgresql_using="gin",
+            postgresql_ops={"result": "jsonb_path_ops"},
+        ),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_tasks_scheduled_run_at",
+            "run_at",
+            postgresql_where=text("status = 'SCHEDULED'"),
+        ),
+        Index(
+            "ix_tasks_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=text("status = 'IN_PROGRESS'"),
+        ),
+        Index(
+            "ix_tasks_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     priority = Column(SQLEnum(TaskPriority), nullable=False, default=TaskPriority.MEDIUM)
     status = Column(SQLEnum(TaskStatus), nullable=False, default=TaskStatus.NEW)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    tenant_id = Column(String(64), nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
+    run_at = Column(DateTime, nullable=True)
+    pending_parents = Column(Integer, nullable=False, default=0, server_default="0")
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
-    result = Column(JSON, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    lease_owner = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    result = Column(JSONB, nullable=True)
+    result_ref = Column(String(255), nullable=True)
+    result_size = Column(BigInteger, nullable=True)
+    result_checksum = Column(String(64), nullable=True)
     error_message = Column(Text, nullable=True)
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(TASK_SEARCH_VECTOR_SQL, persisted=True))
+    )
     
     def __repr__(self):
         return f"<Task(id={self.id}, name={self.name}, status={self.status})>"
 
 
+class TaskDependency(Base):
+    """
+    Зависимость задачи от родительской задачи.
+    
+    Ребро существует, пока родитель не завершен: при завершении родителя
+    его ребра удаляются, а счетчик pending_parents дочерних задач
+    уменьшается в той же транзакции.
+    """
+    __tablename__ = "task_dependencies"
+    
+    parent_id = Column(UUID(as_uuid=True), primary_key=True)
+    child_id = Column(UUID(as_uuid=True), primary_key=True)
+    child_created_at = Column(DateTime, nullable=False)
+
+
+class TaskStat(Base):
+    """
+    Поминутный агрегат переходов задач по статусам.
+    
+    count — сколько задач с данным приоритетом перешли в статус в течение
+    минуты bucket. Обновляется инкрементально при сохранении задач.
+    """
+    __tablename__ = "task_stats"
+    
+    bucket = Column(DateTime, primary_key=True)
+    status = Column(SQLEnum(TaskStatus), primary_key=True)
+    priority = Column(SQLEnum(TaskPriority), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class TaskLatencyStat(Base):
+    """
+    Поминутная гистограмма длительностей (ожидание в очереди и выполнение).
+    
+    Длительность в миллисекундах попадает в логарифмическую корзину bin,
+    см. backend.repository.stats_repository.latency_bin.
+    """
+    __tablename__ = "task_latency_stats"
+    
+    bucket = Column(DateTime, primary_key=True)
+    metric = Column(String(32), primary_key=True)
+    bin = Column(SmallInteger, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    """
+    Ключ идемпотентности запроса на создание задачи.
+    
+    Повтор запроса с тем же ключом до expires_at возвращает задачу task_id
+    вместо создания новой. request_hash — SHA-256 тела исходного запроса,
+    ключ нельзя переиспользовать с другим телом. Внешнего ключа на tasks нет
+    (таблица секционирована), поэтому хранится и created_at задачи.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    task_created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class RecurringTask(Base):
+    """
+    Определение повторяющейся задачи.
+    
+    Планировщик (один на кластер, см. RecurringTaskScheduler) к моменту
+    next_run_at создает обычную задачу с run_at = next_run_at плюс случайная
+    задержка до jitter_seconds и переносит next_run_at на следующее время
+    по расписанию cron.
+    """
+    __tablename__ = "recurring_tasks"
+    __table_args__ = (
+        Index(
+            "ix_recurring_tasks_next_run_at",
+            "next_run_at",
+            postgresql_where=text("enabled"),
+        ),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    priority = Column(SQLEnum(TaskPriority), nullable=False, default=TaskPriority.MEDIUM)
+    tenant_id = Column(String(64), nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    cron = Column(String(100), nullable=False)
+    jitter_seconds = Column(Integer, nullable=False, default=0)
+    enabled = Column(Boolean, nullable=False, default=True)
+    next_run_at = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RecurringTask(id={self.id}, name={self.name}, cron={self.cron})>"
+
+
+class Worker(Base):
+    """
+    Запись реестра worker.
+    
+    Worker создает запись при запуске и обновляет heartbeat_at и количество
+    обрабатываемых задач (in_flight) вместе с продлением аренды задач.
+    Записи worker без heartbeat дольше WORKER_REGISTRY_TTL удаляет TaskReaper.
+    """
+    __tablename__ = "workers"
+    
+    id = Column(String(128), primary_key=True)
+    hostname = Column(String(255), nullable=False)
+    pid = Column(Integer, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    in_flight = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<Worker(id={self.id}, in_flight={self.in_flight})>"
@@ -0,0 +1,158 @@
+"""Встроенный сэмплирующий профилировщик для API и worker."""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from backend.config import settings
+from backend.exceptions import ProfilerAlreadyRunningError
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Сэмплирующий профилировщик на основе sys._current_frames().
+
+    Фоновый поток с заданным интервалом снимает стеки всех потоков процесса
+    (включая поток event loop) и агрегирует их в формате collapsed stacks,
+    который понимают flamegraph.pl, speedscope и inferno.
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 128):
+        """
+        Инициализация профилировщика.
+
+        Args:
+            interval: Интервал между сэмплами в секундах
+            max_depth: Максимальная глубина стека
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self._samples: Counter = Counter()
+        self._sample_count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Идет ли сейчас сбор сэмплов."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def sample_count(self) -> int:
+        """Количество снятых сэмплов."""
+        return self._sample_count
+
+    def start(self, duration: Optional[float] = None) -> None:
+        """
+        Запустить сбор сэмплов.
+
+        Args:
+            duration: Длительность в секундах (None — до вызова stop)
+
+        Raises:
+            ProfilerAlreadyRunningError: Если профилировщик уже запущен
+        """
+        with self._lock:
+            if self.is_running:
+                raise ProfilerAlreadyRunningError("Profiler is already running")
+
+            self._samples = Counter()
+            self._sample_count = 0
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(duration,),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def wait(self) -> None:
+        """Дождаться завершения сбора сэмплов."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def stop(self) -> None:
+        """Остановить сбор сэмплов и дождаться завершения потока."""
+        self._stop_event.set()
+        self.wait()
+
+    def collapsed(self) -> str:
+        """
+        Получить результат в формате collapsed stacks.
+
+        Returns:
+            Строки вида ``thread;frame1;frame2 count``
+        """
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self._samples.most_common()
+        )
+
+    def _run(self, duration: Optional[float]) -> None:
+        deadline = time.monotonic() + duration if duration else None
+        own_id = threading.get_ident()
+
+        while not self._stop_event.wait(self.interval):
+            self._sample(own_id)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+    def _sample(self, own_id: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                code = frame.f_code
+                frames.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+
+            frames.append(names.get(thread_id, f"thread-{thread_id}"))
+            self._samples[";".join(reversed(frames))] += 1
+
+        self._sample_count += 1
+
+
+profiler = SamplingProfiler(interval=settings.profiler_interval_ms / 1000)
+
+
+def dump_profile(name: str, duration: float) -> str:
+    """
+    Снять профиль процесса и сохранить его в файл.
+
+    Выполняется синхронно, поэтому вызывать нужно из отдельного потока.
+
+    Args:
+        name: Имя процесса для названия файла
+        duration: Длительность профилирования в секундах
+
+    Returns:
+        Путь к файлу с collapsed stacks
+    """
+    profiler.start(duration)
+    profiler.wait()
+
+    os.makedirs(settings.profiler_output_dir, exist_ok=True)
+    path = os.path.join(
+        settings.profiler_output_dir,
+        f"profile-{name}-{os.getpid()}-{datetime.utcnow():%Y%m%dT%H%M%S}.collapsed",
+    )
+    with open(path, "w") as f:
+        f.write(profiler.collapsed())
+
+    logger.info(
+        "Profile written to %s (%d samples)", path, profiler.sample_count
+    )
+    return path
@@ -1,8 +1,16 @@
 """Репозитории."""
 from backend.repository.base import BaseRepository
 from backend.repository.task_repository import TaskRepository
+from backend.repository.stats_repository import StatsRepository
+from backend.repository.idempotency_repository import IdempotencyRepository
+from backend.repository.recurring_repository import RecurringTaskRepository
+from backend.repository.worker_repository import WorkerRepository
+from backend.repository import task_events  # noqa: F401  регистрирует NOTIFY о статусах
 
-__all__ = ["BaseRepository", "TaskRepository"]
+__all__ = [
+    "BaseRepository", "TaskRepository", "StatsRepository", "IdempotencyRepository",
+    "RecurringTaskRepository", "WorkerRepository",
+]
 
 
 
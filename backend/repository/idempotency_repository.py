@@ -0,0 +1,69 @@
+"""Репозиторий ключей идемпотентности."""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import IdempotencyKey
+
+
+class IdempotencyRepository:
+    """Репозиторий для работы с ключами идемпотентности."""
+    
+    @staticmethod
+    async def claim(
+        session: AsyncSession,
+        key: str,
+        request_hash: str,
+        task_id: UUID,
+        task_created_at: datetime,
+        expires_at: datetime,
+        now: datetime,
+    ) -> bool:
+        """
+        Занять ключ за новой задачей.
+        
+        Ключ занимается, если его нет или срок действия истек. Запрос не
+        фиксирует транзакцию: ключ становится виден вместе с задачей.
+        Конкурентный запрос с тем же ключом ждет на уникальном индексе
+        до фиксации и затем видит занятый ключ.
+        
+        Returns:
+            True, если ключ занят этим запросом
+        """
+        stmt = insert(IdempotencyKey).values(
+            key=key,
+            request_hash=request_hash,
+            task_id=task_id,
+            task_created_at=task_created_at,
+            expires_at=expires_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "task_id": stmt.excluded.task_id,
+                "task_created_at": stmt.excluded.task_created_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now,
+        ).returning(IdempotencyKey.key)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+    
+    @staticmethod
+    async def get(session: AsyncSession, key: str) -> Optional[IdempotencyKey]:
+        """Получить ключ идемпотентности."""
+        result = await session.execute(
+            select(IdempotencyKey).where(IdempotencyKey.key == key)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def delete_expired(session: AsyncSession, now: datetime) -> None:
+        """Удалить ключи с истекшим сроком действия."""
+        await session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+        await session.commit()
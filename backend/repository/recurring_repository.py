@@ -0,0 +1,76 @@
+"""Репозиторий повторяющихся задач."""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import RecurringTask
+
+
+class RecurringTaskRepository:
+    """Репозиторий для работы с повторяющимися задачами."""
+
+    @staticmethod
+    async def create(session: AsyncSession, data: Dict[str, Any]) -> RecurringTask:
+        """Создать повторяющуюся задачу."""
+        recurring = RecurringTask(**data)
+        session.add(recurring)
+        await session.commit()
+        await session.refresh(recurring)
+        return recurring
+
+    @staticmethod
+    async def get(session: AsyncSession, recurring_id: UUID) -> Optional[RecurringTask]:
+        """Получить повторяющуюся задачу по ID."""
+        result = await session.execute(
+            select(RecurringTask).where(RecurringTask.id == recurring_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_all(session: AsyncSession) -> List[RecurringTask]:
+        """Получить все повторяющиеся задачи."""
+        result = await session.execute(
+            select(RecurringTask).order_by(RecurringTask.created_at)
+        )
+        return list(result.scalars())
+
+    @staticmethod
+    async def delete(session: AsyncSession, recurring_id: UUID) -> bool:
+        """Удалить повторяющуюся задачу."""
+        result = await session.execute(
+            delete(RecurringTask).where(RecurringTask.id == recurring_id)
+        )
+        await session.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    async def lock_due(
+        session: AsyncSession,
+        until: datetime,
+        limit: int,
+    ) -> List[RecurringTask]:
+        """
+        Заблокировать включенные задачи со временем запуска до until.
+
+        Строки блокируются с SKIP LOCKED до конца транзакции вызывающего,
+        которая должна создать задачи и перенести next_run_at.
+
+        Args:
+            session: Сессия базы данных
+            until: Граница времени запуска (включительно)
+            limit: Максимальное количество задач
+
+        Returns:
+            Повторяющиеся задачи по возрастанию next_run_at
+        """
+        result = await session.execute(
+            select(RecurringTask)
+            .where(RecurringTask.enabled.is_(True), RecurringTask.next_run_at <= until)
+            .order_by(RecurringTask.next_run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars())
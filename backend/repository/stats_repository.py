@@ -0,0 +1,246 @@
+"""Репозиторий агрегатов статистики задач."""
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.models import Task, TaskLatencyStat, TaskPriority, TaskStat, TaskStatus
+
+METRIC_QUEUE_WAIT = "queue_wait"
+METRIC_RUN_DURATION = "run_duration"
+
+# Корзин гистограммы на каждое удвоение длительности (погрешность ~19%)
+BINS_PER_OCTAVE = 4
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+def minute_bucket(value: datetime) -> datetime:
+    """Начало минуты для момента времени."""
+    return value.replace(second=0, microsecond=0)
+
+
+def latency_bin(duration_ms: float) -> int:
+    """
+    Номер корзины гистограммы для длительности.
+
+    Корзина bin покрывает интервал (2^((bin-1)/4), 2^(bin/4)] мс,
+    все значения до 1 мс попадают в корзину 0.
+    """
+    if duration_ms <= 1:
+        return 0
+    return math.ceil(math.log2(duration_ms) * BINS_PER_OCTAVE)
+
+
+def bin_bounds(bin_number: int) -> Tuple[float, float]:
+    """Границы корзины гистограммы в миллисекундах."""
+    if bin_number <= 0:
+        return 0.0, 1.0
+    return (
+        2 ** ((bin_number - 1) / BINS_PER_OCTAVE),
+        2 ** (bin_number / BINS_PER_OCTAVE),
+    )
+
+
+def _duration_ms(start: datetime, end: datetime) -> float:
+    return max((end - start).total_seconds() * 1000, 0.0)
+
+
+def task_status_change(task: Task) -> Optional[TaskStatus]:
+    """Новый статус задачи, если он изменился в текущем flush."""
+    history = inspect(task).attrs.status.history
+    if not history.added:
+        return None
+    new_status = history.added[0]
+    if history.deleted and history.deleted[0] == new_status:
+        return None
+    return new_status
+
+
+def collect_task_transitions(
+    session: Session,
+) -> Tuple[Dict[tuple, int], Dict[tuple, int]]:
+    """
+    Собрать изменения агрегатов по задачам текущего flush.
+
+    Returns:
+        Кортеж (приращения task_stats, приращения task_latency_stats)
+    """
+    counts: Dict[tuple, int] = defaultdict(int)
+    latencies: Dict[tuple, int] = defaultdict(int)
+    now = minute_bucket(datetime.utcnow())
+
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Task):
+            continue
+
+        if obj in session.new:
+            status = obj.status or TaskStatus.NEW
+        else:
+            status = task_status_change(obj)
+            if status is None:
+                continue
+
+        _count_transition(counts, latencies, now, status, obj)
+
+    return counts, latencies
+
+
+def _count_transition(
+    counts: Dict[tuple, int],
+    latencies: Dict[tuple, int],
+    now: datetime,
+    status: TaskStatus,
+    task: Any,
+) -> None:
+    priority = task.priority or TaskPriority.MEDIUM
+    counts[(now, status, priority)] += 1
+
+    if status == TaskStatus.IN_PROGRESS and task.started_at and task.created_at:
+        duration = _duration_ms(task.created_at, task.started_at)
+        latencies[(now, METRIC_QUEUE_WAIT, latency_bin(duration))] += 1
+    elif status in FINISHED_STATUSES and task.started_at and task.completed_at:
+        duration = _duration_ms(task.started_at, task.completed_at)
+        latencies[(now, METRIC_RUN_DURATION, latency_bin(duration))] += 1
+
+
+def record_task_transitions(session: Session, flush_context: Any) -> None:
+    """
+    Обработчик after_flush: обновить агрегаты в той же транзакции.
+
+    Приращения объединяются и записываются одним upsert на таблицу,
+    поэтому сохранение задачи добавляет не больше двух запросов.
+    """
+    counts, latencies = collect_task_transitions(session)
+    _write_increments(session.connection(), counts, latencies)
+
+
+def record_bulk_transitions(session: Session, rows: List[Any]) -> None:
+    """
+    Обновить агрегаты по задачам, статус которых изменен массовым UPDATE.
+
+    Массовый UPDATE не проходит через flush, поэтому вызывается явно
+    в той же транзакции (через AsyncSession.run_sync).
+
+    Args:
+        session: Синхронная сессия
+        rows: Строки RETURNING с колонками status, priority, created_at,
+            started_at, completed_at
+    """
+    counts: Dict[tuple, int] = defaultdict(int)
+    latencies: Dict[tuple, int] = defaultdict(int)
+    now = minute_bucket(datetime.utcnow())
+    for row in rows:
+        _count_transition(counts, latencies, now, row.status, row)
+    _write_increments(session.connection(), counts, latencies)
+
+
+def _write_increments(connection: Any, counts: Dict[tuple, int], latencies: Dict[tuple, int]) -> None:
+    if counts:
+        stmt = insert(TaskStat).values([
+            {"bucket": bucket, "status": status, "priority": priority, "count": count}
+            for (bucket, status, priority), count in counts.items()
+        ])
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskStat.bucket, TaskStat.status, TaskStat.priority],
+                set_={"count": TaskStat.count + stmt.excluded.count},
+            )
+        )
+
+    if latencies:
+        stmt = insert(TaskLatencyStat).values([
+            {"bucket": bucket, "metric": metric, "bin": bin_number, "count": count}
+            for (bucket, metric, bin_number), count in latencies.items()
+        ])
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskLatencyStat.bucket, TaskLatencyStat.metric, TaskLatencyStat.bin],
+                set_={"count": TaskLatencyStat.count + stmt.excluded.count},
+            )
+        )
+
+
+event.listen(Session, "after_flush", record_task_transitions)
+
+
+class StatsRepository:
+    """Репозиторий для чтения агрегатов статистики задач."""
+
+    @staticmethod
+    async def get_status_counts(
+        session: AsyncSession,
+        window_from: datetime,
+        window_to: datetime,
+    ) -> List[Tuple[TaskStatus, TaskPriority, int]]:
+        """
+        Количество переходов в каждый статус по приоритетам за окно.
+
+        Returns:
+            Список кортежей (статус, приоритет, количество)
+        """
+        result = await session.execute(
+            select(TaskStat.status, TaskStat.priority, func.sum(TaskStat.count))
+            .where(TaskStat.bucket >= window_from, TaskStat.bucket < window_to)
+            .group_by(TaskStat.status, TaskStat.priority)
+            .order_by(TaskStat.status, TaskStat.priority)
+        )
+        return [(row[0], row[1], int(row[2])) for row in result]
+
+    @staticmethod
+    async def get_throughput(
+        session: AsyncSession,
+        window_from: datetime,
+        window_to: datetime,
+    ) -> List[Tuple[datetime, TaskStatus, int]]:
+        """
+        Поминутное количество завершенных и проваленных задач за окно.
+
+        Returns:
+            Список кортежей (минута, статус, количество)
+        """
+        result = await session.execute(
+            select(TaskStat.bucket, TaskStat.status, func.sum(TaskStat.count))
+            .where(
+                TaskStat.bucket >= window_from,
+                TaskStat.bucket < window_to,
+                TaskStat.status.in_(FINISHED_STATUSES),
+            )
+            .group_by(TaskStat.bucket, TaskStat.status)
+            .order_by(TaskStat.bucket)
+        )
+        return [(row[0], row[1], int(row[2])) for row in result]
+
+    @staticmethod
+    async def get_histograms(
+        session: AsyncSession,
+        window_from: datetime,
+        window_to: datetime,
+    ) -> Dict[str, Dict[int, int]]:
+        """
+        Суммарные гистограммы длительностей за окно.
+
+        Returns:
+            Словарь {метрика: {корзина: количество}}
+        """
+        result = await session.execute(
+            select(TaskLatencyStat.metric, TaskLatencyStat.bin, func.sum(TaskLatencyStat.count))
+            .where(TaskLatencyStat.bucket >= window_from, TaskLatencyStat.bucket < window_to)
+            .group_by(TaskLatencyStat.metric, TaskLatencyStat.bin)
+        )
+        histograms: Dict[str, Dict[int, int]] = defaultdict(dict)
+        for metric, bin_number, count in result:
+            histograms[metric][bin_number] = int(count)
+        return histograms
+
+    @staticmethod
+    async def delete_before(session: AsyncSession, before: datetime) -> None:
+        """Удалить агрегаты старше указанного момента."""
+        await session.execute(delete(TaskStat).where(TaskStat.bucket < before))
+        await session.execute(delete(TaskLatencyStat).where(TaskLatencyStat.bucket < before))
+        await session.commit()
@@ -0,0 +1,89 @@
+"""Публикация событий смены статуса задач через Postgres NOTIFY."""
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import Task, TaskStatus
+from backend.repository.stats_repository import task_status_change
+
+
+def task_event_payload(task: Any) -> Dict[str, Any]:
+    """
+    Данные события о статусе задачи (как в TaskStatusResponse).
+
+    Args:
+        task: Задача (или строка с теми же колонками)
+
+    Returns:
+        Словарь, готовый к сериализации в JSON
+    """
+    return {
+        "id": str(task.id),
+        "status": task.status.value if task.status else None,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "run_at": task.run_at.isoformat() if task.run_at else None,
+        "started_at": task.started_at.isoformat() if task.started_at else None,
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+    }
+
+
+def collect_task_events(session: Session) -> List[str]:
+    """Собрать события смены статуса по задачам текущего flush."""
+    payloads = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Task):
+            continue
+        if obj not in session.new and task_status_change(obj) is None:
+            continue
+        payload = task_event_payload(obj)
+        payload["status"] = payload["status"] or TaskStatus.NEW.value
+        payloads.append(json.dumps(payload))
+    return payloads
+
+
+def notify_task_transitions(session: Session, flush_context: Any) -> None:
+    """
+    Обработчик after_flush: отправить NOTIFY о сменах статуса.
+
+    Postgres доставляет уведомления только после фиксации транзакции,
+    поэтому подписчики не видят статусов, которые были откачены.
+    Все события flush отправляются одним запросом.
+    """
+    if not settings.task_events_enabled:
+        return
+
+    _notify(session, collect_task_events(session))
+
+
+def notify_bulk_transitions(session: Session, rows: List[Any]) -> None:
+    """
+    Отправить NOTIFY о задачах, статус которых изменен массовым UPDATE.
+
+    Массовый UPDATE не проходит через flush, поэтому вызывается явно
+    в той же транзакции (через AsyncSession.run_sync).
+
+    Args:
+        session: Синхронная сессия
+        rows: Строки RETURNING с колонками как в task_event_payload
+    """
+    if settings.task_events_enabled:
+        _notify(session, [json.dumps(task_event_payload(row)) for row in rows])
+
+
+def _notify(session: Session, payloads: List[str]) -> None:
+    if not payloads:
+        return
+
+    session.connection().execute(
+        text(
+            "SELECT pg_notify(:channel, payload) "
+            "FROM unnest(CAST(:payloads AS text[])) AS payload"
+        ),
+        {"channel": settings.task_events_channel, "payloads": payloads},
+    )
+
+
+event.listen(Session, "after_flush", notify_task_transitions)
@@ -1,18 +1,130 @@
 """Репозиторий для работы с задачами."""
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import delete, insert, select, func, and_, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.repository.base import BaseRepository
-from backend.models import Task, TaskStatus, TaskPriority
+from backend.repository.stats_repository import record_bulk_transitions
+from backend.repository.task_events import notify_bulk_transitions
+from backend.models import Task, TaskDependency, TaskStatus, TaskPriority, TASK_SEARCH_CONFIG
+
+
+# Колонки, из которых строится ответ со списком задач
+TASK_LIST_COLUMNS = (
+    Task.id,
+    Task.name,
+    Task.description,
+    Task.priority,
+    Task.status,
+    Task.tenant_id,
+    Task.created_at,
+    Task.run_at,
+    Task.pending_parents,
+    Task.started_at,
+    Task.completed_at,
+    Task.result,
+    Task.result_size,
+    Task.result_checksum,
+    Task.error_message,
+)
+
+# Статусы, из которых задачу можно отменить
+CANCELLABLE_STATUSES = (
+    TaskStatus.NEW,
+    TaskStatus.SCHEDULED,
+    TaskStatus.WAITING,
+    TaskStatus.PENDING,
+    TaskStatus.IN_PROGRESS,
+)
 
 
 class TaskRepository(BaseRepository[Task]):
     """Репозиторий для работы с задачами."""
     
+    @staticmethod
+    def _build_conditions(filters: Optional[Dict[str, Any]]) -> List[Any]:
+        """
+        Построить условия WHERE из словаря фильтров.
+        
+        Args:
+            filters: Словарь с фильтрами (status, priority, tenant_id, created_from,
+                created_to, result_contains, q)
+            
+        Returns:
+            Список условий SQLAlchemy
+        """
+        conditions = []
+        
+        if filters:
+            if "status" in filters and filters["status"]:
+                conditions.append(Task.status == filters["status"])
+            if "priority" in filters and filters["priority"]:
+                conditions.append(Task.priority == filters["priority"])
+            if "tenant_id" in filters and filters["tenant_id"]:
+                conditions.append(Task.tenant_id == filters["tenant_id"])
+            if "created_from" in filters and filters["created_from"]:
+                conditions.append(Task.created_at >= filters["created_from"])
+            if "created_to" in filters and filters["created_to"]:
+                conditions.append(Task.created_at <= filters["created_to"])
+            if "result_contains" in filters and filters["result_contains"]:
+                # result @> :value, использует GIN индекс ix_tasks_result
+                conditions.append(Task.result.contains(filters["result_contains"]))
+            if "q" in filters and filters["q"]:
+                # search_vector @@ websearch_to_tsquery(...), использует GIN индекс
+                conditions.append(
+                    Task.search_vector.op("@@")(TaskRepository._search_query(filters["q"]))
+                )
+        
+        return conditions
+    
+    @staticmethod
+    def _search_query(q: str) -> Any:
+        """Построить tsquery из поисковой строки (синтаксис как у веб-поиска)."""
+        return func.websearch_to_tsquery(TASK_SEARCH_CONFIG, q)
+    
+    @staticmethod
+    def _build_order(filters: Optional[Dict[str, Any]]) -> List[Any]:
+        """
+        Построить ORDER BY для списка задач.
+        
+        При полнотекстовом поиске задачи сортируются по релевантности,
+        затем по дате создания.
+        """
+        order = []
+        if filters and filters.get("q"):
+            rank = func.ts_rank_cd(Task.search_vector, TaskRepository._search_query(filters["q"]))
+            order.append(rank.desc())
+        order.append(Task.created_at.desc())
+        return order
+    
+    @staticmethod
+    def _build_filters(
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Собрать словарь фильтров из именованных параметров."""
+        filters = {}
+        if status:
+            filters["status"] = status
+        if priority:
+            filters["priority"] = priority
+        if created_from:
+            filters["created_from"] = created_from
+        if created_to:
+            filters["created_to"] = created_to
+        if result_contains:
+            filters["result_contains"] = result_contains
+        if q:
+            filters["q"] = q
+        return filters
+    
     @staticmethod
     async def create(session: AsyncSession, data: Dict[str, Any]) -> Task:
         """Создать новую задачу."""
@@ -52,17 +164,7 @@ class TaskRepository(BaseRepository[Task]):
         query = select(Task)
         count_query = select(func.count()).select_from(Task)
         
-        conditions = []
-        
-        if filters:
-            if "status" in filters and filters["status"]:
-                conditions.append(Task.status == filters["status"])
-            if "priority" in filters and filters["priority"]:
-                conditions.append(Task.priority == filters["priority"])
-            if "created_from" in filters and filters["created_from"]:
-                conditions.append(Task.created_at >= filters["created_from"])
-            if "created_to" in filters and filters["created_to"]:
-                conditions.append(Task.created_at <= filters["created_to"])
+        conditions = TaskRepository._build_conditions(filters)
         
         if conditions:
             query = query.where(and_(*conditions))
@@ -71,7 +173,7 @@ class TaskRepository(BaseRepository[Task]):
         total_result = await session.execute(count_query)
         total = total_result.scalar()
         
-        query = query.order_by(Task.created_at.desc())
+        query = query.order_by(*TaskRepository._build_order(filters))
         query = query.offset(skip).limit(limit)
         
         result = await session.execute(query)
@@ -110,9 +212,32 @@ class TaskRepository(BaseRepository[Task]):
         return True
     
     @staticmethod
-    async def get_by_id(session: AsyncSession, task_id: UUID) -> Optional[Task]:
-        """Получить задачу по ID (алиас для get)."""
-        return await TaskRepository.get(session, task_id)
+    async def get_by_id(
+        session: AsyncSession,
+        task_id: UUID,
+        created_at: Optional[datetime] = None,
+    ) -> Optional[Task]:
+        """
+        Получить задачу по ID.
+        
+        Запрос только по id не отсекает секции: проверяется первичный ключ
+        каждой секции. Если время создания известно (например, из ключа
+        идемпотентности), условие по created_at оставляет одну секцию.
+        
+        Args:
+            session: Сессия базы данных
+            task_id: ID задачи
+            created_at: Время создания задачи (опционально)
+            
+        Returns:
+            Задача или None, если не найдена
+        """
+        if created_at is None:
+            return await TaskRepository.get(session, task_id)
+        result = await session.execute(
+            select(Task).where(Task.id == task_id, Task.created_at == created_at)
+        )
+        return result.scalar_one_or_none()
     
     @staticmethod
     async def get_list(
@@ -121,6 +246,8 @@ class TaskRepository(BaseRepository[Task]):
         priority: Optional[TaskPriority] = None,
         created_from: Optional[datetime] = None,
         created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
         page: int = 1,
         page_size: int = 10,
     ) -> Tuple[List[Task], int]:
@@ -129,19 +256,124 @@ class TaskRepository(BaseRepository[Task]):
         
         Метод для обратной совместимости, использует get_all внутри.
         """
-        filters = {}
-        if status:
-            filters["status"] = status
-        if priority:
-            filters["priority"] = priority
-        if created_from:
-            filters["created_from"] = created_from
-        if created_to:
-            filters["created_to"] = created_to
+        filters = TaskRepository._build_filters(
+            status, priority, created_from, created_to, result_contains, q
+        )
         
         skip = (page - 1) * page_size
         return await TaskRepository.get_all(session, skip=skip, limit=page_size, filters=filters)
     
+    @staticmethod
+    async def get_list_rows(
+        session: AsyncSession,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Получить страницу задач в виде словарей без создания ORM-объектов.
+        
+        Выбираются только колонки ответа, строки не попадают в identity map
+        сессии. Используется для быстрой сериализации списка задач.
+        
+        Returns:
+            Кортеж (список строк-словарей, общее количество)
+        """
+        filters = TaskRepository._build_filters(
+            status, priority, created_from, created_to, result_contains, q
+        )
+        conditions = TaskRepository._build_conditions(filters)
+        
+        query = select(*TASK_LIST_COLUMNS)
+        count_query = select(func.count()).select_from(Task)
+        
+        if conditions:
+            query = query.where(and_(*conditions))
+            count_query = count_query.where(and_(*conditions))
+        
+        total_result = await session.execute(count_query)
+        total = total_result.scalar()
+        
+        query = query.order_by(*TaskRepository._build_order(filters))
+        query = query.offset((page - 1) * page_size).limit(page_size)
+        
+        result = await session.execute(query)
+        rows = [dict(row) for row in result.mappings()]
+        
+        return rows, total
+    
+    @staticmethod
+    async def get_statuses(
+        session: AsyncSession,
+        task_ids: List[UUID],
+    ) -> List[Any]:
+        """
+        Получить статусы задач по списку ID (для снимка статусов подписчика).
+        
+        Args:
+            session: Сессия базы данных
+            task_ids: Список ID задач
+            
+        Returns:
+            Строки с колонками id, status, created_at, run_at, started_at, completed_at
+        """
+        result = await session.execute(
+            select(
+                Task.id,
+                Task.status,
+                Task.created_at,
+                Task.run_at,
+                Task.started_at,
+                Task.completed_at,
+            ).where(Task.id.in_(task_ids))
+        )
+        return list(result)
+    
+    @staticmethod
+    async def stream_rows(
+        session: AsyncSession,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Выбрать все подходящие задачи через серверный курсор.
+        
+        Строки читаются пачками по batch_size (yield_per), поэтому память
+        не растет с количеством строк. Запрос количества и OFFSET не
+        используются.
+        
+        Yields:
+            Пачки строк-словарей с колонками TASK_LIST_COLUMNS
+        """
+        filters = TaskRepository._build_filters(
+            status, priority, created_from, created_to, result_contains, q
+        )
+        query = select(*TASK_LIST_COLUMNS)
+        
+        conditions = TaskRepository._build_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
+        
+        query = query.order_by(*TaskRepository._build_order(filters))
+        query = query.execution_options(yield_per=batch_size)
+        
+        result = await session.stream(query)
+        try:
+            async for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+        finally:
+            await result.close()
+    
     @staticmethod
     async def update_status(
         session: AsyncSession,
@@ -151,8 +383,18 @@ class TaskRepository(BaseRepository[Task]):
         completed_at: Optional[datetime] = None,
         result: Optional[dict] = None,
         error_message: Optional[str] = None,
+        result_ref: Optional[str] = None,
+        result_size: Optional[int] = None,
+        result_checksum: Optional[str] = None,
+        lease_owner: Optional[str] = None,
+        lease_expires_at: Optional[datetime] = None,
     ) -> Optional[Task]:
-        """Обновить статус задачи."""
+        """
+        Обновить статус задачи.
+        
+        Если передан lease_expires_at, задача берется в аренду lease_owner
+        и счетчик попыток увеличивается.
+        """
         update_data = {"status": status}
         
         if started_at:
@@ -163,9 +405,487 @@ class TaskRepository(BaseRepository[Task]):
             update_data["result"] = result
         if error_message is not None:
             update_data["error_message"] = error_message
+        if result_ref is not None:
+            update_data["result_ref"] = result_ref
+            update_data["result_size"] = result_size
+            update_data["result_checksum"] = result_checksum
+        if lease_expires_at:
+            update_data["lease_owner"] = lease_owner
+            update_data["lease_expires_at"] = lease_expires_at
+            update_data["attempts"] = Task.attempts + 1
         
         return await TaskRepository.update(session, task_id, update_data)
     
+    @staticmethod
+    async def finish_processing(
+        session: AsyncSession,
+        task_id: UUID,
+        status: TaskStatus,
+        completed_at: datetime,
+        lease_owner: Optional[str] = None,
+        values: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Any]:
+        """
+        Записать итоговый статус обрабатываемой задачи (без фиксации транзакции).
+        
+        Статус меняется, только если задача все еще в IN_PROGRESS и (если
+        передан lease_owner) в аренде этого worker: задачу, отмененную или
+        возвращенную в очередь по истечении аренды, worker не перезапишет.
+        Аренда снимается в том же UPDATE, строка задачи остается
+        заблокированной до конца транзакции.
+        
+        Args:
+            session: Сессия базы данных
+            task_id: ID задачи
+            status: Итоговый статус (COMPLETED или FAILED)
+            completed_at: Время завершения
+            lease_owner: Идентификатор worker, владеющего арендой
+            values: Дополнительные значения колонок (результат, ошибка)
+            
+        Returns:
+            Строка задачи или None, если задача больше не обрабатывается этим worker
+        """
+        conditions = [Task.id == task_id, Task.status == TaskStatus.IN_PROGRESS]
+        if lease_owner is not None:
+            conditions.append(Task.lease_owner == lease_owner)
+        result = await session.execute(
+            update(Task)
+            .where(*conditions)
+            .values(
+                status=status,
+                completed_at=completed_at,
+                lease_owner=None,
+                lease_expires_at=None,
+                **(values or {}),
+            )
+            .returning(
+                Task.id,
+                Task.status,
+                Task.priority,
+                Task.created_at,
+                Task.run_at,
+                Task.started_at,
+                Task.completed_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is not None:
+            await session.run_sync(record_bulk_transitions, [row])
+            await session.run_sync(notify_bulk_transitions, [row])
+        return row
+    
+    @staticmethod
+    async def extend_leases(
+        session: AsyncSession,
+        task_ids: List[UUID],
+        owner: str,
+        expires_at: datetime,
+    ) -> int:
+        """
+        Продлить аренду задач одним запросом (без фиксации транзакции).
+        
+        Продлеваются только задачи в IN_PROGRESS, аренда которых все еще
+        принадлежит owner.
+        
+        Args:
+            session: Сессия базы данных
+            task_ids: ID задач
+            owner: Владелец аренды
+            expires_at: Новое время окончания аренды
+            
+        Returns:
+            Количество продленных задач
+        """
+        if not task_ids:
+            return 0
+        result = await session.execute(
+            update(Task)
+            .where(
+                Task.id.in_(task_ids),
+                Task.status == TaskStatus.IN_PROGRESS,
+                Task.lease_owner == owner,
+            )
+            .values(lease_expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    @staticmethod
+    async def claim_for_processing(
+        session: AsyncSession,
+        task_ids: List[UUID],
+        owner: str,
+        expires_at: datetime,
+        now: datetime,
+    ) -> List[Any]:
+        """
+        Взять задачи в обработку одним UPDATE ... RETURNING (без фиксации транзакции).
+        
+        Берутся только задачи в PENDING: повторно доставленные сообщения
+        о задачах, которые уже обрабатываются, завершены или отменены,
+        ничего не меняют. Задачи получают статус IN_PROGRESS и аренду
+        owner, счетчик попыток увеличивается. Агрегаты статистики и
+        события статусов записываются в той же транзакции.
+        
+        Args:
+            session: Сессия базы данных
+            task_ids: ID задач
+            owner: Владелец аренды
+            expires_at: Время окончания аренды
+            now: Время начала обработки
+            
+        Returns:
+            Строки с колонками id, name, description, priority, status, tenant_id,
+            created_at, run_at, started_at, completed_at и attempts
+        """
+        if not task_ids:
+            return []
+        result = await session.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.status == TaskStatus.PENDING)
+            .values(
+                status=TaskStatus.IN_PROGRESS,
+                started_at=now,
+                lease_owner=owner,
+                lease_expires_at=expires_at,
+                attempts=Task.attempts + 1,
+            )
+            .returning(
+                Task.id,
+                Task.name,
+                Task.description,
+                Task.priority,
+                Task.status,
+                Task.tenant_id,
+                Task.created_at,
+                Task.run_at,
+                Task.started_at,
+                Task.completed_at,
+                Task.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result)
+        if rows:
+            await session.run_sync(record_bulk_transitions, rows)
+            await session.run_sync(notify_bulk_transitions, rows)
+        return rows
+    
+    @staticmethod
+    async def lock_expired_leases(session: AsyncSession, now: datetime, limit: int) -> List[Task]:
+        """
+        Заблокировать задачи в IN_PROGRESS с истекшей арендой.
+        
+        Использует частичный индекс ix_tasks_lease_expires_at, строки
+        блокируются с SKIP LOCKED до конца транзакции вызывающего.
+        
+        Args:
+            session: Сессия базы данных
+            now: Текущее время
+            limit: Максимальное количество задач
+            
+        Returns:
+            Задачи по возрастанию lease_expires_at
+        """
+        result = await session.execute(
+            select(Task)
+            .where(Task.status == TaskStatus.IN_PROGRESS, Task.lease_expires_at < now)
+            .order_by(Task.lease_expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars())
+    
+    @staticmethod
+    async def bulk_update_status(
+        session: AsyncSession,
+        from_statuses: Tuple[TaskStatus, ...],
+        status: TaskStatus,
+        limit: int,
+        task_ids: Optional[List[UUID]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        values: Optional[Dict[str, Any]] = None,
+        lease_owner: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Сменить статус множества задач одним UPDATE ... RETURNING (без фиксации транзакции).
+        
+        Задачи выбираются по списку ID или по фильтрам и блокируются
+        в подзапросе (в порядке created_at, не больше limit). Меняются
+        только задачи в статусах from_statuses. Агрегаты статистики и
+        события статусов записываются в той же транзакции.
+        
+        Args:
+            session: Сессия базы данных
+            from_statuses: Статусы, из которых разрешен переход
+            status: Новый статус
+            limit: Максимальное количество задач
+            task_ids: ID задач
+            filters: Словарь фильтров (как у списка задач)
+            values: Дополнительные значения колонок
+            lease_owner: Менять только задачи в аренде этого worker
+            
+        Returns:
+            Строки с колонками id, status, priority, tenant_id, created_at, run_at,
+            started_at, completed_at и previous_status
+        """
+        conditions = TaskRepository._build_conditions(filters)
+        if task_ids is not None:
+            conditions.append(Task.id.in_(task_ids))
+        if lease_owner is not None:
+            conditions.append(Task.lease_owner == lease_owner)
+        target = (
+            select(Task.id, Task.created_at, Task.status)
+            .where(Task.status.in_(from_statuses), *conditions)
+            .order_by(Task.created_at)
+            .limit(limit)
+            .with_for_update()
+            .subquery()
+        )
+        result = await session.execute(
+            update(Task)
+            .where(Task.id == target.c.id, Task.created_at == target.c.created_at)
+            .values(status=status, **(values or {}))
+            .returning(
+                Task.id,
+                Task.status,
+                Task.priority,
+                Task.tenant_id,
+                Task.created_at,
+                Task.run_at,
+                Task.started_at,
+                Task.completed_at,
+                target.c.status.label("previous_status"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result)
+        if rows:
+            await session.run_sync(record_bulk_transitions, rows)
+            await session.run_sync(notify_bulk_transitions, rows)
+        return rows
+    
+    @staticmethod
+    async def get_scheduled(
+        session: AsyncSession,
+        until: datetime,
+        limit: int,
+    ) -> List[Any]:
+        """
+        Получить запланированные задачи со временем запуска до until.
+        
+        Использует частичный индекс ix_tasks_scheduled_run_at, поэтому
+        стоимость зависит от limit, а не от числа будущих задач.
+        
+        Args:
+            session: Сессия базы данных
+            until: Граница времени запуска (включительно)
+            limit: Максимальное количество задач
+            
+        Returns:
+            Строки с колонками id, created_at, run_at по возрастанию run_at
+        """
+        result = await session.execute(
+            select(Task.id, Task.created_at, Task.run_at)
+            .where(Task.status == TaskStatus.SCHEDULED, Task.run_at <= until)
+            .order_by(Task.run_at)
+            .limit(limit)
+        )
+        return list(result)
+    
+    @staticmethod
+    async def claim_scheduled(
+        session: AsyncSession,
+        keys: List[Tuple[UUID, datetime]],
+        now: datetime,
+    ) -> List[Tuple[UUID, str]]:
+        """
+        Перевести наступившие запланированные задачи в PENDING.
+        
+        Строки блокируются с SKIP LOCKED, поэтому несколько планировщиков
+        не отправят одну задачу дважды. Отмененные задачи пропускаются.
+        
+        Args:
+            session: Сессия базы данных
+            keys: Пары (id, created_at) задач
+            now: Текущее время
+            
+        Returns:
+            Пары (id, tenant_id) задач, переведенных в PENDING
+        """
+        result = await session.execute(
+            select(Task)
+            .where(
+                tuple_(Task.id, Task.created_at).in_(keys),
+                Task.status == TaskStatus.SCHEDULED,
+                Task.run_at <= now,
+            )
+            .with_for_update(skip_locked=True)
+        )
+        tasks = list(result.scalars())
+        for task in tasks:
+            task.status = TaskStatus.PENDING
+        await session.commit()
+        return [(task.id, task.tenant_id) for task in tasks]
+    
+    @staticmethod
+    async def lock_parents(session: AsyncSession, parent_ids: List[UUID]) -> List[Any]:
+        """
+        Прочитать статусы родительских задач с блокировкой FOR SHARE.
+        
+        Блокировка не дает родителю сменить статус до фиксации транзакции,
+        добавляющей зависимость, поэтому завершение родителя гарантированно
+        видит добавленное ребро (см. release_children).
+        
+        Args:
+            session: Сессия базы данных
+            parent_ids: ID родительских задач
+            
+        Returns:
+            Строки с колонками id, status
+        """
+        result = await session.execute(
+            select(Task.id, Task.status)
+            .where(Task.id.in_(parent_ids))
+            .with_for_update(read=True)
+        )
+        return list(result)
+    
+    @staticmethod
+    async def add_dependencies(
+        session: AsyncSession,
+        child_id: UUID,
+        child_created_at: datetime,
+        parent_ids: List[UUID],
+    ) -> None:
+        """Добавить ребра зависимостей задачи (без фиксации транзакции)."""
+        await session.execute(
+            insert(TaskDependency),
+            [
+                {"parent_id": parent_id, "child_id": child_id, "child_created_at": child_created_at}
+                for parent_id in parent_ids
+            ],
+        )
+    
+    @staticmethod
+    async def _take_children(session: AsyncSession, parent_ids: List[UUID]) -> List[Tuple[UUID, datetime]]:
+        # Строки родителей блокируются до удаления ребер: добавление
+        # зависимости ждет фиксации смены статуса родителя (см. lock_parents)
+        await session.execute(
+            select(Task.id).where(Task.id.in_(parent_ids)).with_for_update()
+        )
+        result = await session.execute(
+            delete(TaskDependency)
+            .where(TaskDependency.parent_id.in_(parent_ids))
+            .returning(TaskDependency.child_id, TaskDependency.child_created_at)
+        )
+        return [tuple(row) for row in result]
+    
+    @staticmethod
+    async def release_children(session: AsyncSession, parent_id: UUID, now: datetime) -> List[Task]:
+        """
+        Уменьшить счетчик незавершенных родителей у дочерних задач.
+        
+        Вызывается в транзакции, завершающей родителя, до фиксации. Ребра
+        родителя удаляются, поэтому повторное завершение ничего не меняет.
+        Задачи, у которых счетчик дошел до нуля, переходят из WAITING в
+        PENDING (или SCHEDULED, если run_at еще не наступил).
+        
+        Args:
+            session: Сессия базы данных
+            parent_id: ID завершенной задачи
+            now: Текущее время
+            
+        Returns:
+            Освобожденные задачи
+        """
+        keys = await TaskRepository._take_children(session, [parent_id])
+        if not keys:
+            return []
+        
+        result = await session.execute(
+            update(Task)
+            .where(tuple_(Task.id, Task.created_at).in_(keys), Task.status == TaskStatus.WAITING)
+            .values(pending_parents=Task.pending_parents - 1)
+            .returning(Task.id, Task.created_at, Task.pending_parents)
+            .execution_options(synchronize_session=False)
+        )
+        ready = [(row.id, row.created_at) for row in result if row.pending_parents <= 0]
+        if not ready:
+            return []
+        
+        result = await session.execute(
+            select(Task)
+            .where(tuple_(Task.id, Task.created_at).in_(ready))
+            .execution_options(populate_existing=True)
+        )
+        tasks = list(result.scalars())
+        for task in tasks:
+            task.status = TaskStatus.SCHEDULED if task.run_at and task.run_at > now else TaskStatus.PENDING
+        return tasks
+    
+    @staticmethod
+    async def finish_dependents(
+        session: AsyncSession,
+        parent_id: UUID,
+        status: TaskStatus,
+        error_message: str,
+        now: datetime,
+    ) -> int:
+        """
+        Завершить ожидающие задачи, зависящие от проваленной или отмененной.
+        
+        Вызывается в транзакции, завершающей родителя, до фиксации.
+        Статус передается по цепочке зависимостей на всю глубину.
+        
+        Args:
+            session: Сессия базы данных
+            parent_id: ID проваленной или отмененной задачи
+            status: Статус для зависимых задач (FAILED или CANCELLED)
+            error_message: Сообщение об ошибке для зависимых задач
+            now: Текущее время
+            
+        Returns:
+            Количество завершенных зависимых задач
+        """
+        return await TaskRepository.finish_dependents_of(session, [parent_id], status, error_message, now)
+    
+    @staticmethod
+    async def finish_dependents_of(
+        session: AsyncSession,
+        parent_ids: List[UUID],
+        status: TaskStatus,
+        error_message: str,
+        now: datetime,
+    ) -> int:
+        """
+        Завершить ожидающие задачи, зависящие от любой из задач parent_ids.
+        
+        То же, что finish_dependents, для нескольких родителей сразу.
+        
+        Returns:
+            Количество завершенных зависимых задач
+        """
+        finished = 0
+        while parent_ids:
+            keys = await TaskRepository._take_children(session, parent_ids)
+            if not keys:
+                break
+            result = await session.execute(
+                select(Task)
+                .where(tuple_(Task.id, Task.created_at).in_(keys), Task.status == TaskStatus.WAITING)
+                .with_for_update()
+            )
+            tasks = list(result.scalars())
+            for task in tasks:
+                task.status = status
+                task.completed_at = now
+                task.error_message = error_message
+            finished += len(tasks)
+            parent_ids = [task.id for task in tasks]
+        return finished
+    
     @staticmethod
     async def cancel(session: AsyncSession, task_id: UUID) -> Optional[Task]:
         """Отменить задачу."""
@@ -0,0 +1,61 @@
+"""Репозиторий реестра worker."""
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import Worker
+
+
+class WorkerRepository:
+    """Репозиторий для работы с реестром worker."""
+
+    @staticmethod
+    async def heartbeat(
+        session: AsyncSession,
+        worker_id: str,
+        hostname: str,
+        pid: int,
+        started_at: datetime,
+        now: datetime,
+        in_flight: int,
+    ) -> None:
+        """Создать или обновить запись worker (без фиксации транзакции)."""
+        statement = insert(Worker).values(
+            id=worker_id,
+            hostname=hostname,
+            pid=pid,
+            started_at=started_at,
+            heartbeat_at=now,
+            in_flight=in_flight,
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Worker.id],
+                set_={"heartbeat_at": now, "in_flight": in_flight},
+            )
+        )
+
+    @staticmethod
+    async def get_live(session: AsyncSession, since: datetime) -> List[Worker]:
+        """Получить worker с heartbeat не раньше since."""
+        result = await session.execute(
+            select(Worker)
+            .where(Worker.heartbeat_at >= since)
+            .order_by(Worker.started_at)
+        )
+        return list(result.scalars())
+
+    @staticmethod
+    async def delete(session: AsyncSession, worker_id: str) -> None:
+        """Удалить запись worker."""
+        await session.execute(delete(Worker).where(Worker.id == worker_id))
+        await session.commit()
+
+    @staticmethod
+    async def delete_stale(session: AsyncSession, before: datetime) -> int:
+        """Удалить записи worker без heartbeat с before (без фиксации транзакции)."""
+        result = await session.execute(delete(Worker).where(Worker.heartbeat_at < before))
+        return result.rowcount
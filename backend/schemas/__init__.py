@@ -6,17 +6,33 @@ from backend.schemas.task import (
     TaskResponse,
     TaskStatusResponse,
     TaskListResponse,
+    TaskBulkFilter,
+    TaskBulkRequest,
+    TaskBulkResponse,
+    TaskBulkStatusRequest,
 )
 from backend.schemas.errors import (
     ErrorResponse,
     NotFoundErrorResponse,
     BadRequestErrorResponse,
+    ConflictErrorResponse,
+    TooManyRequestsErrorResponse,
     InternalServerErrorResponse,
     ValidationErrorResponse,
 )
+from backend.schemas.admin import PoolStatsResponse, WorkerResponse
+from backend.schemas.stats import (
+    StatusCount,
+    ThroughputPoint,
+    LatencyPercentiles,
+    TaskStatsResponse,
+)
+from backend.schemas.recurring import RecurringTaskCreate, RecurringTaskResponse
 from backend.schemas.filters import (
+    TaskFilterParams,
     TaskFilterQueryParams,
     TaskFilterDepends,
+    TaskExportFilterDepends,
 )
 
 __all__ = [
@@ -26,12 +42,28 @@ __all__ = [
     "TaskResponse",
     "TaskStatusResponse",
     "TaskListResponse",
+    "TaskBulkFilter",
+    "TaskBulkRequest",
+    "TaskBulkResponse",
+    "TaskBulkStatusRequest",
     "ErrorResponse",
     "NotFoundErrorResponse",
     "BadRequestErrorResponse",
+    "ConflictErrorResponse",
+    "TooManyRequestsErrorResponse",
     "InternalServerErrorResponse",
     "ValidationErrorResponse",
+    "PoolStatsResponse",
+    "WorkerResponse",
+    "StatusCount",
+    "ThroughputPoint",
+    "LatencyPercentiles",
+    "TaskStatsResponse",
+    "TaskFilterParams",
     "TaskFilterQueryParams",
     "TaskFilterDepends",
+    "TaskExportFilterDepends",
+    "RecurringTaskCreate",
+    "RecurringTaskResponse",
 ]
 
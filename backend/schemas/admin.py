@@ -0,0 +1,30 @@
+"""Схемы для служебных эндпоинтов."""
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class PoolStatsResponse(BaseModel):
+    """Схема ответа со статистикой пула соединений БД."""
+    pool_size: int = Field(..., description="Базовый размер пула")
+    max_overflow: int = Field(..., description="Максимум дополнительных соединений")
+    checked_out: int = Field(..., description="Соединений выдано сейчас")
+    checked_in: int = Field(..., description="Свободных соединений в пуле")
+    overflow: int = Field(..., description="Открыто дополнительных соединений сверх pool_size")
+    checkouts: int = Field(..., description="Всего выдач соединений")
+    checkout_timeouts: int = Field(..., description="Выдач, завершившихся таймаутом")
+    checkout_wait_avg_ms: float = Field(..., description="Среднее время ожидания соединения, мс")
+    checkout_wait_max_ms: float = Field(..., description="Максимальное время ожидания соединения, мс")
+
+
+class WorkerResponse(BaseModel):
+    """Схема ответа с записью реестра worker."""
+    id: str = Field(..., description="Идентификатор worker (хост:pid:суффикс)")
+    hostname: str = Field(..., description="Имя хоста")
+    pid: int = Field(..., description="ID процесса")
+    started_at: datetime = Field(..., description="Время запуска")
+    heartbeat_at: datetime = Field(..., description="Время последнего heartbeat")
+    in_flight: int = Field(..., description="Задач в обработке на момент heartbeat")
+    
+    class Config:
+        from_attributes = True
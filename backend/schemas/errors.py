@@ -17,6 +17,16 @@ class BadRequestErrorResponse(ErrorResponse):
     pass
 
 
+class ConflictErrorResponse(ErrorResponse):
+    """Схема ошибки 409 - конфликт состояния."""
+    pass
+
+
+class TooManyRequestsErrorResponse(ErrorResponse):
+    """Схема ошибки 429 - превышен лимит запросов."""
+    pass
+
+
 class ValidationErrorResponse(BaseModel):
     """Схема ошибки 422 - ошибка валидации."""
     detail: list[dict] = Field(..., description="Список ошибок валидации")
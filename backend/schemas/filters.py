@@ -1,26 +1,64 @@
 """Схемы для фильтрации и пагинации."""
+import json
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, Any, Dict, Optional
 from uuid import UUID
 
 from fastapi import Depends
 from pydantic import BaseModel, Field
 
+from backend.exceptions import InvalidTaskFilterError
 from backend.models import TaskStatus, TaskPriority
 
 
-class TaskFilterQueryParams(BaseModel):
-    """Параметры фильтрации и пагинации для списка задач."""
+class TaskFilterParams(BaseModel):
+    """Параметры фильтрации задач."""
     
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
     created_from: Optional[datetime] = None
     created_to: Optional[datetime] = None
+    result_contains: Optional[str] = Field(
+        None,
+        description='JSON-объект, который должен входить в результат задачи, например {"status": "partial"}',
+    )
+    q: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=256,
+        description="Полнотекстовый поиск по названию и описанию задачи",
+    )
+    
+    def result_filter(self) -> Optional[Dict[str, Any]]:
+        """
+        Разобрать фильтр result_contains.
+        
+        Returns:
+            JSON-объект для условия result @> ... или None
+            
+        Raises:
+            InvalidTaskFilterError: Если значение не является JSON-объектом
+        """
+        if not self.result_contains:
+            return None
+        try:
+            value = json.loads(self.result_contains)
+        except ValueError:
+            raise InvalidTaskFilterError("result_contains must be a valid JSON object")
+        if not isinstance(value, dict):
+            raise InvalidTaskFilterError("result_contains must be a valid JSON object")
+        return value
+
+
+class TaskFilterQueryParams(TaskFilterParams):
+    """Параметры фильтрации и пагинации для списка задач."""
+    
     page: int = Field(1, ge=1, description="Номер страницы")
     page_size: int = Field(10, ge=1, le=100, description="Размер страницы")
 
 
 TaskFilterDepends = Annotated[TaskFilterQueryParams, Depends()]
+TaskExportFilterDepends = Annotated[TaskFilterParams, Depends()]
 
 
 
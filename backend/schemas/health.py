@@ -0,0 +1,26 @@
+"""Схемы для проверок состояния."""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class LivenessResponse(BaseModel):
+    """Схема ответа liveness-проверки."""
+    status: str = Field("ok", description="Статус процесса")
+
+
+class DependencyState(BaseModel):
+    """Закэшированное состояние зависимостей процесса."""
+    database: bool = Field(False, description="База данных доступна")
+    broker: bool = Field(False, description="Соединение с RabbitMQ установлено")
+    queue_depth: Optional[int] = Field(None, description="Задач в очереди (в статусе PENDING)")
+    queue_messages: Optional[int] = Field(None, description="Сообщений в очередях задач RabbitMQ")
+    queue_consumers: Optional[int] = Field(None, description="Потребителей очереди задач")
+    checked_at: Optional[datetime] = Field(None, description="Время последней проверки (UTC)")
+    errors: dict[str, str] = Field(default_factory=dict, description="Ошибки последней проверки")
+
+
+class ReadinessResponse(DependencyState):
+    """Схема ответа readiness-проверки."""
+    status: str = Field(..., description="ready или not_ready")
@@ -0,0 +1,53 @@
+"""Pydantic схемы для повторяющихся задач."""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from backend.models import DEFAULT_TENANT, TaskPriority
+
+
+class RecurringTaskCreate(BaseModel):
+    """Схема для создания повторяющейся задачи."""
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    priority: TaskPriority = TaskPriority.MEDIUM
+    tenant_id: str = Field(
+        DEFAULT_TENANT,
+        min_length=1,
+        max_length=64,
+        pattern=r"^[A-Za-z0-9_.-]+$",
+        description="Арендатор создаваемых задач",
+    )
+    cron: str = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Расписание в формате cron (5 полей, UTC), например `*/15 * * * *`",
+    )
+    jitter_seconds: int = Field(
+        0,
+        ge=0,
+        le=3600,
+        description="Максимальная случайная задержка запуска в секундах",
+    )
+    enabled: bool = True
+
+
+class RecurringTaskResponse(BaseModel):
+    """Схема ответа с повторяющейся задачей."""
+    id: UUID
+    name: str
+    description: Optional[str] = None
+    priority: TaskPriority
+    tenant_id: str
+    cron: str
+    jitter_seconds: int
+    enabled: bool
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
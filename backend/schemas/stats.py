@@ -0,0 +1,51 @@
+"""Схемы для статистики задач."""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from backend.models import TaskStatus, TaskPriority
+
+
+class StatusCount(BaseModel):
+    """Количество переходов в статус для приоритета."""
+    status: TaskStatus
+    priority: TaskPriority
+    count: int
+
+
+class ThroughputPoint(BaseModel):
+    """Количество завершенных задач за минуту."""
+    bucket: datetime = Field(..., description="Начало минуты (UTC)")
+    completed: int = 0
+    failed: int = 0
+
+
+class LatencyPercentiles(BaseModel):
+    """Перцентили длительности в миллисекундах."""
+    count: int = Field(0, description="Количество измерений")
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class TaskStatsResponse(BaseModel):
+    """Схема ответа со статистикой задач за окно времени."""
+    window_from: datetime
+    window_to: datetime
+    counts: list[StatusCount] = Field(
+        ...,
+        description="Сколько задач перешли в каждый статус за окно, по приоритетам",
+    )
+    throughput: list[ThroughputPoint] = Field(
+        ...,
+        description="Завершенные и проваленные задачи по минутам (минуты без событий пропущены)",
+    )
+    queue_wait: LatencyPercentiles = Field(
+        ...,
+        description="Время ожидания в очереди (started_at - created_at), мс",
+    )
+    run_duration: LatencyPercentiles = Field(
+        ...,
+        description="Время выполнения (completed_at - started_at), мс",
+    )
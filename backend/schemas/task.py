@@ -1,11 +1,14 @@
 """Pydantic схемы для задач."""
-from datetime import datetime
-from typing import Optional, Any
+from datetime import datetime, timezone
+from typing import List, Optional, Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from backend.models import TaskStatus, TaskPriority
+from backend.models import DEFAULT_TENANT, TaskStatus, TaskPriority
+
+# Максимум задач в одной массовой операции (ограничение числа параметров запроса)
+BULK_MAX_TASKS = 10000
 
 
 class TaskBase(BaseModel):
@@ -17,7 +20,36 @@ class TaskBase(BaseModel):
 
 class TaskCreate(TaskBase):
     """Схема для создания задачи."""
-    pass
+    tenant_id: str = Field(
+        DEFAULT_TENANT,
+        min_length=1,
+        max_length=64,
+        pattern=r"^[A-Za-z0-9_.-]+$",
+        description="Арендатор (клиент) задачи: лимит частоты создания и доля обработки считаются по нему",
+    )
+    run_at: Optional[datetime] = Field(
+        None,
+        description="Время запуска задачи (UTC, если часовой пояс не указан)",
+    )
+    depends_on: List[UUID] = Field(
+        default_factory=list,
+        max_length=100,
+        description="ID задач, после успешного завершения которых задача отправляется в очередь",
+    )
+    
+    @field_validator("run_at")
+    @classmethod
+    def run_at_to_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Привести run_at к UTC без часового пояса, как остальные даты в БД."""
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    
+    @field_validator("depends_on")
+    @classmethod
+    def unique_depends_on(cls, value: List[UUID]) -> List[UUID]:
+        """Убрать повторяющиеся ID родительских задач."""
+        return list(dict.fromkeys(value))
 
 
 class TaskUpdate(BaseModel):
@@ -31,10 +63,24 @@ class TaskResponse(TaskBase):
     """Схема ответа с информацией о задаче."""
     id: UUID
     status: TaskStatus
+    tenant_id: str = DEFAULT_TENANT
     created_at: datetime
+    run_at: Optional[datetime] = None
+    pending_parents: int = Field(
+        0,
+        description="Количество незавершенных родительских задач (для статуса WAITING)",
+    )
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     result: Optional[dict[str, Any]] = None
+    result_size: Optional[int] = Field(
+        None,
+        description="Размер результата в байтах, если он вынесен во внешнее хранилище",
+    )
+    result_checksum: Optional[str] = Field(
+        None,
+        description="SHA-256 результата, если он вынесен во внешнее хранилище",
+    )
     error_message: Optional[str] = None
     
     class Config:
@@ -46,6 +92,7 @@ class TaskStatusResponse(BaseModel):
     id: UUID
     status: TaskStatus
     created_at: datetime
+    run_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     
@@ -62,4 +109,45 @@ class TaskListResponse(BaseModel):
     pages: int
 
 
+class TaskBulkFilter(BaseModel):
+    """Фильтр задач для массовой операции."""
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    tenant_id: Optional[str] = Field(None, min_length=1, max_length=64)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class TaskBulkRequest(BaseModel):
+    """Схема массовой операции над задачами: список ID или фильтр."""
+    task_ids: Optional[List[UUID]] = Field(
+        None,
+        min_length=1,
+        max_length=BULK_MAX_TASKS,
+        description="ID задач",
+    )
+    filter: Optional[TaskBulkFilter] = Field(None, description="Фильтр задач")
+    limit: int = Field(
+        1000,
+        ge=1,
+        le=BULK_MAX_TASKS,
+        description="Максимум задач за один запрос при выборе по фильтру",
+    )
+    
+    @model_validator(mode="after")
+    def ids_or_filter(self) -> "TaskBulkRequest":
+        """Задается ровно одно из task_ids и filter."""
+        if (self.task_ids is None) == (self.filter is None):
+            raise ValueError("Exactly one of task_ids and filter must be set")
+        return self
+
+
+class TaskBulkResponse(BaseModel):
+    """Схема ответа массовой операции."""
+    task_ids: List[UUID] = Field(..., description="ID задач, статус которых изменен")
+    count: int = Field(..., description="Количество измененных задач")
+
 
+class TaskBulkStatusRequest(BaseModel):
+    """Схема запроса статусов нескольких задач."""
+    task_ids: List[UUID] = Field(..., min_length=1, max_length=BULK_MAX_TASKS)
@@ -0,0 +1,175 @@
+"""Контроль приема задач по глубине очереди и скорости обработки."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.exceptions import QueueOverloadedError
+from backend.models import TaskStatus
+from backend.repository import StatsRepository
+from backend.repository.stats_repository import minute_bucket
+from backend.services.health_service import HealthMonitor, health_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Отказ в создании задач при перегрузке очереди.
+
+    Глубина очереди (задач в статусе PENDING) берется из закэшированного
+    состояния HealthMonitor, скорость обработки (задач в секунду, взятых
+    worker в работу) — из поминутных агрегатов task_stats и обновляется
+    в фоне. Проверка
+    запроса не выполняет I/O. Допустимая глубина — минимум из
+    max_queue_depth и скорости, умноженной на max_queue_wait; при её
+    превышении клиенту сообщается, через сколько секунд очередь
+    разберется до допустимой глубины.
+
+    Пока данных нет или они устарели, задачи принимаются. Если скорость
+    неизвестна или нулевая (например, после простоя), ограничение по
+    времени ожидания не применяется.
+    """
+
+    def __init__(
+        self,
+        monitor: HealthMonitor,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        max_queue_depth: int = 0,
+        max_queue_wait: float = 0.0,
+        rate_window: int = 300,
+        interval: float = 5.0,
+        max_retry_after: int = 300,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            monitor: Монитор зависимостей с глубиной очереди
+            session_factory: Фабрика сессий
+            max_queue_depth: Максимальная глубина очереди (0 — не ограничивать)
+            max_queue_wait: Максимальное ожидаемое время в очереди в секундах (0 — не ограничивать)
+            rate_window: Окно измерения скорости обработки в секундах
+            interval: Интервал обновления скорости в секундах
+            max_retry_after: Максимальное значение Retry-After в секундах
+        """
+        self.monitor = monitor
+        self.session_factory = session_factory
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_wait = max_queue_wait
+        self.rate_window = rate_window
+        self.interval = interval
+        self.max_retry_after = max_retry_after
+        self.rate: Optional[float] = None
+        self.rate_checked_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Включен ли контроль приема."""
+        return self.max_queue_depth > 0 or self.max_queue_wait > 0
+
+    async def refresh(self, now: Optional[datetime] = None) -> float:
+        """
+        Измерить скорость обработки по агрегатам task_stats.
+
+        Args:
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Задач в секунду, взятых в работу за окно
+        """
+        now = now or datetime.utcnow()
+        window_from = minute_bucket(now - timedelta(seconds=self.rate_window))
+        async with self.session_factory() as session:
+            counts = await StatsRepository.get_status_counts(session, window_from, now + timedelta(minutes=1))
+
+        started = sum(count for status, _, count in counts if status == TaskStatus.IN_PROGRESS)
+        self.rate = started / max((now - window_from).total_seconds(), 1.0)
+        self.rate_checked_at = now
+        return self.rate
+
+    def allowed_depth(self) -> Optional[float]:
+        """Допустимая глубина очереди по последнему измерению (None — без ограничения)."""
+        limits = []
+        if self.max_queue_depth > 0:
+            limits.append(float(self.max_queue_depth))
+        # Без измеренной скорости (нет данных или простой) время ожидания
+        # не оценить: действует только max_queue_depth
+        if self.max_queue_wait > 0 and self.rate:
+            limits.append(self.rate * self.max_queue_wait)
+        return min(limits) if limits else None
+
+    def retry_after(self) -> Optional[float]:
+        """
+        Время в секундах, через которое стоит повторить создание задачи.
+
+        Returns:
+            None, если задачу можно принять
+        """
+        if not self.enabled:
+            return None
+        state = self.monitor.state
+        if state.queue_depth is None or state.checked_at is None:
+            return None
+        if (datetime.utcnow() - state.checked_at).total_seconds() > self.monitor.interval * 3:
+            return None
+
+        allowed = self.allowed_depth()
+        if allowed is None or state.queue_depth <= allowed:
+            return None
+        if not self.rate:
+            return float(self.max_retry_after)
+        excess = state.queue_depth - allowed
+        return min(max(excess / self.rate, 1.0), float(self.max_retry_after))
+
+    def check(self) -> None:
+        """
+        Проверить, можно ли принять задачу.
+
+        Raises:
+            QueueOverloadedError: Если очередь перегружена
+        """
+        wait = self.retry_after()
+        if wait is not None:
+            raise QueueOverloadedError(
+                f"Task queue is overloaded ({self.monitor.state.queue_depth} tasks), retry later",
+                retry_after=wait,
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Consumer rate check failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запустить фоновое измерение скорости (если контроль включен)."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновое измерение скорости."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+admission_controller = AdmissionController(
+    monitor=health_monitor,
+    max_queue_depth=settings.admission_max_queue_depth,
+    max_queue_wait=settings.admission_max_queue_wait,
+    rate_window=settings.admission_rate_window,
+    interval=settings.admission_check_interval,
+    max_retry_after=settings.admission_max_retry_after,
+)
@@ -0,0 +1,126 @@
+"""Хранилище крупных результатов задач вне таблицы tasks."""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Annotated, AsyncIterator
+from uuid import UUID
+
+from fastapi import Depends
+
+from backend.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+def result_key(task_id: UUID) -> str:
+    """
+    Ключ объекта с результатом задачи.
+
+    Объекты раскладываются по подкаталогам по первым символам ID,
+    чтобы не держать все файлы в одном каталоге.
+    """
+    value = str(task_id)
+    return f"{value[:2]}/{value}.json.gz"
+
+
+class BlobStore(ABC):
+    """Абстрактное хранилище бинарных объектов по ключу."""
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes) -> None:
+        """
+        Сохранить объект (перезаписывает существующий).
+
+        Args:
+            key: Ключ объекта
+            data: Содержимое объекта
+        """
+
+    @abstractmethod
+    def open(self, key: str) -> AsyncIterator[bytes]:
+        """
+        Прочитать объект по частям.
+
+        Args:
+            key: Ключ объекта
+
+        Returns:
+            Асинхронный итератор по частям содержимого
+
+        Raises:
+            FileNotFoundError: Если объект не найден
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Удалить объект, если он существует.
+
+        Args:
+            key: Ключ объекта
+        """
+
+
+class LocalFileBlobStore(BlobStore):
+    """Хранилище объектов в локальной файловой системе."""
+
+    def __init__(self, root: str):
+        """
+        Инициализация хранилища.
+
+        Args:
+            root: Корневой каталог хранилища
+        """
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def put(self, key: str, data: bytes) -> None:
+        """Сохранить объект атомарно (через временный файл)."""
+        await asyncio.to_thread(self._write, key, data)
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        """Прочитать объект частями по CHUNK_SIZE байт."""
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
+    def _remove(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    async def delete(self, key: str) -> None:
+        """Удалить объект, если он существует."""
+        await asyncio.to_thread(self._remove, key)
+
+
+result_store = LocalFileBlobStore(settings.result_storage_dir)
+
+
+def get_blob_store() -> BlobStore:
+    """Dependency для получения хранилища результатов."""
+    return result_store
+
+
+BlobStoreDep = Annotated[BlobStore, Depends(get_blob_store)]
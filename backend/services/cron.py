@@ -0,0 +1,148 @@
+"""Разбор cron-выражений и вычисление времени следующего запуска."""
+from datetime import datetime, timedelta
+from typing import FrozenSet, Tuple
+
+from backend.exceptions import InvalidCronExpressionError
+
+# (минимум, максимум) для полей: минута, час, день месяца, месяц, день недели
+FIELD_RANGES: Tuple[Tuple[int, int], ...] = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+MONTH_NAMES = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+DAY_NAMES = {name: number for number, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# Дальше этого горизонта выражение считается невыполнимым (например, 30 февраля)
+MAX_SEARCH_YEARS = 5
+
+
+def _value(token: str, names: dict, expression: str) -> int:
+    token = token.lower()
+    if token in names:
+        return names[token]
+    if not token.isdigit():
+        raise InvalidCronExpressionError(f"Invalid cron expression '{expression}': bad value '{token}'")
+    return int(token)
+
+
+def _parse_field(field: str, bounds: Tuple[int, int], names: dict, expression: str) -> FrozenSet[int]:
+    low, high = bounds
+    values = set()
+    for part in field.split(","):
+        spec, _, step_text = part.partition("/")
+        step = _value(step_text, {}, expression) if step_text else 1
+        if step < 1:
+            raise InvalidCronExpressionError(f"Invalid cron expression '{expression}': zero step")
+
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start_text, _, end_text = spec.partition("-")
+            start, end = _value(start_text, names, expression), _value(end_text, names, expression)
+        else:
+            start = _value(spec, names, expression)
+            end = high if step_text else start
+
+        if not low <= start <= end <= high:
+            raise InvalidCronExpressionError(
+                f"Invalid cron expression '{expression}': '{part}' is out of range {low}-{high}"
+            )
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    Расписание в формате cron из пяти полей: минута, час, день месяца,
+    месяц, день недели.
+
+    Поддерживаются `*`, списки, диапазоны, шаги (`*/15`, `1-30/5`),
+    имена месяцев и дней недели и алиасы вида `@hourly`. Как в Vixie cron,
+    если ограничены и день месяца, и день недели, достаточно совпадения
+    любого из них. Время — UTC без часового пояса.
+    """
+
+    def __init__(self, expression: str):
+        """
+        Разобрать выражение.
+
+        Args:
+            expression: Cron-выражение
+
+        Raises:
+            InvalidCronExpressionError: Если выражение некорректно
+        """
+        self.expression = expression
+        fields = ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise InvalidCronExpressionError(
+                f"Invalid cron expression '{expression}': expected 5 fields, got {len(fields)}"
+            )
+
+        names = ({}, {}, {}, MONTH_NAMES, DAY_NAMES)
+        self.minutes, self.hours, self.days, self.months, days_of_week = (
+            _parse_field(field, bounds, field_names, expression)
+            for field, bounds, field_names in zip(fields, FIELD_RANGES, names)
+        )
+        # 7 — тоже воскресенье
+        self.days_of_week = frozenset(day % 7 for day in days_of_week)
+        self.any_day = fields[2] == "*"
+        self.any_day_of_week = fields[4] == "*"
+
+    def _day_matches(self, value: datetime) -> bool:
+        day_ok = value.day in self.days
+        # datetime.weekday(): понедельник = 0, в cron воскресенье = 0
+        weekday_ok = (value.weekday() + 1) % 7 in self.days_of_week
+        if self.any_day:
+            return weekday_ok
+        if self.any_day_of_week:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, value: datetime) -> datetime:
+        """
+        Ближайшее время запуска строго после value.
+
+        Args:
+            value: Момент времени
+
+        Returns:
+            Время следующего запуска (с точностью до минуты)
+
+        Raises:
+            InvalidCronExpressionError: Если запуск не наступает в ближайшие годы
+        """
+        current = value.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = value + timedelta(days=366 * MAX_SEARCH_YEARS)
+
+        while current <= limit:
+            if current.month not in self.months:
+                year, month = divmod(current.month, 12)
+                current = current.replace(year=current.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+                continue
+            if current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+                continue
+            return current
+
+        raise InvalidCronExpressionError(f"Cron expression '{self.expression}' never fires")
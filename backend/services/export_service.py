@@ -0,0 +1,79 @@
+"""Сервис потоковой выгрузки задач."""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.models import TaskStatus, TaskPriority
+from backend.repository import TaskRepository
+from backend.repository.task_repository import TASK_LIST_COLUMNS
+
+# Поля выгрузки в порядке колонок CSV
+EXPORT_FIELDS = [column.key for column in TASK_LIST_COLUMNS]
+
+
+class TaskExportService:
+    """
+    Сервис выгрузки всех задач, подходящих под фильтры.
+    
+    Выгрузка открывает собственную сессию на время отдачи ответа, а не
+    использует сессию запроса: поток читается уже после выхода из
+    обработчика маршрута.
+    """
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Инициализация сервиса.
+        
+        Args:
+            session_factory: Фабрика сессий базы данных
+            batch_size: Размер пачки строк (по умолчанию EXPORT_BATCH_SIZE)
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.export_batch_size
+    
+    async def stream_batches(
+        self,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Прочитать подходящие задачи пачками.
+        
+        Следующая пачка читается из курсора только после того, как
+        предыдущая отдана клиенту. При отключении клиента генератор
+        закрывается, вместе с ним закрываются курсор и сессия.
+        
+        Args:
+            status: Фильтр по статусу
+            priority: Фильтр по приоритету
+            created_from: Фильтр по дате создания (от)
+            created_to: Фильтр по дате создания (до)
+            result_contains: Фильтр по вхождению JSON в результат
+            q: Строка полнотекстового поиска по названию и описанию
+            
+        Yields:
+            Пачки строк-словарей с полями EXPORT_FIELDS
+        """
+        async with self.session_factory() as session:
+            async for batch in TaskRepository.stream_rows(
+                session,
+                status=status,
+                priority=priority,
+                created_from=created_from,
+                created_to=created_to,
+                result_contains=result_contains,
+                q=q,
+                batch_size=self.batch_size,
+            ):
+                yield batch
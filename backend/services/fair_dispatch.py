@@ -0,0 +1,147 @@
+"""Справедливая обработка сообщений из нескольких очередей в worker."""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class FairDispatcher:
+    """
+    Обработка сообщений нескольких очередей по кругу.
+
+    Сообщения каждой очереди складываются в свой буфер (его размер
+    ограничен prefetch потребителя), обработчик выполняется не более чем
+    для concurrency сообщений одновременно. Следующее сообщение берется
+    из очередей с ожидающими сообщениями по очереди, поэтому при
+    конкуренции каждая очередь получает равную долю обработки, а
+    переполненная очередь не задерживает остальные.
+
+    Обработчик получает сообщения пачками: к первому сообщению
+    добавляются следующие (тоже по кругу), пока пачка не наберет
+    batch_size сообщений, не кончатся свободные места или не пройдет
+    batch_wait секунд.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[None]],
+        concurrency: int,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            handler: Обработчик пачки сообщений
+            concurrency: Максимальное количество одновременно обрабатываемых сообщений
+            batch_size: Максимальный размер пачки
+            batch_wait: Сколько секунд ждать сообщений для неполной пачки
+        """
+        self.handler = handler
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._buffers: Dict[str, Deque[Any]] = {}
+        self._ring: Deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Количество сообщений, ожидающих обработки."""
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    def put(self, name: str, message: Any) -> None:
+        """
+        Добавить сообщение очереди.
+
+        Args:
+            name: Имя очереди
+            message: Сообщение
+        """
+        buffer = self._buffers.setdefault(name, deque())
+        buffer.append(message)
+        if len(buffer) == 1:
+            self._ring.append(name)
+        self._ready.set()
+
+    def consumer(self, name: str) -> Callable[[Any], Awaitable[None]]:
+        """Callback потребителя очереди name."""
+        async def on_message(message: Any) -> None:
+            self.put(name, message)
+        return on_message
+
+    def next_message(self) -> Any:
+        """Взять сообщение следующей по кругу очереди (очередь должна быть непустой)."""
+        name = self._ring.popleft()
+        buffer = self._buffers[name]
+        message = buffer.popleft()
+        if buffer:
+            self._ring.append(name)
+        return message
+
+    async def _handle(self, batch: List[Any]) -> None:
+        try:
+            await self.handler(batch)
+        except Exception as e:
+            logger.error("Message handler failed: %s", e)
+        finally:
+            for _ in batch:
+                self._slots.release()
+
+    async def _wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться сообщения в буферах (не дольше timeout секунд)."""
+        while not self._ring:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def next_batch(self) -> List[Any]:
+        """Собрать пачку сообщений (место для первого сообщения уже занято)."""
+        await self._wait_ready()
+        batch = [self.next_message()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size and not self._slots.locked():
+            if not self._ring and not await self._wait_ready(deadline - loop.time()):
+                break
+            await self._slots.acquire()
+            batch.append(self.next_message())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            await self._slots.acquire()
+            task = asyncio.create_task(self._handle(await self.next_batch()))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    def start(self) -> None:
+        """Запустить обработку."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановить обработку и дождаться обрабатываемых сообщений.
+
+        Сообщения из буферов не подтверждаются и возвращаются брокером
+        в очередь при закрытии канала.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
@@ -0,0 +1,220 @@
+"""Фоновый мониторинг зависимостей для liveness и readiness проверок."""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.config import settings
+from backend.database import engine
+from backend.models import Task, TaskStatus
+from backend.schemas.health import DependencyState, ReadinessResponse
+from backend.services.rabbitmq_service import RabbitMQService, rabbitmq_service
+
+logger = logging.getLogger(__name__)
+
+# Глубина очереди в задачах: в одном сообщении может быть несколько задач,
+# поэтому число сообщений брокера ее занижает (частичный индекс
+# ix_tasks_pending_created_at)
+PENDING_TASKS_SQL = select(func.count()).select_from(Task).where(Task.status == TaskStatus.PENDING)
+
+
+class HealthMonitor:
+    """
+    Монитор состояния зависимостей.
+
+    Периодически в фоне проверяет БД и RabbitMQ и хранит результат
+    в памяти. Эндпоинты проверок только читают закэшированное состояние
+    и не выполняют I/O, поэтому частые пробы не создают нагрузку на
+    Postgres и брокер.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        broker: Optional[RabbitMQService] = None,
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        max_queue_backlog: int = 0,
+    ):
+        """
+        Инициализация монитора.
+
+        Args:
+            db_engine: Движок базы данных
+            broker: Сервис RabbitMQ (опционально)
+            interval: Интервал между проверками в секундах
+            timeout: Таймаут одной проверки в секундах
+            max_queue_backlog: Порог задач в очереди для readiness (0 — не проверять)
+        """
+        self.db_engine = db_engine
+        self.broker = broker
+        self.interval = interval
+        self.timeout = timeout
+        self.max_queue_backlog = max_queue_backlog
+        self.state = DependencyState()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _ping_database(self) -> None:
+        async with self.db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _check_database(self, state: DependencyState) -> None:
+        try:
+            await asyncio.wait_for(self._ping_database(), self.timeout)
+            state.database = True
+        except Exception as e:
+            state.errors["database"] = str(e) or type(e).__name__
+
+    async def _count_pending(self) -> int:
+        async with self.db_engine.connect() as conn:
+            return await conn.scalar(PENDING_TASKS_SQL)
+
+    async def _check_queue_depth(self, state: DependencyState) -> None:
+        try:
+            state.queue_depth = await asyncio.wait_for(self._count_pending(), self.timeout)
+        except Exception as e:
+            state.errors["queue_depth"] = str(e) or type(e).__name__
+
+    async def _check_broker(self, state: DependencyState) -> None:
+        try:
+            stats = await asyncio.wait_for(self.broker.get_queue_stats(), self.timeout)
+            state.broker = self.broker.is_connected()
+            if stats is not None:
+                state.queue_messages, state.queue_consumers = stats
+        except Exception as e:
+            state.errors["broker"] = str(e) or type(e).__name__
+
+    async def refresh(self) -> DependencyState:
+        """
+        Выполнить проверки и обновить закэшированное состояние.
+
+        Returns:
+            Новое состояние зависимостей
+        """
+        state = DependencyState()
+
+        checks = [self._check_database(state), self._check_queue_depth(state)]
+        if self.broker is not None:
+            checks.append(self._check_broker(state))
+        await asyncio.gather(*checks)
+
+        state.checked_at = datetime.utcnow()
+        self.state = state
+        return state
+
+    def is_ready(self) -> bool:
+        """
+        Проверить готовность по закэшированному состоянию.
+
+        Состояние считается устаревшим, если не обновлялось дольше
+        трех интервалов проверки.
+        """
+        state = self.state
+        if state.checked_at is None:
+            return False
+        age = (datetime.utcnow() - state.checked_at).total_seconds()
+        if age > self.interval * 3:
+            return False
+        if not state.database:
+            return False
+        if self.broker is not None and not state.broker:
+            return False
+        if (
+            self.max_queue_backlog > 0
+            and state.queue_depth is not None
+            and state.queue_depth > self.max_queue_backlog
+        ):
+            return False
+        return True
+
+    def readiness(self) -> ReadinessResponse:
+        """Сформировать ответ readiness-проверки."""
+        return ReadinessResponse(
+            status="ready" if self.is_ready() else "not_ready",
+            **self.state.model_dump(),
+        )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                state = await self.refresh()
+                if state.errors:
+                    logger.warning("Dependency check failed: %s", state.errors)
+            except Exception as e:
+                logger.error("Health monitor error: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запустить фоновые проверки."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновые проверки."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def serve_health(monitor: HealthMonitor, host: str, port: int) -> asyncio.AbstractServer:
+    """
+    Запустить минимальный HTTP-сервер проверок для процессов без API.
+
+    Отдает ``/healthz`` и ``/readyz`` из закэшированного состояния монитора.
+
+    Args:
+        monitor: Монитор зависимостей
+        host: Адрес для прослушивания
+        port: Порт для прослушивания
+
+    Returns:
+        Запущенный сервер
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), monitor.timeout)
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else ""
+
+            if path == "/healthz":
+                code, body = 200, {"status": "ok"}
+            elif path == "/readyz":
+                readiness = monitor.readiness()
+                code = 200 if readiness.status == "ready" else 503
+                body = readiness.model_dump(mode="json")
+            else:
+                code, body = 404, {"detail": "Not Found"}
+
+            payload = json.dumps(body).encode()
+            reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}[code]
+            writer.write(
+                f"HTTP/1.1 {code} {reason}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug("Health request failed: %s", e)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+health_monitor = HealthMonitor(
+    db_engine=engine,
+    broker=rabbitmq_service,
+    interval=settings.health_check_interval,
+    timeout=settings.health_check_timeout,
+    max_queue_backlog=settings.health_max_queue_backlog,
+)
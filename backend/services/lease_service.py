@@ -0,0 +1,334 @@
+"""Аренда задач worker, возврат зависших задач и реестр worker."""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal, DBSession
+from backend.models import Task, TaskStatus, Worker
+from backend.repository import TaskRepository, WorkerRepository
+
+logger = logging.getLogger(__name__)
+
+
+def new_worker_id() -> str:
+    """Идентификатор процесса worker: хост, pid и случайный суффикс."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseKeeper:
+    """
+    Продление аренды обрабатываемых задач и heartbeat worker.
+
+    Worker отмечает задачи, которые обрабатывает, и раз в interval
+    продлевает аренду всех отмеченных задач одним UPDATE и в той же
+    транзакции обновляет свою запись в реестре worker. Если worker
+    завис или остановлен без завершения задач, аренда истекает через
+    ttl и задачи возвращает в очередь TaskReaper.
+
+    По сигналу отмены (см. RabbitMQService.send_cancellations) обработка
+    отмененных задач прерывается.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        ttl: float = 60.0,
+        interval: float = 15.0,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            worker_id: Идентификатор worker (владелец аренды)
+            session_factory: Фабрика сессий
+            ttl: Длительность аренды в секундах
+            interval: Интервал продления в секундах (меньше ttl)
+        """
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.interval = interval
+        self.hostname = socket.gethostname()
+        self.pid = os.getpid()
+        self.started_at = datetime.utcnow()
+        self._in_flight: Dict[UUID, Optional[asyncio.Task]] = {}
+        self._cancelled: Set[UUID] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        """Количество обрабатываемых задач."""
+        return len(self._in_flight)
+
+    def expires_at(self, now: Optional[datetime] = None) -> datetime:
+        """Время окончания аренды, взятой или продленной в момент now."""
+        return (now or datetime.utcnow()) + timedelta(seconds=self.ttl)
+
+    def track(self, task_id: UUID, handler: Optional[asyncio.Task] = None) -> None:
+        """
+        Отметить задачу как обрабатываемую.
+
+        Args:
+            task_id: ID задачи
+            handler: asyncio-задача обработчика, прерываемая при отмене задачи
+        """
+        self._in_flight[task_id] = handler
+
+    def release(self, task_id: UUID) -> None:
+        """Снять отметку с задачи."""
+        self._in_flight.pop(task_id, None)
+        self._cancelled.discard(task_id)
+
+    def cancel(self, task_ids: List[UUID]) -> int:
+        """
+        Прервать обработку отмененных задач.
+
+        Args:
+            task_ids: ID отмененных задач (задачи других worker игнорируются)
+
+        Returns:
+            Количество прерванных обработчиков
+        """
+        cancelled = 0
+        for task_id in task_ids:
+            handler = self._in_flight.get(task_id)
+            if handler is None or handler.done() or task_id in self._cancelled:
+                continue
+            self._cancelled.add(task_id)
+            handler.cancel()
+            cancelled += 1
+        if cancelled:
+            logger.info("Interrupted processing of %d cancelled tasks", cancelled)
+        return cancelled
+
+    def is_cancelled(self, task_id: UUID) -> bool:
+        """Прервана ли обработка задачи сигналом отмены."""
+        return task_id in self._cancelled
+
+    async def heartbeat(self, now: Optional[datetime] = None) -> int:
+        """
+        Продлить аренду обрабатываемых задач и обновить запись worker.
+
+        Args:
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Количество продленных задач
+        """
+        now = now or datetime.utcnow()
+        task_ids = list(self._in_flight)
+        async with self.session_factory() as session:
+            extended = await TaskRepository.extend_leases(
+                session, task_ids, self.worker_id, self.expires_at(now)
+            )
+            await WorkerRepository.heartbeat(
+                session,
+                self.worker_id,
+                self.hostname,
+                self.pid,
+                self.started_at,
+                now,
+                len(task_ids),
+            )
+            await session.commit()
+        return extended
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.warning("Worker heartbeat failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запустить продление аренды."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить продление аренды и удалить запись worker из реестра."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            async with self.session_factory() as session:
+                await WorkerRepository.delete(session, self.worker_id)
+        except Exception as e:
+            logger.warning("Failed to unregister worker %s: %s", self.worker_id, e)
+
+
+class TaskReaper:
+    """
+    Возврат задач с истекшей арендой.
+
+    Задачи в IN_PROGRESS с истекшей арендой находятся по частичному
+    индексу и блокируются с SKIP LOCKED, поэтому reaper может работать
+    в каждом worker. Задача, у которой остались попытки, возвращается в
+    PENDING и заново отправляется в очередь; после max_attempts попыток
+    она (вместе с ожидающими зависимыми задачами) получает статус FAILED.
+    Заодно удаляются записи давно не отвечающих worker.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[List[Tuple[UUID, str]]], Awaitable[Any]],
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        max_attempts: int = 4,
+        interval: float = 30.0,
+        batch_size: int = 100,
+        registry_ttl: float = 300.0,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            publish: Функция отправки пачки задач в очередь (пары ID задачи, арендатор)
+            session_factory: Фабрика сессий
+            max_attempts: Максимальное количество попыток выполнения задачи
+            interval: Интервал проверки в секундах
+            batch_size: Максимум задач за одну проверку
+            registry_ttl: Через сколько секунд без heartbeat удалять запись worker
+        """
+        self.publish = publish
+        self.session_factory = session_factory
+        self.max_attempts = max_attempts
+        self.interval = interval
+        self.batch_size = batch_size
+        self.registry_ttl = registry_ttl
+        self._task: Optional[asyncio.Task] = None
+
+    async def reap(self, now: Optional[datetime] = None) -> int:
+        """
+        Вернуть в очередь или провалить задачи с истекшей арендой.
+
+        Args:
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Количество обработанных задач
+        """
+        now = now or datetime.utcnow()
+        requeued: List[Task] = []
+        async with self.session_factory() as session:
+            tasks = await TaskRepository.lock_expired_leases(session, now, self.batch_size)
+            for task in tasks:
+                logger.warning(
+                    "Task %s lease of %s expired (attempt %d/%d)",
+                    task.id, task.lease_owner, task.attempts, self.max_attempts,
+                    extra={"task_id": str(task.id)},
+                )
+                task.lease_owner = None
+                task.lease_expires_at = None
+                if task.attempts < self.max_attempts:
+                    task.status = TaskStatus.PENDING
+                    requeued.append(task)
+                    continue
+                await TaskRepository.finish_dependents(
+                    session,
+                    task.id,
+                    TaskStatus.FAILED,
+                    f"Dependency {task.id} failed",
+                    now,
+                )
+                task.status = TaskStatus.FAILED
+                task.completed_at = now
+                task.error_message = f"Worker lease expired after {task.attempts} attempts"
+            await WorkerRepository.delete_stale(session, now - timedelta(seconds=self.registry_ttl))
+            await session.commit()
+
+        if requeued:
+            try:
+                await self.publish([(task.id, task.tenant_id) for task in requeued])
+            except Exception as e:
+                # Задачи остаются в PENDING, как при недоступности RabbitMQ при создании
+                logger.error("Failed to publish %d reaped tasks: %s", len(requeued), e)
+        if tasks:
+            logger.info(
+                "Reaped %d tasks with expired leases (%d requeued)", len(tasks), len(requeued)
+            )
+        return len(tasks)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self.reap() >= self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error("Task reaper failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запустить reaper."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить reaper."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_lease_keeper() -> LeaseKeeper:
+    """Создать LeaseKeeper процесса worker по настройкам приложения."""
+    return LeaseKeeper(
+        worker_id=new_worker_id(),
+        ttl=settings.task_lease_ttl,
+        interval=settings.task_heartbeat_interval,
+    )
+
+
+def create_task_reaper(publish: Callable[[List[Tuple[UUID, str]]], Awaitable[Any]]) -> TaskReaper:
+    """Создать reaper по настройкам приложения."""
+    return TaskReaper(
+        publish=publish,
+        max_attempts=settings.task_max_attempts,
+        interval=settings.task_reaper_interval,
+        batch_size=settings.task_reaper_batch_size,
+        registry_ttl=settings.worker_registry_ttl,
+    )
+
+
+class WorkerRegistryService:
+    """Сервис для чтения реестра worker."""
+
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализация сервиса.
+
+        Args:
+            session: Сессия базы данных
+        """
+        self.session = session
+
+    async def get_live(self) -> List[Worker]:
+        """Получить worker, приславшие heartbeat в пределах длительности аренды."""
+        since = datetime.utcnow() - timedelta(seconds=settings.task_lease_ttl)
+        return await WorkerRepository.get_live(self.session, since)
+
+
+def get_worker_registry_service(db: DBSession) -> WorkerRegistryService:
+    """Dependency для получения сервиса реестра worker."""
+    return WorkerRegistryService(session=db)
+
+
+WorkerRegistryServiceDep = Annotated[WorkerRegistryService, Depends(get_worker_registry_service)]
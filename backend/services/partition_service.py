@@ -0,0 +1,287 @@
+"""Сервис обслуживания секций таблицы задач."""
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.models import Task, TaskStatus
+from backend.repository import IdempotencyRepository, StatsRepository
+from backend.services.blob_store import BlobStore, result_store
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME_RE = re.compile(r"^tasks_p(\d{4})(\d{2})$")
+
+ACTIVE_STATUSES = (
+    TaskStatus.NEW,
+    TaskStatus.SCHEDULED,
+    TaskStatus.WAITING,
+    TaskStatus.PENDING,
+    TaskStatus.IN_PROGRESS,
+)
+
+# Ключ advisory lock, чтобы обслуживание не выполнялось параллельно
+# несколькими процессами
+MAINTENANCE_LOCK_KEY = 0x7461736B
+
+
+def month_start(value: date) -> date:
+    """Первое число месяца для даты."""
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    """Первое число следующего месяца."""
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def partition_name(value: date) -> str:
+    """Имя секции для месяца, например tasks_p202401."""
+    return f"tasks_p{value.year:04d}{value.month:02d}"
+
+
+def range_partition_ddl(value: date) -> str:
+    """DDL месячной секции, начинающейся с value."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(value)} PARTITION OF {Task.__tablename__} "
+        f"FOR VALUES FROM ('{value.isoformat()}') TO ('{next_month(value).isoformat()}')"
+    )
+
+
+DEFAULT_PARTITION_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {Task.__tablename__}_default "
+    f"PARTITION OF {Task.__tablename__} DEFAULT"
+)
+
+
+def create_initial_partitions(target: Any, connection: Any, **kw: Any) -> None:
+    """
+    Создать секции вместе с таблицей tasks.
+
+    Base.metadata.create_all создает только секционированную таблицу;
+    без секций вставка задачи падает, пока worker не выполнит
+    обслуживание. Поэтому при создании таблицы сразу создаются секции на
+    текущий и TASKS_PARTITION_MONTHS_AHEAD месяцев вперед и DEFAULT.
+    """
+    current = month_start(datetime.utcnow().date())
+    for _ in range(settings.tasks_partition_months_ahead + 1):
+        connection.execute(text(range_partition_ddl(current)))
+        current = next_month(current)
+    connection.execute(text(DEFAULT_PARTITION_DDL))
+
+
+event.listen(Task.__table__, "after_create", create_initial_partitions)
+
+
+class PartitionService:
+    """Сервис для создания и удаления месячных секций таблицы tasks."""
+
+    def __init__(self, session: AsyncSession, blob_store: Optional[BlobStore] = None):
+        """
+        Инициализация сервиса.
+
+        Args:
+            session: Сессия базы данных
+            blob_store: Хранилище результатов, из которого удаляются результаты
+                задач удаленных секций (опционально)
+        """
+        self.session = session
+        self.blob_store = blob_store
+
+    async def _lock(self) -> None:
+        await self.session.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": MAINTENANCE_LOCK_KEY},
+        )
+
+    async def ensure_partitions(
+        self,
+        months_ahead: int,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Создать секции на текущий месяц и months_ahead месяцев вперед.
+
+        Также создается секция DEFAULT для строк вне созданных диапазонов.
+        DDL выполняется только для недостающих секций, чтобы обслуживание
+        не брало блокировку tasks без необходимости. Если строки месяца уже
+        попали в секцию DEFAULT, секция этого месяца не создается (Postgres
+        не дает создать её поверх таких строк): ошибка логируется, а строки
+        нужно перенести из DEFAULT вручную.
+
+        Args:
+            months_ahead: Сколько месяцев вперед подготовить
+            today: Текущая дата (для тестов)
+
+        Returns:
+            Имена секций, которые существуют
+        """
+        await self._lock()
+
+        existing = set(await self.list_partitions())
+        current = month_start(today or datetime.utcnow().date())
+        names = []
+
+        for _ in range(months_ahead + 1):
+            upper = next_month(current)
+            name = partition_name(current)
+            if name not in existing:
+                try:
+                    async with self.session.begin_nested():
+                        await self.session.execute(text(range_partition_ddl(current)))
+                except IntegrityError as e:
+                    logger.error(
+                        "Cannot create partition %s: %s_default already has rows for %s..%s, "
+                        "move them out of the default partition: %s",
+                        name, Task.__tablename__, current, upper, e.orig,
+                    )
+                    current = upper
+                    continue
+            names.append(name)
+            current = upper
+
+        if f"{Task.__tablename__}_default" not in existing:
+            await self.session.execute(text(DEFAULT_PARTITION_DDL))
+        await self.session.commit()
+        return names
+
+    async def list_partitions(self) -> List[str]:
+        """Получить имена всех секций таблицы tasks."""
+        result = await self.session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :parent"
+            ),
+            {"parent": Task.__tablename__},
+        )
+        return [row[0] for row in result]
+
+    async def drop_expired_partitions(
+        self,
+        retention_days: int,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Отсоединить и удалить секции старше срока хранения.
+
+        Секция удаляется целиком (DETACH + DROP), без построчного DELETE.
+        Секции, в которых остались незавершенные задачи, пропускаются.
+        Вынесенные результаты задач удаленных секций удаляются из хранилища.
+
+        Args:
+            retention_days: Срок хранения в днях
+            now: Текущее время (для тестов)
+
+        Returns:
+            Имена удаленных секций
+        """
+        await self._lock()
+
+        cutoff = (now or datetime.utcnow()).date() - timedelta(days=retention_days)
+        dropped = []
+        result_refs = []
+
+        for name in await self.list_partitions():
+            match = PARTITION_NAME_RE.match(name)
+            if not match:
+                continue
+
+            upper = next_month(date(int(match.group(1)), int(match.group(2)), 1))
+            if upper > cutoff:
+                continue
+
+            active = await self.session.execute(
+                text(f"SELECT 1 FROM {name} WHERE status IN :statuses LIMIT 1").bindparams(
+                    bindparam("statuses", expanding=True)
+                ),
+                {"statuses": [status.value for status in ACTIVE_STATUSES]},
+            )
+            if active.first() is not None:
+                logger.warning("Partition %s has unfinished tasks, skipping", name)
+                continue
+
+            if self.blob_store is not None:
+                refs = await self.session.execute(
+                    text(f"SELECT result_ref FROM {name} WHERE result_ref IS NOT NULL")
+                )
+                result_refs.extend(row[0] for row in refs)
+
+            await self.session.execute(
+                text(f"ALTER TABLE {Task.__tablename__} DETACH PARTITION {name}")
+            )
+            await self.session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+        await self.session.commit()
+
+        # Объекты удаляются только после фиксации транзакции
+        for ref in result_refs:
+            await self.blob_store.delete(ref)
+
+        return dropped
+
+
+async def run_partition_maintenance() -> None:
+    """Подготовить будущие секции, удалить устаревшие секции, агрегаты статистики и ключи идемпотентности."""
+    async with AsyncSessionLocal() as session:
+        service = PartitionService(session, blob_store=result_store)
+        await service.ensure_partitions(settings.tasks_partition_months_ahead)
+
+        if settings.tasks_retention_days > 0:
+            dropped = await service.drop_expired_partitions(settings.tasks_retention_days)
+            if dropped:
+                logger.info("Dropped expired task partitions: %s", ", ".join(dropped))
+
+        if settings.stats_retention_days > 0:
+            await StatsRepository.delete_before(
+                session,
+                datetime.utcnow() - timedelta(days=settings.stats_retention_days),
+            )
+
+        await IdempotencyRepository.delete_expired(session, datetime.utcnow())
+
+
+async def create_partitions() -> List[str]:
+    """Подготовить секции таблицы задач (команда manage.sh partitions)."""
+    async with AsyncSessionLocal() as session:
+        return await PartitionService(session).ensure_partitions(settings.tasks_partition_months_ahead)
+
+
+async def partition_maintenance_loop(retry_delay: float = 5.0) -> None:
+    """
+    Периодически выполнять обслуживание секций.
+
+    До первого успешного обслуживания (например, пока API еще не создал
+    таблицу tasks) попытки повторяются с задержкой от retry_delay,
+    удваивающейся до PARTITION_MAINTENANCE_INTERVAL.
+
+    Args:
+        retry_delay: Начальная задержка повтора в секундах
+    """
+    delay = retry_delay
+    succeeded = False
+    while True:
+        try:
+            await run_partition_maintenance()
+            succeeded = True
+        except Exception as e:
+            logger.error("Partition maintenance failed: %s", e)
+        if succeeded:
+            await asyncio.sleep(settings.partition_maintenance_interval)
+        else:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.partition_maintenance_interval)
+
+if __name__ == "__main__":
+    print("Task partitions:", ", ".join(asyncio.run(create_partitions())))
@@ -1,15 +1,23 @@
 """Сервис для работы с RabbitMQ."""
+import asyncio
 import json
 import logging
-from collections.abc import AsyncGenerator
-from typing import Annotated, Optional
+import zlib
+from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
 import aio_pika
-from aio_pika.abc import AbstractChannel, AbstractConnection
+from aio_pika.abc import AbstractChannel, AbstractConnection, AbstractExchange, AbstractQueue
 from fastapi import Depends
 
 from backend.config import settings
+from backend.services.task_messages import (
+    JSON_CONTENT_TYPE,
+    TASK_MESSAGE_CONTENT_TYPE,
+    decode_task_ids,
+    encode_json_task_id,
+    encode_task_ids,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +29,11 @@ class RabbitMQService:
         """Инициализация сервиса RabbitMQ."""
         self._connection: Optional[AbstractConnection] = None
         self._channel: Optional[AbstractChannel] = None
+        self._queues: Dict[str, AbstractQueue] = {}
+        self._cancel_exchange: Optional[AbstractExchange] = None
         self._queue_name = settings.rabbitmq_queue
+        self._shards = settings.task_queue_shards
+        self._connect_lock = asyncio.Lock()
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -31,23 +43,30 @@ class RabbitMQService:
         """Async context manager exit."""
         await self.disconnect()
     
-    async def connect(self) -> None:
+    async def connect(self, timeout: Optional[float] = None) -> None:
         """
         Подключиться к RabbitMQ.
         
+        Args:
+            timeout: Таймаут подключения в секундах (опционально)
+        
         Raises:
             Exception: Если не удалось подключиться
         """
-        if self._connection is None or self._connection.is_closed:
-            try:
-                self._connection = await aio_pika.connect_robust(
-                    settings.rabbitmq_url
-                )
-                self._channel = await self._connection.channel()
-                logger.info("Connected to RabbitMQ")
-            except Exception as e:
-                logger.error(f"Error connecting to RabbitMQ: {e}")
-                raise
+        async with self._connect_lock:
+            if self._connection is None or self._connection.is_closed:
+                try:
+                    self._connection = await aio_pika.connect_robust(
+                        settings.rabbitmq_url,
+                        timeout=timeout,
+                    )
+                    self._channel = await self._connection.channel()
+                    self._queues = {}
+                    self._cancel_exchange = None
+                    logger.info("Connected to RabbitMQ")
+                except Exception as e:
+                    logger.error("Error connecting to RabbitMQ: %s", e)
+                    raise
     
     async def disconnect(self) -> None:
         """Отключиться от RabbitMQ."""
@@ -59,6 +78,8 @@ class RabbitMQService:
             await self._connection.close()
             self._connection = None
         
+        self._queues = {}
+        self._cancel_exchange = None
         logger.info("Disconnected from RabbitMQ")
     
     async def get_channel(self) -> Optional[AbstractChannel]:
@@ -75,54 +96,274 @@ class RabbitMQService:
             try:
                 await self.connect()
             except Exception as e:
-                logger.warning(f"Failed to connect to RabbitMQ: {e}")
+                logger.warning("Failed to connect to RabbitMQ: %s", e)
                 return None
         
         return self._channel
     
-    async def send_task_to_queue(self, task_id: UUID) -> None:
+    def queue_for(self, tenant_id: Optional[str]) -> str:
+        """
+        Имя очереди для задач арендатора.
+        
+        При TASK_QUEUE_SHARDS > 1 арендаторы распределяются по под-очередям
+        `<очередь>.<номер>` по CRC32 tenant_id, иначе используется очередь
+        по умолчанию.
+        
+        Args:
+            tenant_id: Арендатор задачи
+            
+        Returns:
+            Имя очереди
+        """
+        if self._shards <= 1 or tenant_id is None:
+            return self._queue_name
+        return f"{self._queue_name}.{zlib.crc32(tenant_id.encode()) % self._shards}"
+    
+    def queue_names(self) -> List[str]:
+        """Все очереди задач: очередь по умолчанию и под-очереди арендаторов."""
+        if self._shards <= 1:
+            return [self._queue_name]
+        return [self._queue_name] + [f"{self._queue_name}.{shard}" for shard in range(self._shards)]
+    
+    def _task_messages(self, task_ids: List[UUID]) -> List[aio_pika.Message]:
+        """
+        Сообщения очереди задач для task_ids.
+        
+        В двоичном формате задачи упаковываются в конверты по
+        TASK_MESSAGE_BATCH_SIZE ID, но не больше WORKER_BATCH_SIZE:
+        prefetch worker считается в сообщениях, и крупный конверт
+        занял бы один worker, пока остальные простаивают, а повтор одной
+        задачи возвращал бы в очередь весь конверт. В формате json (на
+        время обновления worker) отправляется по сообщению на задачу.
+        """
+        if settings.task_message_format == "json":
+            bodies = [encode_json_task_id(task_id) for task_id in task_ids]
+            content_type = JSON_CONTENT_TYPE
+        else:
+            size = max(1, min(settings.task_message_batch_size, settings.worker_batch_size))
+            bodies = [
+                encode_task_ids(task_ids[start:start + size])
+                for start in range(0, len(task_ids), size)
+            ]
+            content_type = TASK_MESSAGE_CONTENT_TYPE
+        return [
+            aio_pika.Message(
+                body,
+                content_type=content_type,
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            )
+            for body in bodies
+        ]
+    
+    async def publish_task_ids(self, queue_name: str, task_ids: List[UUID]) -> None:
+        """
+        Отправить задачи в очередь queue_name.
+        
+        Args:
+            queue_name: Имя очереди
+            task_ids: ID задач
+            
+        Raises:
+            ConnectionError: Если RabbitMQ недоступен
+            Exception: Если не удалось отправить сообщение
+        """
+        channel = await self.get_channel()
+        if channel is None:
+            raise ConnectionError("RabbitMQ is not available")
+        await self._get_queue(channel, queue_name)
+        for message in self._task_messages(task_ids):
+            await channel.default_exchange.publish(message, routing_key=queue_name)
+    
+    async def send_task_to_queue(self, task_id: UUID, tenant_id: Optional[str] = None) -> None:
         """
         Отправить задачу в очередь RabbitMQ.
         
         Args:
             task_id: ID задачи для отправки
+            tenant_id: Арендатор задачи (определяет под-очередь)
             
         Note:
             Если не удалось отправить задачу, ошибка логируется, но не пробрасывается,
             чтобы не нарушать работу приложения при недоступности RabbitMQ.
         """
+        queue_name = self.queue_for(tenant_id)
         try:
-            channel = await self.get_channel()
+            await self.publish_task_ids(queue_name, [task_id])
             
-            if channel is None:
+            logger.info(
+                "Task %s sent to queue '%s'",
+                task_id,
+                queue_name,
+                extra={"task_id": str(task_id)},
+            )
+            
+        except Exception as e:
+            logger.warning(
+                "Failed to send task %s to queue '%s': %s. "
+                "Task will remain in PENDING status.",
+                task_id,
+                queue_name,
+                e,
+                extra={"task_id": str(task_id)},
+            )
+    
+    async def send_tasks_to_queue(self, tasks: List[Tuple[UUID, Optional[str]]]) -> int:
+        """
+        Отправить пачку задач в очереди RabbitMQ.
+        
+        Задачи группируются по очередям арендаторов, в каждую очередь
+        отправляются конверты по TASK_MESSAGE_BATCH_SIZE задач.
+        
+        Args:
+            tasks: Пары (ID задачи, арендатор)
+            
+        Returns:
+            Количество отправленных задач
+            
+        Note:
+            Ошибка отправки в очередь логируется, но не пробрасывается;
+            задачи этой очереди остаются в статусе PENDING.
+        """
+        by_queue: Dict[str, List[UUID]] = {}
+        for task_id, tenant_id in tasks:
+            by_queue.setdefault(self.queue_for(tenant_id), []).append(task_id)
+        
+        sent = 0
+        for queue_name, task_ids in by_queue.items():
+            try:
+                await self.publish_task_ids(queue_name, task_ids)
+                sent += len(task_ids)
+                logger.info("%d tasks sent to queue '%s'", len(task_ids), queue_name)
+            except Exception as e:
                 logger.warning(
-                    f"Cannot send task {task_id} to queue: RabbitMQ is not available. "
-                    f"Task will remain in PENDING status."
+                    "Failed to send %d tasks to queue '%s': %s. "
+                    "Tasks will remain in PENDING status.",
+                    len(task_ids),
+                    queue_name,
+                    e,
                 )
-                return
+        return sent
+    
+    async def _get_queue(self, channel: AbstractChannel, queue_name: str) -> AbstractQueue:
+        """
+        Объявить очередь один раз на канал.
+        
+        Args:
+            channel: Канал RabbitMQ
+            queue_name: Имя очереди
             
+        Returns:
+            Объявленная очередь
+        """
+        queue = self._queues.get(queue_name)
+        if queue is None or queue.channel is not channel:
             queue = await channel.declare_queue(
-                self._queue_name,
+                queue_name,
                 durable=True,
             )
-            
-            message_body = json.dumps({"task_id": str(task_id)})
-            
-            await channel.default_exchange.publish(
-                aio_pika.Message(
-                    message_body.encode(),
-                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                ),
-                routing_key=self._queue_name,
+            self._queues[queue_name] = queue
+        return queue
+    
+    @property
+    def cancel_exchange_name(self) -> str:
+        """Fanout exchange сигналов отмены задач для worker."""
+        return f"{self._queue_name}.cancel"
+    
+    async def _get_cancel_exchange(self, channel: AbstractChannel) -> AbstractExchange:
+        if self._cancel_exchange is None or self._cancel_exchange.channel is not channel:
+            self._cancel_exchange = await channel.declare_exchange(
+                self.cancel_exchange_name,
+                aio_pika.ExchangeType.FANOUT,
+                durable=True,
             )
+        return self._cancel_exchange
+    
+    async def send_cancellations(self, task_ids: List[UUID]) -> None:
+        """
+        Сообщить всем worker об отмене задач одним сообщением.
+        
+        Сигнал только ускоряет остановку обработки и не сохраняется:
+        worker, не подключенный в момент отправки, его не получит.
+        Источником истины остается статус в БД: worker, пропустивший
+        сигнал, не перезапишет CANCELLED при завершении задачи
+        (см. TaskRepository.finish_processing).
+        
+        Args:
+            task_ids: ID отмененных задач
             
-            logger.info(f"Task {task_id} sent to queue '{self._queue_name}'")
-            
+        Note:
+            Ошибка отправки логируется, но не пробрасывается.
+        """
+        if not task_ids:
+            return
+        try:
+            channel = await self.get_channel()
+            if channel is None:
+                logger.warning("Cannot send cancellation of %d tasks: RabbitMQ is not available", len(task_ids))
+                return
+            exchange = await self._get_cancel_exchange(channel)
+            if settings.task_message_format == "json":
+                message = aio_pika.Message(
+                    json.dumps({"task_ids": [str(task_id) for task_id in task_ids]}).encode(),
+                    content_type=JSON_CONTENT_TYPE,
+                )
+            else:
+                message = aio_pika.Message(
+                    encode_task_ids(task_ids),
+                    content_type=TASK_MESSAGE_CONTENT_TYPE,
+                )
+            await exchange.publish(message, routing_key="")
+            logger.info("Cancellation of %d tasks sent to workers", len(task_ids))
         except Exception as e:
-            logger.warning(
-                f"Failed to send task {task_id} to queue '{self._queue_name}': {e}. "
-                f"Task will remain in PENDING status."
-            )
+            logger.warning("Failed to send cancellation of %d tasks: %s", len(task_ids), e)
+    
+    async def consume_cancellations(self, callback: Callable[[List[UUID]], None]) -> None:
+        """
+        Подписаться на сигналы отмены задач.
+        
+        Для подписчика создается временная эксклюзивная очередь,
+        привязанная к fanout exchange.
+        
+        Args:
+            callback: Функция, получающая список ID отмененных задач
+        """
+        channel = await self.get_channel()
+        exchange = await self._get_cancel_exchange(channel)
+        queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+        
+        async def on_message(message: Any) -> None:
+            try:
+                callback(decode_task_ids(message.body))
+            except Exception as e:
+                logger.error("Error handling cancellation message: %s", e)
+        
+        await queue.consume(on_message, no_ack=True)
+    
+    async def get_queue_stats(self) -> Optional[Tuple[int, int]]:
+        """
+        Получить количество сообщений и потребителей очередей задач.
+        
+        Сообщения суммируются по всем под-очередям, потребители считаются
+        по очереди по умолчанию (её слушает каждый worker).
+        
+        Returns:
+            Кортеж (сообщений в очередях, потребителей) или None,
+            если RabbitMQ недоступен
+        """
+        channel = await self.get_channel()
+        if channel is None:
+            return None
+        
+        messages = 0
+        consumers = 0
+        for queue_name in self.queue_names():
+            queue = await channel.declare_queue(queue_name, durable=True)
+            result = queue.declaration_result
+            messages += result.message_count
+            if queue_name == self._queue_name:
+                consumers = result.consumer_count
+        return messages, consumers
     
     async def declare_queue(self, queue_name: Optional[str] = None) -> None:
         """
@@ -139,7 +380,7 @@ class RabbitMQService:
             durable=True,
         )
         
-        logger.info(f"Queue '{queue}' declared")
+        logger.info("Queue '%s' declared", queue)
     
     def is_connected(self) -> bool:
         """
@@ -156,10 +397,17 @@ class RabbitMQService:
         )
 
 
-async def get_rabbitmq_service() -> AsyncGenerator[RabbitMQService, None]:
-    """Dependency для получения сервиса RabbitMQ."""
-    async with RabbitMQService() as service:
-        yield service
+rabbitmq_service = RabbitMQService()
+
+
+async def get_rabbitmq_service() -> RabbitMQService:
+    """
+    Dependency для получения сервиса RabbitMQ.
+    
+    Возвращает общий для процесса экземпляр, чтобы не открывать
+    соединение с брокером на каждый запрос.
+    """
+    return rabbitmq_service
 
 
 RabbitMQServiceDep = Annotated[RabbitMQService, Depends(get_rabbitmq_service)]
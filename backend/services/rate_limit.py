@@ -0,0 +1,79 @@
+"""Ограничение частоты создания задач по арендаторам."""
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from backend.config import settings
+from backend.exceptions import TenantRateLimitedError
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket на каждый ключ.
+
+    Корзина вмещает burst токенов и пополняется со скоростью rate токенов
+    в секунду, каждый запрос забирает один токен. Корзины хранятся в
+    памяти процесса в LRU ограниченного размера: вытесняется корзина
+    ключа, к которому дольше всего не обращались.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        """
+        Инициализация.
+
+        Args:
+            rate: Скорость пополнения в токенах в секунду (0 — без ограничения)
+            burst: Емкость корзины
+            max_keys: Максимальное количество корзин в памяти
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Забрать токен из корзины ключа.
+
+        Args:
+            key: Ключ корзины
+            now: Текущее монотонное время (по умолчанию time.monotonic())
+
+        Returns:
+            0, если токен получен, иначе время в секундах до появления токена
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+
+        tokens, updated_at = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def check(self, key: str) -> None:
+        """
+        Забрать токен или отказать.
+
+        Raises:
+            TenantRateLimitedError: Если токенов нет
+        """
+        wait = self.acquire(key)
+        if wait > 0:
+            raise TenantRateLimitedError(f"Rate limit exceeded for tenant {key}", retry_after=wait)
+
+
+tenant_rate_limiter = TokenBucketLimiter(
+    rate=settings.tenant_rate_limit,
+    burst=settings.tenant_rate_burst,
+    max_keys=settings.tenant_rate_max_tenants,
+)
@@ -0,0 +1,225 @@
+"""Повторяющиеся задачи по расписанию cron."""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Annotated, List, Optional
+from uuid import UUID
+
+import asyncpg
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal, DBSession
+from backend.exceptions import RecurringTaskNotFoundError
+from backend.models import RecurringTask, Task, TaskStatus
+from backend.repository import RecurringTaskRepository
+from backend.schemas import RecurringTaskCreate
+from backend.services.cron import CronSchedule
+from backend.services.task_events_service import _listen_dsn
+
+logger = logging.getLogger(__name__)
+
+
+class RecurringTaskService:
+    """Сервис для работы с определениями повторяющихся задач."""
+
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализация сервиса.
+
+        Args:
+            session: Сессия базы данных
+        """
+        self.session = session
+
+    async def create(self, data: RecurringTaskCreate) -> RecurringTask:
+        """
+        Создать повторяющуюся задачу.
+
+        Первый запуск — ближайшее время по расписанию после текущего.
+
+        Args:
+            data: Данные повторяющейся задачи
+
+        Returns:
+            Созданная повторяющаяся задача
+
+        Raises:
+            InvalidCronExpressionError: Если расписание некорректно
+        """
+        schedule = CronSchedule(data.cron)
+        values = data.model_dump()
+        values["next_run_at"] = schedule.next_after(datetime.utcnow())
+        return await RecurringTaskRepository.create(self.session, values)
+
+    async def get(self, recurring_id: UUID) -> RecurringTask:
+        """
+        Получить повторяющуюся задачу по ID.
+
+        Raises:
+            RecurringTaskNotFoundError: Если задача не найдена
+        """
+        recurring = await RecurringTaskRepository.get(self.session, recurring_id)
+        if recurring is None:
+            raise RecurringTaskNotFoundError(f"Recurring task {recurring_id} not found")
+        return recurring
+
+    async def get_all(self) -> List[RecurringTask]:
+        """Получить все повторяющиеся задачи."""
+        return await RecurringTaskRepository.get_all(self.session)
+
+    async def delete(self, recurring_id: UUID) -> None:
+        """
+        Удалить повторяющуюся задачу (уже созданные задачи не удаляются).
+
+        Raises:
+            RecurringTaskNotFoundError: Если задача не найдена
+        """
+        if not await RecurringTaskRepository.delete(self.session, recurring_id):
+            raise RecurringTaskNotFoundError(f"Recurring task {recurring_id} not found")
+
+
+def get_recurring_task_service(db: DBSession) -> RecurringTaskService:
+    """Dependency для получения сервиса повторяющихся задач."""
+    return RecurringTaskService(session=db)
+
+
+RecurringTaskServiceDep = Annotated[RecurringTaskService, Depends(get_recurring_task_service)]
+
+
+class RecurringTaskScheduler:
+    """
+    Создание задач по определениям повторяющихся задач.
+
+    Работает только лидер: экземпляр, удерживающий advisory lock Postgres
+    на отдельном соединении. Лидер заранее (за lookahead секунд) создает
+    задачи со статусом SCHEDULED и run_at = время по расписанию плюс
+    случайная задержка до jitter_seconds, в очередь их отправляет
+    TaskScheduler. Пропущенные запуски (например, пока лидера не было)
+    не догоняются: создается одна задача, следующий запуск — ближайший
+    после текущего времени.
+
+    Строки определений блокируются на время создания задачи и переноса
+    next_run_at, поэтому даже при кратковременной смене лидера запуск
+    не создается дважды.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        lock_key: int,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        interval: float = 1.0,
+        lookahead: float = 60.0,
+        batch_size: int = 100,
+    ):
+        """
+        Инициализация планировщика.
+
+        Args:
+            dsn: Строка подключения asyncpg для соединения с блокировкой
+            lock_key: Ключ advisory lock лидера
+            session_factory: Фабрика сессий
+            interval: Интервал проверки в секундах
+            lookahead: За сколько секунд до запуска создавать задачу
+            batch_size: Максимум определений за одну проверку
+        """
+        self.dsn = dsn
+        self.lock_key = lock_key
+        self.session_factory = session_factory
+        self.interval = interval
+        self.lookahead = lookahead
+        self.batch_size = batch_size
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def materialize(self, now: Optional[datetime] = None) -> int:
+        """
+        Создать задачи для определений, чей запуск наступает в окне lookahead.
+
+        Args:
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Количество созданных задач
+        """
+        now = now or datetime.utcnow()
+        async with self.session_factory() as session:
+            definitions = await RecurringTaskRepository.lock_due(
+                session,
+                now + timedelta(seconds=self.lookahead),
+                self.batch_size,
+            )
+            for definition in definitions:
+                fire_at = definition.next_run_at
+                jitter = random.uniform(0, definition.jitter_seconds) if definition.jitter_seconds else 0
+                session.add(Task(
+                    name=definition.name,
+                    description=definition.description,
+                    priority=definition.priority,
+                    tenant_id=definition.tenant_id,
+                    status=TaskStatus.SCHEDULED,
+                    run_at=fire_at + timedelta(seconds=jitter),
+                ))
+                definition.last_run_at = fire_at
+                definition.next_run_at = CronSchedule(definition.cron).next_after(max(fire_at, now))
+            await session.commit()
+
+        if definitions:
+            logger.info("Created %d tasks from recurring definitions", len(definitions))
+        return len(definitions)
+
+    async def _lead(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            while not await connection.fetchval("SELECT pg_try_advisory_lock($1)", self.lock_key):
+                await asyncio.sleep(self.interval)
+            self.is_leader = True
+            logger.info("Became recurring task scheduler leader")
+            while True:
+                await self.materialize()
+                await asyncio.sleep(self.interval)
+                # Блокировка держится, пока живо соединение
+                await asyncio.wait_for(connection.fetchval("SELECT 1"), self.interval * 5)
+        finally:
+            if self.is_leader:
+                logger.info("Lost recurring task scheduler leadership")
+            self.is_leader = False
+            # Закрытие соединения снимает блокировку
+            await connection.close(timeout=self.interval)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._lead()
+            except Exception as e:
+                logger.error("Recurring task scheduler failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запустить планировщик."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить планировщик."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_recurring_scheduler() -> RecurringTaskScheduler:
+    """Создать планировщик повторяющихся задач по настройкам приложения."""
+    return RecurringTaskScheduler(
+        dsn=_listen_dsn(),
+        lock_key=settings.recurring_lock_key,
+        interval=settings.recurring_interval,
+        lookahead=settings.recurring_lookahead,
+        batch_size=settings.recurring_batch_size,
+    )
@@ -0,0 +1,166 @@
+"""Маршрутизация чтения на реплику с учетом задержки репликации."""
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from typing import Annotated, Optional
+
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import (
+    AsyncSessionLocal,
+    DBSession,
+    ReplicaSessionLocal,
+    replica_engine,
+)
+
+logger = logging.getLogger(__name__)
+
+# Задержка воспроизведения WAL в секундах. Если все полученное уже
+# воспроизведено, задержка нулевая (иначе при простое основной БД время
+# последней транзакции растет и реплика ложно считается отстающей). Это
+# верно, только пока WAL receiver получает WAL: при обрыве репликации
+# полученное тоже воспроизведено, поэтому реплика без потоковой
+# репликации считается бесконечно отстающей. Статус receiver виден
+# ролям с pg_read_all_stats (например, pg_monitor).
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming')
+            THEN 'Infinity'::float8
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    """
+    Выбор базы данных для запросов только на чтение.
+
+    Периодически в фоне измеряет задержку реплики и хранит её в памяти.
+    Чтение направляется на реплику, только если задержка свежая и не
+    превышает порог, иначе — на основную БД.
+    """
+
+    def __init__(
+        self,
+        replica: Optional[AsyncEngine],
+        replica_sessions: Optional[async_sessionmaker[AsyncSession]],
+        primary_sessions: async_sessionmaker[AsyncSession],
+        max_lag: float = 5.0,
+        interval: float = 1.0,
+    ):
+        """
+        Инициализация маршрутизатора.
+
+        Args:
+            replica: Движок реплики (None — реплика не настроена)
+            replica_sessions: Фабрика сессий реплики
+            primary_sessions: Фабрика сессий основной БД
+            max_lag: Максимально допустимая задержка реплики в секундах
+            interval: Интервал измерения задержки в секундах
+        """
+        self.replica = replica
+        self.replica_sessions = replica_sessions
+        self.primary_sessions = primary_sessions
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _measure(self) -> float:
+        async with self.replica.connect() as conn:
+            return float((await conn.execute(text(REPLICA_LAG_SQL))).scalar_one())
+
+    async def refresh(self) -> Optional[float]:
+        """
+        Измерить задержку реплики.
+
+        Returns:
+            Задержка в секундах или None, если реплика недоступна
+        """
+        try:
+            self.lag = await asyncio.wait_for(self._measure(), self.interval * 2)
+        except Exception as e:
+            if self.lag is not None:
+                logger.warning("Replica lag check failed, reading from primary: %s", e)
+            self.lag = None
+        self.checked_at = datetime.utcnow()
+        return self.lag
+
+    def use_replica(self) -> bool:
+        """
+        Можно ли читать с реплики по последнему измерению.
+
+        Измерение считается устаревшим, если не обновлялось дольше
+        трех интервалов.
+        """
+        if self.replica is None or self.lag is None or self.checked_at is None:
+            return False
+        age = (datetime.utcnow() - self.checked_at).total_seconds()
+        return age <= self.interval * 3 and self.lag <= self.max_lag
+
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Фабрика сессий для чтения: реплика или основная БД."""
+        if self.use_replica():
+            return self.replica_sessions
+        return self.primary_sessions
+
+    async def _run(self) -> None:
+        was_used = False
+        while True:
+            await self.refresh()
+            used = self.use_replica()
+            if used != was_used:
+                if used:
+                    logger.info("Reading from replica (lag %.3fs)", self.lag)
+                else:
+                    logger.warning("Replica lag %s exceeds %ss, reading from primary", self.lag, self.max_lag)
+                was_used = used
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запустить фоновое измерение задержки (если реплика настроена)."""
+        if self.replica is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновое измерение задержки."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+replica_router = ReplicaRouter(
+    replica=replica_engine,
+    replica_sessions=ReplicaSessionLocal,
+    primary_sessions=AsyncSessionLocal,
+    max_lag=settings.db_replica_max_lag,
+    interval=settings.db_replica_check_interval,
+)
+
+
+async def get_read_session(db: DBSession) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency для получения сессии только для чтения.
+
+    Если реплика не настроена или отстает, возвращается та же сессия
+    основной БД, что и у DBSession в этом запросе.
+    """
+    if not replica_router.use_replica():
+        yield db
+        return
+    async with replica_router.replica_sessions() as session:
+        yield session
+
+
+ReadDBSession = Annotated[AsyncSession, Depends(get_read_session)]
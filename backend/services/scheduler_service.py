@@ -0,0 +1,265 @@
+"""Планировщик отложенных задач."""
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.models import TaskStatus
+from backend.repository import TaskRepository
+from backend.services.task_events_service import RESYNC
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Ключ запланированной задачи: (id, created_at)
+TaskKey = Tuple[UUID, datetime]
+
+
+def timestamp(value: datetime) -> float:
+    """Секунды от начала эпохи для даты в UTC без часового пояса."""
+    return (value - EPOCH).total_seconds()
+
+
+class TimerWheel:
+    """
+    Хешированное колесо таймеров.
+
+    Время делится на тики длительностью tick, таймер попадает в ячейку
+    первого тика не раньше своего времени срабатывания. Добавление и
+    срабатывание стоят O(1) на таймер, продвижение — O(число пройденных
+    ячеек). Колесо хранит таймеры не дальше одного оборота (slots тиков)
+    от текущей позиции.
+    """
+
+    def __init__(self, tick: float, slots: int, now: float):
+        """
+        Инициализация колеса.
+
+        Args:
+            tick: Длительность тика в секундах
+            slots: Количество ячеек
+            now: Текущее время в секундах
+        """
+        self.tick = tick
+        self._slots: List[Dict[Hashable, Tuple[int, Any]]] = [{} for _ in range(slots)]
+        self._cursor = int(now // tick)
+        self._index: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def add(self, key: Hashable, deadline: float, item: Any) -> bool:
+        """
+        Добавить таймер (повторное добавление ключа игнорируется).
+
+        Просроченный таймер срабатывает при следующем продвижении.
+
+        Args:
+            key: Ключ таймера
+            deadline: Время срабатывания в секундах
+            item: Значение, возвращаемое при срабатывании
+
+        Returns:
+            False, если время срабатывания дальше одного оборота колеса
+        """
+        if key in self._index:
+            return True
+        tick = max(math.ceil(deadline / self.tick), self._cursor + 1)
+        if tick >= self._cursor + len(self._slots):
+            return False
+        slot = tick % len(self._slots)
+        self._slots[slot][key] = (tick, item)
+        self._index[key] = slot
+        return True
+
+    def advance(self, now: float) -> List[Any]:
+        """
+        Продвинуть колесо до текущего времени.
+
+        Args:
+            now: Текущее время в секундах
+
+        Returns:
+            Значения сработавших таймеров
+        """
+        target = int(now // self.tick)
+        if target <= self._cursor:
+            return []
+
+        due = []
+        steps = min(target - self._cursor, len(self._slots))
+        for offset in range(1, steps + 1):
+            slot = self._slots[(self._cursor + offset) % len(self._slots)]
+            if not slot:
+                continue
+            for key in [key for key, (tick, _) in slot.items() if tick <= target]:
+                due.append(slot.pop(key)[1])
+                del self._index[key]
+        self._cursor = target
+        return due
+
+
+class TaskScheduler:
+    """
+    Отправка запланированных задач в очередь при наступлении run_at.
+
+    Из БД по частичному индексу загружаются только задачи ближайшего окна
+    (window секунд), они ждут срабатывания в колесе таймеров в памяти.
+    Задачи, запланированные на это окно после загрузки, добавляются по
+    событиям смены статуса (NOTIFY), остальные — при следующей загрузке.
+    Стоимость не зависит от количества задач на дальнее будущее.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[List[Tuple[UUID, str]]], Awaitable[Any]],
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        window: float = 60.0,
+        tick: float = 0.1,
+        batch_size: int = 1000,
+    ):
+        """
+        Инициализация планировщика.
+
+        Args:
+            publish: Функция отправки пачки задач в очередь (пары ID задачи, арендатор)
+            session_factory: Фабрика сессий
+            window: Окно загрузки задач в секундах
+            tick: Точность срабатывания в секундах
+            batch_size: Максимум задач за одну загрузку и одно переключение статуса
+        """
+        self.publish = publish
+        self.session_factory = session_factory
+        self.window = window
+        self.tick = tick
+        self.batch_size = batch_size
+        self.wheel = TimerWheel(tick, math.ceil(window * 2 / tick) + 1, timestamp(datetime.utcnow()))
+        self.loaded_until: Optional[datetime] = None
+        self._next_refresh: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _schedule(self, task_id: UUID, created_at: datetime, run_at: datetime) -> None:
+        if not self.wheel.add(task_id, timestamp(run_at), (task_id, created_at)):
+            # Не поместилась в колесо: загрузится при следующем обновлении
+            self.loaded_until = min(self.loaded_until, run_at - timedelta(microseconds=1))
+
+    async def refresh(self, now: Optional[datetime] = None) -> int:
+        """
+        Загрузить задачи ближайшего окна в колесо таймеров.
+
+        Args:
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Количество загруженных задач
+        """
+        now = now or datetime.utcnow()
+        until = now + timedelta(seconds=self.window)
+        async with self.session_factory() as session:
+            rows = await TaskRepository.get_scheduled(session, until, self.batch_size)
+
+        if len(rows) >= self.batch_size:
+            # Окно загружено не полностью: остальное — после срабатывания загруженных
+            until = rows[-1].run_at
+        self.loaded_until = until
+        for row in rows:
+            self._schedule(row.id, row.created_at, row.run_at)
+
+        self._next_refresh = now + max(
+            timedelta(seconds=self.tick),
+            min(timedelta(seconds=self.window / 2), (self.loaded_until - now) / 2),
+        )
+        return len(rows)
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """Обработчик событий хаба: добавить новую задачу ближайшего окна."""
+        if event is RESYNC:
+            self._next_refresh = None
+            return
+        if event.get("status") != TaskStatus.SCHEDULED.value or not event.get("run_at"):
+            return
+        run_at = datetime.fromisoformat(event["run_at"])
+        if self.loaded_until is not None and run_at <= self.loaded_until:
+            self._schedule(UUID(event["id"]), datetime.fromisoformat(event["created_at"]), run_at)
+
+    async def dispatch(self, keys: List[TaskKey], now: Optional[datetime] = None) -> List[UUID]:
+        """
+        Перевести наступившие задачи в PENDING и отправить в очередь.
+
+        Args:
+            keys: Ключи задач
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            ID отправленных задач
+        """
+        # Допуск в один тик на округление времени срабатывания колеса
+        due_until = (now or datetime.utcnow()) + timedelta(seconds=self.tick)
+        claimed: List[Tuple[UUID, str]] = []
+        for start in range(0, len(keys), self.batch_size):
+            async with self.session_factory() as session:
+                claimed.extend(
+                    await TaskRepository.claim_scheduled(session, keys[start:start + self.batch_size], due_until)
+                )
+
+        if claimed:
+            try:
+                await self.publish(claimed)
+            except Exception as e:
+                logger.error("Failed to publish %d scheduled tasks: %s", len(claimed), e)
+            logger.info("Dispatched %d scheduled tasks", len(claimed))
+        return [task_id for task_id, _ in claimed]
+
+    async def run_once(self) -> None:
+        """Обновить окно при необходимости и отправить наступившие задачи."""
+        now = datetime.utcnow()
+        if self._next_refresh is None or now >= self._next_refresh:
+            await self.refresh(now)
+        due = self.wheel.advance(timestamp(now))
+        if due:
+            await self.dispatch(due, now)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Task scheduler failed: %s", e)
+                self._next_refresh = None
+                await asyncio.sleep(self.window / 10)
+            await asyncio.sleep(self.tick)
+
+    def start(self) -> None:
+        """Запустить планировщик."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить планировщик."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_task_scheduler(publish: Callable[[List[Tuple[UUID, str]]], Awaitable[Any]]) -> TaskScheduler:
+    """Создать планировщик по настройкам приложения."""
+    return TaskScheduler(
+        publish=publish,
+        window=settings.scheduler_window,
+        tick=settings.scheduler_tick,
+        batch_size=settings.scheduler_batch_size,
+    )
@@ -0,0 +1,119 @@
+"""Объединение одинаковых вычислений в процессе worker."""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import orjson
+
+from backend.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def task_content_key(task: Task) -> str:
+    """
+    Ключ содержимого задачи: SHA-256 входных данных обработчика.
+
+    Задачи с одинаковым ключом считаются одинаковой работой.
+    """
+    body = orjson.dumps({"name": task.name, "description": task.description}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(body).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """Ведущий вызов отменен, ожидающие выполняют работу заново."""
+
+
+class SingleFlight:
+    """
+    Однократное выполнение одинаковой работы.
+
+    Пока вычисление по ключу выполняется, остальные вызовы с тем же ключом
+    ждут его результат (или ошибку) вместо повторного запуска. Если ведущий
+    вызов отменен (например, отменена его задача), ожидающие не получают
+    ошибку: один из них становится новым ведущим и выполняет работу. Успешные
+    результаты хранятся в LRU-кэше ограниченного размера в течение ttl
+    секунд (0 — только объединение одновременных вызовов).
+    """
+
+    def __init__(self, ttl: float = 0.0, max_size: int = 1024):
+        """
+        Инициализация.
+
+        Args:
+            ttl: Время повторного использования результата в секундах
+            max_size: Максимальное количество результатов в кэше
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, value
+
+    def _store(self, key: str, value: Any) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнить fn один раз для ключа.
+
+        Args:
+            key: Ключ работы
+            fn: Функция, выполняющая работу
+
+        Returns:
+            Результат fn (общий для всех одновременных вызовов с ключом)
+        """
+        while True:
+            hit, value = self._cached(key)
+            if hit:
+                logger.debug("Reusing cached result for key %s", key)
+                return value
+
+            shared = self._inflight.get(key)
+            if shared is None:
+                break
+            logger.debug("Joining in-flight computation for key %s", key)
+            try:
+                return await asyncio.shield(shared)
+            except _LeaderCancelled:
+                logger.debug("Computation for key %s was cancelled, running it again", key)
+
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[key] = shared
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            # Отменена только эта задача: ожидающие выполнят работу заново
+            shared.set_exception(_LeaderCancelled())
+            shared.exception()
+            raise
+        except Exception as e:
+            shared.set_exception(e)
+            # Ошибка доставляется ожидающим, если они есть
+            shared.exception()
+            raise
+        else:
+            shared.set_result(value)
+            self._store(key, value)
+            return value
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,146 @@
+"""Сервис статистики задач."""
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Dict, Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.exceptions import InvalidTaskFilterError
+from backend.models import TaskStatus
+from backend.repository import StatsRepository
+from backend.services.replica_service import ReadDBSession
+from backend.repository.stats_repository import (
+    METRIC_QUEUE_WAIT,
+    METRIC_RUN_DURATION,
+    bin_bounds,
+    minute_bucket,
+)
+from backend.schemas import (
+    LatencyPercentiles,
+    StatusCount,
+    TaskStatsResponse,
+    ThroughputPoint,
+)
+
+
+def histogram_percentile(histogram: Dict[int, int], quantile: float) -> Optional[float]:
+    """
+    Оценить перцентиль по логарифмической гистограмме.
+
+    Внутри корзины значение интерполируется между ее границами.
+
+    Args:
+        histogram: Словарь {корзина: количество}
+        quantile: Квантиль от 0 до 1
+
+    Returns:
+        Оценка в миллисекундах или None для пустой гистограммы
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+
+    rank = quantile * total
+    seen = 0
+    for bin_number in sorted(histogram):
+        count = histogram[bin_number]
+        if seen + count >= rank:
+            lower, upper = bin_bounds(bin_number)
+            fraction = (rank - seen) / count if count else 1.0
+            return round(lower + (upper - lower) * fraction, 3)
+        seen += count
+
+    return round(bin_bounds(max(histogram))[1], 3)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Привести время с часовым поясом к наивному UTC, как в БД."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _percentiles(histogram: Dict[int, int]) -> LatencyPercentiles:
+    return LatencyPercentiles(
+        count=sum(histogram.values()),
+        p50=histogram_percentile(histogram, 0.50),
+        p95=histogram_percentile(histogram, 0.95),
+        p99=histogram_percentile(histogram, 0.99),
+    )
+
+
+class StatsService:
+    """Сервис статистики задач по поминутным агрегатам."""
+    
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализация сервиса.
+        
+        Args:
+            session: Сессия базы данных
+        """
+        self.session = session
+    
+    async def get_stats(
+        self,
+        window_from: Optional[datetime] = None,
+        window_to: Optional[datetime] = None,
+    ) -> TaskStatsResponse:
+        """
+        Получить статистику задач за окно времени.
+        
+        Читаются только агрегаты task_stats и task_latency_stats,
+        таблица tasks не сканируется. Границы окна округляются до минуты.
+        
+        Args:
+            window_from: Начало окна (по умолчанию STATS_DEFAULT_WINDOW_MINUTES назад)
+            window_to: Конец окна (по умолчанию текущий момент)
+            
+        Returns:
+            Статистика за окно
+            
+        Raises:
+            InvalidTaskFilterError: Если начало окна не раньше конца
+        """
+        window_to = _naive_utc(window_to) or datetime.utcnow()
+        window_from = _naive_utc(window_from) or window_to - timedelta(
+            minutes=settings.stats_default_window_minutes
+        )
+        if window_from >= window_to:
+            raise InvalidTaskFilterError("Stats window start must be before its end")
+        
+        bucket_from = minute_bucket(window_from)
+        bucket_to = minute_bucket(window_to) + timedelta(minutes=1)
+        
+        counts = await StatsRepository.get_status_counts(self.session, bucket_from, bucket_to)
+        throughput_rows = await StatsRepository.get_throughput(self.session, bucket_from, bucket_to)
+        histograms = await StatsRepository.get_histograms(self.session, bucket_from, bucket_to)
+        
+        throughput: Dict[datetime, ThroughputPoint] = {}
+        for bucket, status, count in throughput_rows:
+            point = throughput.setdefault(bucket, ThroughputPoint(bucket=bucket))
+            if status == TaskStatus.COMPLETED:
+                point.completed += count
+            else:
+                point.failed += count
+        
+        return TaskStatsResponse(
+            window_from=bucket_from,
+            window_to=bucket_to,
+            counts=[
+                StatusCount(status=status, priority=priority, count=count)
+                for status, priority, count in counts
+            ],
+            throughput=list(throughput.values()),
+            queue_wait=_percentiles(histograms.get(METRIC_QUEUE_WAIT, {})),
+            run_duration=_percentiles(histograms.get(METRIC_RUN_DURATION, {})),
+        )
+
+
+def get_stats_service(db: ReadDBSession) -> StatsService:
+    """Dependency для получения сервиса статистики."""
+    return StatsService(session=db)
+
+
+StatsServiceDep = Annotated[StatsService, Depends(get_stats_service)]
@@ -0,0 +1,315 @@
+"""Раздача событий смены статуса задач подписчикам (SSE и WebSocket)."""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.models import TaskStatus
+from backend.repository import TaskRepository
+from backend.repository.task_events import task_event_payload
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {
+    TaskStatus.COMPLETED.value,
+    TaskStatus.FAILED.value,
+    TaskStatus.CANCELLED.value,
+}
+
+# Сигнал подписчику, что события могли быть потеряны и нужно перечитать статусы
+RESYNC: Dict[str, Any] = {"resync": True}
+
+# Событие потока: (тип события, данные) или None для heartbeat
+TaskEvent = Optional[Tuple[str, Dict[str, Any]]]
+
+
+class TaskEventHub:
+    """
+    Раздача событий NOTIFY подписчикам процесса.
+
+    На процесс открывается одно соединение asyncpg с LISTEN, события
+    раскладываются по очередям подписчиков в памяти. Медленному
+    подписчику при переполнении очереди отправляется RESYNC вместо
+    накопленных событий. После переподключения RESYNC получают все.
+
+    Кроме подписчиков хаб хранит ожидающих завершения задачи (long-poll):
+    это только Future в словаре, без очереди, поэтому их может быть
+    десятки тысяч на процесс.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        queue_size: int = 100,
+        reconnect_delay: float = 2.0,
+        ping_interval: float = 15.0,
+    ):
+        """
+        Инициализация хаба.
+
+        Args:
+            dsn: Строка подключения к Postgres (без драйвера SQLAlchemy)
+            channel: Канал LISTEN/NOTIFY
+            queue_size: Размер очереди одного подписчика
+            reconnect_delay: Пауза перед переподключением в секундах
+            ping_interval: Интервал проверки соединения в секундах
+        """
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.ping_interval = ping_interval
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._waiters: Dict[str, Set[asyncio.Future]] = defaultdict(set)
+        self._handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+
+    @property
+    def running(self) -> bool:
+        """Запущено ли прослушивание событий (TASK_EVENTS_ENABLED)."""
+        return self._task is not None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Количество активных подписок."""
+        return len({id(queue) for queues in self._subscribers.values() for queue in queues})
+
+    @property
+    def waiter_count(self) -> int:
+        """Количество ожидающих завершения задач."""
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @staticmethod
+    def _wake(waiters: Set[asyncio.Future], event: Dict[str, Any]) -> None:
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(event)
+
+    def add_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Добавить обработчик всех событий процесса (например, для планировщика).
+
+        Обработчик вызывается синхронно для каждого события и для RESYNC
+        после переподключения, он не должен блокировать event loop.
+
+        Args:
+            handler: Функция, принимающая событие
+        """
+        self._handlers.append(handler)
+
+    def _deliver(self, queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    def dispatch(self, payload: str) -> None:
+        """
+        Передать событие подписчикам задачи.
+
+        Args:
+            payload: JSON события из NOTIFY
+        """
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Malformed task event payload: %s", payload)
+            return
+        for queue in tuple(self._subscribers.get(event.get("id"), ())):
+            self._deliver(queue, event)
+        if event.get("status") in TERMINAL_STATUSES and event.get("id") in self._waiters:
+            self._wake(self._waiters[event["id"]], event)
+        for handler in self._handlers:
+            handler(event)
+
+    def _broadcast_resync(self) -> None:
+        queues = {id(queue): queue for queues in self._subscribers.values() for queue in queues}
+        for queue in queues.values():
+            self._deliver(queue, RESYNC)
+        for waiters in self._waiters.values():
+            self._wake(waiters, RESYNC)
+        for handler in self._handlers:
+            handler(RESYNC)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.dispatch(payload)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(self.channel, self._on_notify)
+            self.connected = True
+            logger.info("Listening for task events on channel '%s'", self.channel)
+            # События за время переподключения могли быть пропущены
+            self._broadcast_resync()
+            while not connection.is_closed():
+                await asyncio.sleep(self.ping_interval)
+                await asyncio.wait_for(connection.fetchval("SELECT 1"), self.ping_interval)
+        finally:
+            self.connected = False
+            await connection.close(timeout=self.reconnect_delay)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Task events listener failed: %s", e)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> None:
+        """Запустить фоновое соединение LISTEN."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновое соединение LISTEN."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @asynccontextmanager
+    async def subscribe(self, task_ids: List[UUID]) -> AsyncIterator[asyncio.Queue]:
+        """
+        Подписаться на события задач.
+
+        Args:
+            task_ids: Список ID задач
+
+        Yields:
+            Очередь событий подписчика
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        keys = {str(task_id) for task_id in task_ids}
+        for key in keys:
+            self._subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            for key in keys:
+                queues = self._subscribers.get(key)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[key]
+
+    @asynccontextmanager
+    async def wait_for_terminal(self, task_id: UUID) -> AsyncIterator[asyncio.Future]:
+        """
+        Зарегистрировать ожидание конечного статуса задачи.
+
+        Future получает событие при переходе задачи в конечный статус
+        или RESYNC после переподключения LISTEN (статус нужно перечитать).
+        Регистрироваться нужно до чтения статуса из БД, чтобы не пропустить
+        завершение между чтением и началом ожидания.
+
+        Args:
+            task_id: ID задачи
+
+        Yields:
+            Future с событием
+        """
+        key = str(task_id)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[key].add(waiter)
+        try:
+            yield waiter
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[key]
+
+
+async def task_status_events(
+    hub: TaskEventHub,
+    task_ids: List[UUID],
+    heartbeat_interval: float,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> AsyncIterator[TaskEvent]:
+    """
+    Поток событий статусов для подписчика.
+
+    Сначала отдается текущий статус каждой задачи, затем изменения.
+    Поток завершается, когда все задачи пришли в конечный статус.
+
+    Args:
+        hub: Хаб событий процесса
+        task_ids: Список ID задач
+        heartbeat_interval: Интервал heartbeat в секундах
+        session_factory: Фабрика сессий для чтения текущих статусов
+
+    Yields:
+        ("status", данные) при смене статуса, ("not_found", {"id": ...})
+        для неизвестной задачи, None для heartbeat
+    """
+    async with hub.subscribe(task_ids) as queue:
+        pending = {str(task_id) for task_id in task_ids}
+
+        async def snapshot() -> AsyncIterator[TaskEvent]:
+            # Сессия закрывается сразу, соединение не держится на время потока
+            async with session_factory() as session:
+                rows = await TaskRepository.get_statuses(session, task_ids)
+            found = set()
+            for row in rows:
+                payload = task_event_payload(row)
+                found.add(payload["id"])
+                if payload["status"] in TERMINAL_STATUSES:
+                    pending.discard(payload["id"])
+                yield "status", payload
+            for task_id in pending - found:
+                pending.discard(task_id)
+                yield "not_found", {"id": task_id}
+
+        async for event in snapshot():
+            yield event
+
+        while pending:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat_interval)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+
+            if event is RESYNC:
+                async for snapshot_event in snapshot():
+                    yield snapshot_event
+                continue
+
+            if event["status"] in TERMINAL_STATUSES:
+                pending.discard(event["id"])
+            yield "status", event
+
+
+def _listen_dsn() -> str:
+    if settings.task_events_database_url:
+        return settings.task_events_database_url
+    return settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+task_event_hub = TaskEventHub(
+    dsn=_listen_dsn(),
+    channel=settings.task_events_channel,
+    queue_size=settings.task_events_queue_size,
+    reconnect_delay=settings.task_events_reconnect_delay,
+    ping_interval=settings.task_events_heartbeat_interval,
+)
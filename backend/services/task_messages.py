@@ -0,0 +1,209 @@
+"""Формат сообщений очереди задач."""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Set
+from uuid import UUID
+
+# Конверт: сигнатура, версия формата, количество задач, затем ID задач по 16 байт
+TASK_MESSAGE_MAGIC = b"TQ"
+TASK_MESSAGE_VERSION = 1
+TASK_MESSAGE_CONTENT_TYPE = "application/x-task-ids"
+JSON_CONTENT_TYPE = "application/json"
+
+_HEADER = struct.Struct(">2sBI")
+_UUID_SIZE = 16
+
+
+def encode_task_ids(task_ids: List[UUID]) -> bytes:
+    """
+    Упаковать ID задач в двоичный конверт.
+
+    Args:
+        task_ids: ID задач
+
+    Returns:
+        Тело сообщения
+    """
+    header = _HEADER.pack(TASK_MESSAGE_MAGIC, TASK_MESSAGE_VERSION, len(task_ids))
+    return header + b"".join(task_id.bytes for task_id in task_ids)
+
+
+def decode_task_ids(body: bytes) -> List[UUID]:
+    """
+    Распаковать ID задач из тела сообщения.
+
+    Кроме двоичного конверта принимаются JSON-сообщения прежнего формата
+    ({"task_id": ...} и {"task_ids": [...]}), чтобы worker понимали
+    сообщения, отправленные до обновления.
+
+    Args:
+        body: Тело сообщения
+
+    Returns:
+        ID задач
+
+    Raises:
+        ValueError: Если тело сообщения не удалось разобрать
+    """
+    if not body.startswith(TASK_MESSAGE_MAGIC):
+        return _decode_json(body)
+    if len(body) < _HEADER.size:
+        raise ValueError("Truncated task message header")
+    _, version, count = _HEADER.unpack_from(body)
+    if version != TASK_MESSAGE_VERSION:
+        raise ValueError(f"Unsupported task message version {version}")
+    if len(body) != _HEADER.size + count * _UUID_SIZE:
+        raise ValueError(f"Task message size does not match {count} task ids")
+    return [
+        UUID(bytes=body[offset:offset + _UUID_SIZE])
+        for offset in range(_HEADER.size, len(body), _UUID_SIZE)
+    ]
+
+
+def _decode_json(body: bytes) -> List[UUID]:
+    try:
+        data = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Malformed task message: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Malformed task message: expected an object")
+    if "task_ids" in data:
+        return [UUID(task_id) for task_id in data["task_ids"]]
+    if "task_id" in data:
+        return [UUID(data["task_id"])]
+    raise ValueError("Malformed task message: no task ids")
+
+
+def encode_json_task_id(task_id: UUID) -> bytes:
+    """Тело сообщения прежнего JSON-формата с одной задачей."""
+    return json.dumps({"task_id": str(task_id)}).encode()
+
+
+class AckTracker:
+    """
+    Групповое подтверждение сообщений канала.
+
+    Сообщения подтверждаются не по одному: обработанные сообщения
+    отмечаются, а flush подтверждает их одним basic.ack с multiple=True
+    до последнего сообщения, перед которым все полученные сообщения уже
+    обработаны. Так multiple=True не затрагивает сообщения, которые еще
+    обрабатываются или ждут в буфере. Обработанные сообщения после
+    первого необработанного подтверждаются по отдельности, чтобы
+    медленная задача не удерживала prefetch.
+    """
+
+    def __init__(self):
+        """Инициализация."""
+        self._channel: Any = None
+        self._unsettled: Dict[int, Any] = {}
+        self._acked: Set[int] = set()
+
+    @property
+    def unsettled(self) -> int:
+        """Количество полученных и еще не подтвержденных сообщений."""
+        return len(self._unsettled)
+
+    def register(self, message: Any) -> None:
+        """
+        Зарегистрировать полученное сообщение.
+
+        Номера доставки действуют в пределах канала: после переподключения
+        неподтвержденные сообщения старого канала брокер доставит заново,
+        поэтому их отметки сбрасываются.
+        """
+        if message.channel is not self._channel:
+            self._channel = message.channel
+            self._unsettled.clear()
+            self._acked.clear()
+        self._unsettled[message.delivery_tag] = message
+
+    def ack(self, message: Any) -> None:
+        """Отметить сообщение как обработанное (подтверждается при flush)."""
+        if message.delivery_tag in self._unsettled:
+            self._acked.add(message.delivery_tag)
+
+    async def nack(self, message: Any) -> None:
+        """Вернуть сообщение в очередь."""
+        self._unsettled.pop(message.delivery_tag, None)
+        self._acked.discard(message.delivery_tag)
+        await message.nack(requeue=True)
+
+    async def flush(self) -> None:
+        """Подтвердить обработанные сообщения."""
+        if not self._acked:
+            return
+        last = None
+        for tag in sorted(self._unsettled):
+            if tag not in self._acked:
+                break
+            last = self._unsettled.pop(tag)
+            self._acked.discard(tag)
+        single = [self._unsettled.pop(tag) for tag in sorted(self._acked)]
+        self._acked.clear()
+        if last is not None:
+            await last.ack(multiple=True)
+        for message in single:
+            await message.ack()
+
+
+class EnvelopeAck:
+    """
+    Подтверждение сообщения, несущего несколько задач.
+
+    Задачи конверта обрабатываются независимо; когда завершена обработка
+    последней из них, сообщение отмечается обработанным или, если хотя
+    бы одну задачу нужно повторить, возвращается в очередь целиком
+    (обработанные задачи при повторной доставке пропускаются).
+    """
+
+    def __init__(self, message: Any, pending: int, tracker: AckTracker):
+        """
+        Инициализация.
+
+        Args:
+            message: Входящее сообщение
+            pending: Количество задач в сообщении
+            tracker: Подтверждение сообщений канала
+        """
+        self.message = message
+        self.pending = pending
+        self.tracker = tracker
+        self.retry = False
+
+    async def done(self, retry: bool = False) -> None:
+        """
+        Отметить завершение обработки одной задачи конверта.
+
+        Args:
+            retry: Задачу нужно повторить
+        """
+        self.retry = self.retry or retry
+        self.pending -= 1
+        if self.pending > 0:
+            return
+        if self.retry:
+            await self.tracker.nack(self.message)
+        else:
+            self.tracker.ack(self.message)
+
+
+class TaskDelivery:
+    """Задача из сообщения очереди."""
+
+    def __init__(
+        self,
+        queue_name: str,
+        task_id: UUID,
+        ack: Optional[EnvelopeAck] = None,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            queue_name: Очередь, из которой получено сообщение
+            task_id: ID задачи
+            ack: Подтверждение сообщения
+        """
+        self.queue_name = queue_name
+        self.task_id = task_id
+        self.ack = ack
@@ -1,14 +1,22 @@
 """Сервис для обработки задач в worker."""
 import asyncio
+import gzip
+import hashlib
 import logging
 from datetime import datetime
+from typing import Any, List, Optional
 from uuid import UUID
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.config import settings
 from backend.repository import TaskRepository
-from backend.models import TaskStatus
+from backend.models import Task, TaskStatus
 from backend.exceptions import TaskNotFoundError
+from backend.services.blob_store import BlobStore, result_key, result_store
+from backend.services.rabbitmq_service import RabbitMQService
+from backend.services.single_flight import SingleFlight, task_content_key
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +24,28 @@ logger = logging.getLogger(__name__)
 class TaskProcessingService:
     """Сервис для обработки задач в worker."""
     
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        blob_store: Optional[BlobStore] = None,
+        single_flight: Optional[SingleFlight] = None,
+        rabbitmq_service: Optional[RabbitMQService] = None,
+    ):
         """
         Инициализация сервиса обработки.
         
         Args:
             session: Сессия базы данных
+            blob_store: Хранилище крупных результатов (по умолчанию локальное)
+            single_flight: Объединение одинаковых задач (None — каждая задача обрабатывается отдельно)
+            rabbitmq_service: Сервис RabbitMQ для отправки освобожденных зависимых задач
         """
         self.session = session
+        self.blob_store = blob_store or result_store
+        self.single_flight = single_flight
+        self.rabbitmq_service = rabbitmq_service
     
-    async def process_task(self, task_id: UUID) -> dict:
+    async def process_task(self, task: Task) -> dict:
         """
         Обработка задачи.
         
@@ -34,8 +54,12 @@ class TaskProcessingService:
         - Обрабатывается в очереди
         - Результат сохраняется обратно в БД
         
+        Результат может быть общим для одинаковых задач (см. compute_result),
+        поэтому зависит только от входных данных task_content_key; поля
+        конкретной задачи добавляет compute_result.
+        
         Args:
-            task_id: ID задачи для обработки
+            task: Задача для обработки
             
         Returns:
             Результат обработки задачи
@@ -43,19 +67,56 @@ class TaskProcessingService:
         await asyncio.sleep(2)
         
         result = {
-            "task_id": str(task_id),
             "processed_at": datetime.utcnow().isoformat(),
             "message": "Task processed successfully",
         }
         
         return result
     
-    async def start_processing(self, task_id: UUID) -> None:
+    async def compute_result(self, task: Task) -> dict:
+        """
+        Получить результат задачи.
+        
+        Если включено объединение, задачи с одинаковыми входными данными,
+        обрабатываемые одновременно (или недавно), получают результат
+        одного запуска process_task; task_id в результат каждой задачи
+        добавляется уже после объединения.
+        
+        Args:
+            task: Задача
+            
+        Returns:
+            Результат обработки задачи
+        """
+        if self.single_flight is None:
+            output = await self.process_task(task)
+        else:
+            output = await self.single_flight.run(
+                task_content_key(task),
+                lambda: self.process_task(task),
+            )
+        return {"task_id": str(task.id), **output}
+    
+    async def start_processing(
+        self,
+        task_id: UUID,
+        lease_owner: Optional[str] = None,
+        lease_expires_at: Optional[datetime] = None,
+    ) -> Task:
         """
         Начать обработку задачи (обновить статус на IN_PROGRESS).
         
+        Если передан lease_expires_at, задача берется в аренду worker
+        lease_owner: пока worker не продлевает аренду, по её истечении
+        задачу вернет в очередь TaskReaper.
+        
         Args:
             task_id: ID задачи
+            lease_owner: Идентификатор worker
+            lease_expires_at: Время окончания аренды
+            
+        Returns:
+            Задача
             
         Raises:
             TaskNotFoundError: Если задача не найдена
@@ -65,40 +126,205 @@ class TaskProcessingService:
             task_id=task_id,
             status=TaskStatus.IN_PROGRESS,
             started_at=datetime.utcnow(),
+            lease_owner=lease_owner,
+            lease_expires_at=lease_expires_at,
         )
         
         if not task:
             raise TaskNotFoundError(f"Task with id {task_id} not found")
+        return task
+    
+    async def claim_tasks(
+        self,
+        task_ids: List[UUID],
+        lease_owner: str,
+        lease_expires_at: datetime,
+    ) -> List[Any]:
+        """
+        Взять пачку задач в обработку одним запросом.
+        
+        Задачи не в статусе PENDING (уже обрабатываются, завершены,
+        отменены или не найдены) пропускаются.
+        
+        Args:
+            task_ids: ID задач
+            lease_owner: Идентификатор worker
+            lease_expires_at: Время окончания аренды
+            
+        Returns:
+            Строки взятых задач (см. TaskRepository.claim_for_processing)
+        """
+        tasks = await TaskRepository.claim_for_processing(
+            self.session,
+            task_ids,
+            lease_owner,
+            lease_expires_at,
+            datetime.utcnow(),
+        )
+        await self.session.commit()
+        return tasks
+    
+    async def release_for_retry(self, task_ids: List[UUID], lease_owner: str) -> int:
+        """
+        Вернуть задачи в PENDING для повторной попытки.
+        
+        Возвращаются только задачи, аренда которых все еще принадлежит
+        lease_owner.
+        
+        Args:
+            task_ids: ID задач
+            lease_owner: Идентификатор worker
+            
+        Returns:
+            Количество возвращенных задач
+        """
+        rows = await TaskRepository.bulk_update_status(
+            self.session,
+            (TaskStatus.IN_PROGRESS,),
+            TaskStatus.PENDING,
+            limit=len(task_ids),
+            task_ids=task_ids,
+            values={"lease_owner": None, "lease_expires_at": None},
+            lease_owner=lease_owner,
+        )
+        await self.session.commit()
+        return len(rows)
     
-    async def complete_processing(self, task_id: UUID, result: dict) -> None:
+    async def complete_processing(
+        self,
+        task_id: UUID,
+        result: dict,
+        lease_owner: Optional[str] = None,
+    ) -> bool:
         """
         Завершить обработку задачи успешно.
         
+        Результат больше RESULT_INLINE_MAX_BYTES сжимается gzip и сохраняется
+        во внешнее хранилище, в строке задачи остаются только ссылка,
+        размер и контрольная сумма.
+        
+        Итоговый статус записывается, только если задача все еще в
+        IN_PROGRESS и в аренде lease_owner (см. TaskRepository.finish_processing).
+        Иначе (задача отменена или возвращена в очередь по истечении аренды)
+        результат отбрасывается: он не выгружается во внешнее хранилище,
+        зависимые задачи не освобождаются.
+        
+        В той же транзакции уменьшаются счетчики незавершенных родителей
+        зависимых задач; задачи, дождавшиеся всех родителей, отправляются
+        в очередь после фиксации.
+        
         Args:
             task_id: ID задачи
             result: Результат обработки
+            lease_owner: Идентификатор worker, владеющего арендой
+            
+        Returns:
+            True, если результат записан
         """
-        await TaskRepository.update_status(
+        payload = orjson.dumps(result)
+        fields = {"result": result}
+        offloaded = len(payload) > settings.result_inline_max_bytes
+        if offloaded:
+            fields = {
+                "result_ref": result_key(task_id),
+                "result_size": len(payload),
+                "result_checksum": hashlib.sha256(payload).hexdigest(),
+            }
+        
+        now = datetime.utcnow()
+        finished = await TaskRepository.finish_processing(
             self.session,
-            task_id=task_id,
-            status=TaskStatus.COMPLETED,
-            completed_at=datetime.utcnow(),
-            result=result,
+            task_id,
+            TaskStatus.COMPLETED,
+            now,
+            lease_owner=lease_owner,
+            values=fields,
         )
+        if finished is None:
+            await self.session.rollback()
+            logger.warning(
+                "Task %s is no longer processed by this worker, result dropped", task_id,
+                extra={"task_id": str(task_id)},
+            )
+            return False
+        
+        if offloaded:
+            # Строка задачи заблокирована до фиксации, при ошибке выгрузки транзакция откатывается
+            compressed = await asyncio.to_thread(
+                gzip.compress, payload, settings.result_compress_level
+            )
+            await self.blob_store.put(fields["result_ref"], compressed)
+            logger.info(
+                "Task %s result offloaded (%d bytes, %d compressed)",
+                task_id, len(payload), len(compressed),
+                extra={"task_id": str(task_id)},
+            )
+        
+        released = await TaskRepository.release_children(self.session, task_id, now)
+        await self.session.commit()
+        
+        if released:
+            logger.info(
+                "Task %s released %d dependent tasks", task_id, len(released),
+                extra={"task_id": str(task_id)},
+            )
+        await self._publish([task for task in released if task.status == TaskStatus.PENDING])
+        return True
     
-    async def fail_processing(self, task_id: UUID, error_message: str) -> None:
+    async def _publish(self, tasks: List[Task]) -> None:
+        if self.rabbitmq_service is None or not tasks:
+            return
+        try:
+            await self.rabbitmq_service.send_tasks_to_queue([(task.id, task.tenant_id) for task in tasks])
+        except Exception as e:
+            # Задачи остаются в PENDING, как при недоступности RabbitMQ при создании
+            logger.error("Failed to publish %d released tasks: %s", len(tasks), e)
+    
+    async def fail_processing(
+        self,
+        task_id: UUID,
+        error_message: str,
+        lease_owner: Optional[str] = None,
+    ) -> bool:
         """
         Завершить обработку задачи с ошибкой.
         
+        Ожидающие зависимые задачи (на всю глубину) получают статус FAILED
+        в той же транзакции. Как и в complete_processing, статус
+        записывается, только если задача все еще в IN_PROGRESS и в аренде
+        lease_owner.
+        
         Args:
             task_id: ID задачи
             error_message: Сообщение об ошибке
+            lease_owner: Идентификатор worker, владеющего арендой
+            
+        Returns:
+            True, если статус записан
         """
-        await TaskRepository.update_status(
+        now = datetime.utcnow()
+        finished = await TaskRepository.finish_processing(
             self.session,
-            task_id=task_id,
-            status=TaskStatus.FAILED,
-            completed_at=datetime.utcnow(),
-            error_message=error_message,
+            task_id,
+            TaskStatus.FAILED,
+            now,
+            lease_owner=lease_owner,
+            values={"error_message": error_message},
         )
-
+        if finished is None:
+            await self.session.rollback()
+            logger.warning(
+                "Task %s is no longer processed by this worker, failure dropped", task_id,
+                extra={"task_id": str(task_id)},
+            )
+            return False
+        
+        await TaskRepository.finish_dependents(
+            self.session,
+            task_id,
+            TaskStatus.FAILED,
+            f"Dependency {task_id} failed",
+            now,
+        )
+        await self.session.commit()
+        return True
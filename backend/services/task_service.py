@@ -1,17 +1,39 @@
 """Сервис для работы с задачами."""
-from datetime import datetime
-from typing import Annotated, Optional
-from uuid import UUID
+import asyncio
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+import orjson
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.config import settings
 from backend.database import DBSession
-from backend.repository import TaskRepository
-from backend.schemas import TaskCreate, TaskListResponse
+from backend.repository import IdempotencyRepository, TaskRepository
+from backend.repository.task_repository import CANCELLABLE_STATUSES
+from backend.schemas import TaskBulkRequest, TaskCreate, TaskListResponse
 from backend.models import Task, TaskStatus, TaskPriority
+from backend.services.blob_store import BlobStore, BlobStoreDep, result_store
 from backend.services.rabbitmq_service import RabbitMQService, RabbitMQServiceDep
-from backend.exceptions import TaskNotFoundError, TaskCannotBeCancelledError
+from backend.services.replica_service import ReadDBSession
+from backend.services.task_events_service import TaskEventHub, task_event_hub
+from backend.exceptions import (
+    IdempotencyKeyReusedError,
+    InvalidTaskDependencyError,
+    TaskNotFoundError,
+    TaskCannotBeCancelledError,
+    TaskResultUnavailableError,
+    TaskServiceError,
+)
+
+
+def request_hash(task_data: TaskCreate) -> str:
+    """SHA-256 тела запроса на создание задачи (не зависит от порядка полей)."""
+    body = orjson.dumps(task_data.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(body).hexdigest()
 
 
 class TaskService:
@@ -21,6 +43,8 @@ class TaskService:
         self,
         session: AsyncSession,
         rabbitmq_service: Optional[RabbitMQService] = None,
+        blob_store: Optional[BlobStore] = None,
+        event_hub: Optional[TaskEventHub] = None,
     ):
         """
         Инициализация сервиса.
@@ -28,14 +52,23 @@ class TaskService:
         Args:
             session: Сессия базы данных
             rabbitmq_service: Сервис RabbitMQ (опционально)
+            blob_store: Хранилище крупных результатов (по умолчанию локальное)
+            event_hub: Хаб событий статусов (по умолчанию общий для процесса)
         """
         self.session = session
         self.rabbitmq_service = rabbitmq_service
+        self.blob_store = blob_store or result_store
+        self.event_hub = event_hub or task_event_hub
     
     async def create_task(self, task_data: TaskCreate) -> Task:
         """
         Создать новую задачу и отправить её в очередь.
         
+        Задача с run_at в будущем получает статус SCHEDULED и отправляется
+        в очередь планировщиком при наступлении run_at. Задача с незавершенными
+        родителями (depends_on) получает статус WAITING и освобождается
+        worker при завершении последнего из них.
+        
         Args:
             task_data: Данные для создания задачи
             
@@ -43,9 +76,123 @@ class TaskService:
             Созданная задача
             
         Raises:
+            InvalidTaskDependencyError: Если родительская задача не найдена, провалена или отменена
+            Exception: Если не удалось отправить задачу в очередь
+        """
+        return await self._create_and_publish(task_data.model_dump())
+    
+    async def create_task_once(
+        self,
+        task_data: TaskCreate,
+        idempotency_key: str,
+    ) -> Tuple[Task, bool]:
+        """
+        Создать задачу не более одного раза для ключа идемпотентности.
+        
+        Ключ занимается в той же транзакции, что и вставка задачи, поэтому
+        повтор запроса (в том числе конкурентный) получает исходную задачу
+        без второй вставки и публикации. Ключ действует IDEMPOTENCY_KEY_TTL
+        секунд.
+        
+        Args:
+            task_data: Данные для создания задачи
+            idempotency_key: Ключ идемпотентности из заголовка запроса
+            
+        Returns:
+            Кортеж (задача, создана ли задача этим запросом)
+            
+        Raises:
+            IdempotencyKeyReusedError: Если ключ уже использован с другим телом запроса
             Exception: Если не удалось отправить задачу в очередь
         """
-        task = await TaskRepository.create(self.session, task_data.model_dump())
+        now = datetime.utcnow()
+        data = task_data.model_dump()
+        data.update(id=uuid4(), created_at=now)
+        body_hash = request_hash(task_data)
+        
+        claimed = await IdempotencyRepository.claim(
+            self.session,
+            key=idempotency_key,
+            request_hash=body_hash,
+            task_id=data["id"],
+            task_created_at=now,
+            expires_at=now + timedelta(seconds=settings.idempotency_key_ttl),
+            now=now,
+        )
+        if claimed:
+            return await self._create_and_publish(data), True
+        
+        record = await IdempotencyRepository.get(self.session, idempotency_key)
+        return await self._replay(record, body_hash, idempotency_key), False
+    
+    async def find_replay(self, task_data: TaskCreate, idempotency_key: str) -> Optional[Task]:
+        """
+        Найти задачу, уже созданную по ключу идемпотентности.
+        
+        Вызывается до проверок admission и лимитов арендатора: повтор
+        запроса не создает задачу и не должен получать 429.
+        
+        Args:
+            task_data: Данные для создания задачи
+            idempotency_key: Ключ идемпотентности из заголовка запроса
+            
+        Returns:
+            Исходная задача или None, если действующего ключа нет
+            
+        Raises:
+            IdempotencyKeyReusedError: Если ключ уже использован с другим телом запроса
+        """
+        record = await IdempotencyRepository.get(self.session, idempotency_key)
+        if record is None or record.expires_at <= datetime.utcnow():
+            return None
+        return await self._replay(record, request_hash(task_data), idempotency_key)
+    
+    async def _replay(self, record: Any, body_hash: str, idempotency_key: str) -> Task:
+        if record.request_hash != body_hash:
+            raise IdempotencyKeyReusedError(
+                f"Idempotency key {idempotency_key} was already used with a different request"
+            )
+        return await self.get_task_by_id(record.task_id, created_at=record.task_created_at)
+    
+    async def _add_dependencies(self, data: Dict[str, Any], parent_ids: List[UUID]) -> int:
+        rows = await TaskRepository.lock_parents(self.session, parent_ids)
+        statuses = {row.id: row.status for row in rows}
+        
+        missing = [str(parent_id) for parent_id in parent_ids if parent_id not in statuses]
+        if missing:
+            raise InvalidTaskDependencyError(f"Parent tasks not found: {', '.join(missing)}")
+        broken = [
+            str(parent_id) for parent_id, status in statuses.items()
+            if status in (TaskStatus.FAILED, TaskStatus.CANCELLED)
+        ]
+        if broken:
+            raise InvalidTaskDependencyError(f"Parent tasks failed or were cancelled: {', '.join(broken)}")
+        
+        unfinished = [parent_id for parent_id in parent_ids if statuses[parent_id] != TaskStatus.COMPLETED]
+        if unfinished:
+            await TaskRepository.add_dependencies(self.session, data["id"], data["created_at"], unfinished)
+        return len(unfinished)
+    
+    async def _create_and_publish(self, data: Dict[str, Any]) -> Task:
+        parent_ids = data.pop("depends_on", None)
+        if parent_ids:
+            data.setdefault("id", uuid4())
+            data.setdefault("created_at", datetime.utcnow())
+            pending_parents = await self._add_dependencies(data, parent_ids)
+            if pending_parents:
+                # В очередь задачу отправит worker при завершении последнего родителя
+                data.update(status=TaskStatus.WAITING, pending_parents=pending_parents)
+                return await TaskRepository.create(self.session, data)
+        
+        task = await TaskRepository.create(self.session, data)
+        
+        if task.run_at and task.run_at > datetime.utcnow():
+            # В очередь задачу отправит планировщик при наступлении run_at
+            return await TaskRepository.update_status(
+                self.session,
+                task_id=task.id,
+                status=TaskStatus.SCHEDULED,
+            )
         
         task = await TaskRepository.update_status(
             self.session,
@@ -54,16 +201,17 @@ class TaskService:
         )
         
         if self.rabbitmq_service:
-            await self.rabbitmq_service.send_task_to_queue(task.id)
+            await self.rabbitmq_service.send_task_to_queue(task.id, task.tenant_id)
         
         return task
     
-    async def get_task_by_id(self, task_id: UUID) -> Task:
+    async def get_task_by_id(self, task_id: UUID, created_at: Optional[datetime] = None) -> Task:
         """
         Получить задачу по ID.
         
         Args:
             task_id: ID задачи
+            created_at: Время создания задачи, если известно (читается одна секция)
             
         Returns:
             Задача
@@ -71,7 +219,7 @@ class TaskService:
         Raises:
             TaskNotFoundError: Если задача не найдена
         """
-        task = await TaskRepository.get_by_id(self.session, task_id)
+        task = await TaskRepository.get_by_id(self.session, task_id, created_at=created_at)
         if not task:
             raise TaskNotFoundError(f"Task with id {task_id} not found")
         return task
@@ -82,6 +230,8 @@ class TaskService:
         priority: Optional[TaskPriority] = None,
         created_from: Optional[datetime] = None,
         created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
         page: int = 1,
         page_size: int = 10,
     ) -> TaskListResponse:
@@ -93,6 +243,8 @@ class TaskService:
             priority: Фильтр по приоритету
             created_from: Фильтр по дате создания (от)
             created_to: Фильтр по дате создания (до)
+            result_contains: Фильтр по вхождению JSON в результат
+            q: Строка полнотекстового поиска по названию и описанию
             page: Номер страницы
             page_size: Размер страницы
             
@@ -105,19 +257,177 @@ class TaskService:
             priority=priority,
             created_from=created_from,
             created_to=created_to,
+            result_contains=result_contains,
+            q=q,
             page=page,
             page_size=page_size,
         )
         
-        pages = (total + page_size - 1) // page_size if total > 0 else 0
-        
         return TaskListResponse(
             items=tasks,
             total=total,
             page=page,
             page_size=page_size,
-            pages=pages,
+            pages=self._count_pages(total, page_size),
+        )
+    
+    async def get_tasks_page(
+        self,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        result_contains: Optional[Dict[str, Any]] = None,
+        q: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Получить страницу задач в виде готового к сериализации словаря.
+        
+        Быстрый путь для GET /api/v1/tasks: строки из БД не проходят
+        повторную валидацию pydantic и сериализуются напрямую.
+        Структура совпадает с TaskListResponse.
+        
+        Args:
+            status: Фильтр по статусу
+            priority: Фильтр по приоритету
+            created_from: Фильтр по дате создания (от)
+            created_to: Фильтр по дате создания (до)
+            result_contains: Фильтр по вхождению JSON в результат
+            q: Строка полнотекстового поиска по названию и описанию
+            page: Номер страницы
+            page_size: Размер страницы
+            
+        Returns:
+            Словарь со списком задач и метаданными пагинации
+        """
+        rows, total = await TaskRepository.get_list_rows(
+            self.session,
+            status=status,
+            priority=priority,
+            created_from=created_from,
+            created_to=created_to,
+            result_contains=result_contains,
+            q=q,
+            page=page,
+            page_size=page_size,
         )
+        
+        return {
+            "items": rows,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": self._count_pages(total, page_size),
+        }
+    
+    @staticmethod
+    def _count_pages(total: int, page_size: int) -> int:
+        """Посчитать количество страниц."""
+        return (total + page_size - 1) // page_size if total > 0 else 0
+    
+    async def get_task_result(self, task_id: UUID) -> Task:
+        """
+        Получить задачу для выдачи результата.
+        
+        Args:
+            task_id: ID задачи
+            
+        Returns:
+            Задача (результат есть только у задачи со статусом COMPLETED)
+            
+        Raises:
+            TaskNotFoundError: Если задача не найдена
+            TaskResultUnavailableError: Если задача провалена или отменена
+        """
+        task = await self.get_task_by_id(task_id)
+        
+        if task.status in [TaskStatus.FAILED, TaskStatus.CANCELLED]:
+            raise TaskResultUnavailableError(
+                f"Task {task_id} has no result, status {task.status}"
+            )
+        
+        return task
+    
+    async def wait_for_result(self, task_id: UUID, timeout: float) -> Task:
+        """
+        Дождаться конечного статуса задачи и получить её для выдачи результата.
+        
+        Ожидание не опрашивает БД: запрос ждет события о завершении задачи
+        из хаба событий. На время ожидания соединение с БД возвращается в пул.
+        Если хаб не запущен (TASK_EVENTS_ENABLED=false), событий не будет,
+        и задача читается один раз без ожидания.
+        
+        Args:
+            task_id: ID задачи
+            timeout: Максимальное время ожидания в секундах
+            
+        Returns:
+            Задача (если время вышло, статус может быть незавершенным)
+            
+        Raises:
+            TaskNotFoundError: Если задача не найдена
+            TaskResultUnavailableError: Если задача провалена или отменена
+        """
+        if not self.event_hub.running:
+            return await self.get_task_result(task_id)
+        
+        async with self.event_hub.wait_for_terminal(task_id) as waiter:
+            task = await self.get_task_result(task_id)
+            if task.status == TaskStatus.COMPLETED or timeout <= 0:
+                return task
+            
+            await self.session.rollback()
+            await asyncio.wait([waiter], timeout=timeout)
+        
+        return await self.get_task_result(task_id)
+    
+    async def stream_result(self, task: Task, compressed: bool = False) -> AsyncIterator[bytes]:
+        """
+        Открыть поток с результатом, вынесенным во внешнее хранилище.
+        
+        Первая часть читается сразу, чтобы отсутствие объекта обнаружилось
+        до начала отправки ответа.
+        
+        Args:
+            task: Задача с заполненным result_ref
+            compressed: Отдавать gzip как есть, без распаковки
+            
+        Returns:
+            Асинхронный итератор по частям JSON (или gzip при compressed=True)
+            
+        Raises:
+            TaskServiceError: Если объект результата не найден в хранилище
+        """
+        chunks = self.blob_store.open(task.result_ref)
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = b""
+        except FileNotFoundError:
+            raise TaskServiceError(f"Result of task {task.id} is missing in storage")
+        
+        if compressed:
+            return self._chain(first, chunks)
+        return self._decompress(self._chain(first, chunks))
+    
+    @staticmethod
+    async def _chain(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        yield first
+        async for chunk in rest:
+            yield chunk
+    
+    @staticmethod
+    async def _decompress(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        async for chunk in chunks:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        tail = decompressor.flush()
+        if tail:
+            yield tail
     
     async def cancel_task(self, task_id: UUID) -> Task:
         """
@@ -142,17 +452,93 @@ class TaskService:
                 f"Cannot cancel task with status {task.status}"
             )
         
+        was_in_progress = task.status == TaskStatus.IN_PROGRESS
+        await TaskRepository.finish_dependents(
+            self.session,
+            task_id,
+            TaskStatus.CANCELLED,
+            f"Dependency {task_id} was cancelled",
+            datetime.utcnow(),
+        )
         cancelled_task = await TaskRepository.cancel(self.session, task_id)
+        if was_in_progress and self.rabbitmq_service is not None:
+            await self.rabbitmq_service.send_cancellations([task_id])
         return cancelled_task
+    
+    async def bulk_cancel(self, request: TaskBulkRequest) -> List[UUID]:
+        """
+        Отменить множество задач одним запросом.
+        
+        Статус меняется одним UPDATE ... RETURNING, завершенные задачи
+        пропускаются. Ожидающие зависимые задачи отменяются в той же
+        транзакции, worker, обрабатывающие отмененные задачи, получают
+        один общий сигнал отмены.
+        
+        Args:
+            request: Список ID задач или фильтр
+            
+        Returns:
+            ID отмененных задач
+        """
+        filters = None
+        if request.filter is not None:
+            filters = request.filter.model_dump(exclude_none=True)
+        limit = len(request.task_ids) if request.task_ids is not None else request.limit
+        now = datetime.utcnow()
+        
+        rows = await TaskRepository.bulk_update_status(
+            self.session,
+            CANCELLABLE_STATUSES,
+            TaskStatus.CANCELLED,
+            limit,
+            task_ids=request.task_ids,
+            filters=filters,
+        )
+        task_ids = [row.id for row in rows]
+        if task_ids:
+            await TaskRepository.finish_dependents_of(
+                self.session,
+                task_ids,
+                TaskStatus.CANCELLED,
+                "Dependency was cancelled",
+                now,
+            )
+        await self.session.commit()
+        
+        in_progress = [row.id for row in rows if row.previous_status == TaskStatus.IN_PROGRESS]
+        if in_progress and self.rabbitmq_service is not None:
+            await self.rabbitmq_service.send_cancellations(in_progress)
+        return task_ids
+    
+    async def get_statuses(self, task_ids: List[UUID]) -> List[Any]:
+        """
+        Получить статусы нескольких задач одним запросом.
+        
+        Args:
+            task_ids: ID задач
+            
+        Returns:
+            Строки статусов найденных задач (несуществующие ID пропускаются)
+        """
+        return await TaskRepository.get_statuses(self.session, task_ids)
 
 
 def get_task_service(
     db: DBSession,
     rabbitmq_service: RabbitMQServiceDep,
+    blob_store: BlobStoreDep,
 ) -> TaskService:
     """Dependency для получения сервиса задач."""
-    return TaskService(session=db, rabbitmq_service=rabbitmq_service)
+    return TaskService(session=db, rabbitmq_service=rabbitmq_service, blob_store=blob_store)
 
 
 TaskServiceDep = Annotated[TaskService, Depends(get_task_service)]
 
+
+def get_read_task_service(db: ReadDBSession, blob_store: BlobStoreDep) -> TaskService:
+    """Dependency для получения сервиса задач только для чтения (реплика, если доступна)."""
+    return TaskService(session=db, blob_store=blob_store)
+
+
+ReadTaskServiceDep = Annotated[TaskService, Depends(get_read_task_service)]
+
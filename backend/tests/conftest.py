@@ -18,6 +18,8 @@ def mock_rabbitmq_service():
     """Фикстура для мокирования RabbitMQ сервиса."""
     mock = Mock()
     mock.send_task_to_queue = AsyncMock()
+    mock.send_tasks_to_queue = AsyncMock()
+    mock.send_cancellations = AsyncMock()
     mock.is_connected = Mock(return_value=True)
     return mock
 
@@ -32,6 +34,8 @@ def sample_task():
         priority=TaskPriority.MEDIUM,
         status=TaskStatus.NEW,
         created_at=datetime.utcnow(),
+        pending_parents=0,
+        tenant_id="default",
     )
     return task
 
@@ -46,6 +50,8 @@ def sample_task_pending():
         priority=TaskPriority.HIGH,
         status=TaskStatus.PENDING,
         created_at=datetime.utcnow(),
+        pending_parents=0,
+        tenant_id="default",
     )
     return task
 
@@ -60,5 +66,7 @@ def sample_task_completed():
         priority=TaskPriority.LOW,
         status=TaskStatus.COMPLETED,
         created_at=datetime.utcnow(),
+        pending_parents=0,
+        tenant_id="default",
     )
     return task
@@ -0,0 +1,111 @@
+"""Unit тесты для контроля приема задач."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.exceptions import QueueOverloadedError
+from backend.models import TaskPriority, TaskStatus
+from backend.services.admission_service import AdmissionController
+from backend.services.health_service import DependencyState
+
+
+def make_controller(queue_depth, rate=None, checked_at=None, **kwargs):
+    """Контроллер с заданными глубиной очереди и скоростью обработки."""
+    monitor = MagicMock()
+    monitor.interval = 5.0
+    monitor.state = DependencyState(
+        queue_depth=queue_depth,
+        checked_at=checked_at or datetime.utcnow(),
+    )
+    controller = AdmissionController(monitor=monitor, session_factory=MagicMock(), **kwargs)
+    controller.rate = rate
+    return controller
+
+
+class TestAdmissionController:
+    """Тесты для AdmissionController."""
+
+    def test_disabled_by_default(self):
+        """Тест, что без порогов задачи принимаются при любой глубине."""
+        controller = make_controller(queue_depth=10 ** 9, rate=0.0)
+
+        assert controller.enabled is False
+        controller.check()
+
+    def test_depth_limit(self):
+        """Тест отказа при превышении глубины очереди."""
+        controller = make_controller(queue_depth=1500, rate=100.0, max_queue_depth=1000)
+
+        with pytest.raises(QueueOverloadedError) as exc_info:
+            controller.check()
+        # 500 лишних задач при 100 задачах в секунду
+        assert exc_info.value.retry_after == pytest.approx(5.0)
+
+        make_controller(queue_depth=1000, rate=100.0, max_queue_depth=1000).check()
+
+    def test_wait_limit(self):
+        """Тест отказа, когда ожидаемое время ожидания больше порога."""
+        controller = make_controller(queue_depth=700, rate=10.0, max_queue_wait=60)
+
+        assert controller.allowed_depth() == pytest.approx(600)
+        assert controller.retry_after() == pytest.approx(10.0)
+
+    def test_retry_after_clamped(self):
+        """Тест ограничения Retry-After снизу и сверху."""
+        assert make_controller(
+            queue_depth=1001, rate=100.0, max_queue_depth=1000,
+        ).retry_after() == 1.0
+        assert make_controller(
+            queue_depth=10 ** 6, rate=1.0, max_queue_depth=1000, max_retry_after=120,
+        ).retry_after() == 120.0
+        # Worker не берут задачи — ждать максимум
+        assert make_controller(
+            queue_depth=2000, rate=0.0, max_queue_depth=1000, max_retry_after=120,
+        ).retry_after() == 120.0
+
+    def test_fails_open_without_state(self):
+        """Тест, что при неизвестном или устаревшем состоянии задачи принимаются."""
+        make_controller(queue_depth=None, rate=1.0, max_queue_depth=1).check()
+        make_controller(
+            queue_depth=100,
+            rate=1.0,
+            max_queue_depth=1,
+            checked_at=datetime.utcnow() - timedelta(minutes=5),
+        ).check()
+        # Скорость еще не измерена — ограничение по времени ожидания не действует
+        make_controller(queue_depth=100, rate=None, max_queue_wait=1).check()
+
+    def test_idle_rate_ignores_wait_limit(self):
+        """Тест, что после простоя (скорость 0) действует только max_queue_depth."""
+        controller = make_controller(queue_depth=500, rate=0.0, max_queue_wait=60)
+
+        assert controller.allowed_depth() is None
+        controller.check()
+
+        controller = make_controller(queue_depth=500, rate=0.0, max_queue_wait=60, max_queue_depth=1000)
+        assert controller.allowed_depth() == 1000
+        controller.check()
+
+    def test_refresh_rate(self):
+        """Тест расчета скорости по переходам в IN_PROGRESS за окно."""
+        controller = make_controller(queue_depth=0, max_queue_wait=60, rate_window=120)
+        session = MagicMock()
+        controller.session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        controller.session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        counts = [
+            (TaskStatus.IN_PROGRESS, TaskPriority.HIGH, 120),
+            (TaskStatus.IN_PROGRESS, TaskPriority.LOW, 60),
+            (TaskStatus.COMPLETED, TaskPriority.HIGH, 500),
+        ]
+
+        with patch(
+            'backend.services.admission_service.StatsRepository.get_status_counts',
+            new=AsyncMock(return_value=counts),
+        ) as mock_counts:
+            rate = asyncio.run(controller.refresh(now=datetime(2026, 1, 1, 12, 0, 0)))
+
+        assert mock_counts.call_args.args[1] == datetime(2026, 1, 1, 11, 58)
+        assert rate == pytest.approx(180 / 120)
+        assert controller.rate == rate
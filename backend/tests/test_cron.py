@@ -0,0 +1,54 @@
+"""Unit тесты для разбора cron-выражений."""
+from datetime import datetime
+
+import pytest
+
+from backend.exceptions import InvalidCronExpressionError
+from backend.services.cron import CronSchedule
+
+
+class TestCronSchedule:
+    """Тесты для CronSchedule."""
+
+    def test_every_fifteen_minutes(self):
+        """Тест шага по минутам."""
+        schedule = CronSchedule("*/15 * * * *")
+
+        assert schedule.next_after(datetime(2026, 1, 1, 10, 7, 30)) == datetime(2026, 1, 1, 10, 15)
+        assert schedule.next_after(datetime(2026, 1, 1, 10, 15)) == datetime(2026, 1, 1, 10, 30)
+        assert schedule.next_after(datetime(2026, 1, 1, 23, 50)) == datetime(2026, 1, 2, 0, 0)
+
+    def test_aliases_and_names(self):
+        """Тест алиасов и имен месяцев и дней недели."""
+        assert CronSchedule("@daily").next_after(datetime(2026, 3, 5, 12)) == datetime(2026, 3, 6)
+        # 2026-10-19 — понедельник
+        schedule = CronSchedule("30 9 * jan,oct sat,sun")
+        assert schedule.next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 24, 9, 30)
+        assert schedule.next_after(datetime(2026, 10, 31, 10)) == datetime(2027, 1, 2, 9, 30)
+
+    def test_day_of_month_or_day_of_week(self):
+        """Тест, что при обоих ограничениях дня достаточно совпадения любого."""
+        schedule = CronSchedule("0 0 1 * 7")
+
+        # Следующее воскресенье (25.10) раньше первого числа месяца
+        assert schedule.next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 25)
+        assert schedule.next_after(datetime(2026, 10, 25)) == datetime(2026, 11, 1)
+
+    def test_leap_day(self):
+        """Тест расписания на 29 февраля."""
+        schedule = CronSchedule("0 12 29 2 *")
+
+        assert schedule.next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29, 12)
+
+    @pytest.mark.parametrize("expression", [
+        "* * * *",
+        "60 * * * *",
+        "*/0 * * * *",
+        "5-1 * * * *",
+        "* * * foo *",
+        "0 0 30 2 *",
+    ])
+    def test_invalid(self, expression):
+        """Тест некорректных и невыполнимых выражений."""
+        with pytest.raises(InvalidCronExpressionError):
+            CronSchedule(expression).next_after(datetime(2026, 1, 1))
@@ -0,0 +1,53 @@
+"""Unit тесты для настройки движка БД."""
+from backend.config import settings
+from backend.database import InstrumentedQueuePool, build_engine_options, get_pool_stats
+
+
+class TestBuildEngineOptions:
+    """Тесты для build_engine_options."""
+
+    def test_pool_options_from_settings(self):
+        """Тест передачи параметров пула из настроек."""
+        db_settings = settings.model_copy(
+            update={"db_pool_size": 25, "db_max_overflow": 5, "db_pool_recycle": 600}
+        )
+
+        options = build_engine_options(db_settings)
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 25
+        assert options["max_overflow"] == 5
+        assert options["pool_recycle"] == 600
+        assert options["pool_pre_ping"] is False
+
+    def test_statement_cache_size(self):
+        """Тест настройки кэша prepared statements."""
+        db_settings = settings.model_copy(update={"db_statement_cache_size": 500})
+
+        connect_args = build_engine_options(db_settings)["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 500
+        assert connect_args["prepared_statement_cache_size"] == 500
+
+    def test_pgbouncer_mode(self):
+        """Тест режима совместимости с PgBouncer."""
+        db_settings = settings.model_copy(update={"db_pgbouncer_mode": True})
+
+        connect_args = build_engine_options(db_settings)["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+
+class TestPoolStats:
+    """Тесты для get_pool_stats."""
+
+    def test_pool_stats_initial(self):
+        """Тест статистики пула без выданных соединений."""
+        stats = get_pool_stats()
+
+        assert stats["pool_size"] == settings.db_pool_size
+        assert stats["checked_out"] == 0
+        assert stats["overflow"] == 0
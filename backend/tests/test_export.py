@@ -0,0 +1,98 @@
+"""Unit тесты для выгрузки задач."""
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+
+from backend.api.responses import csv_stream, ndjson_stream
+from backend.models import TaskStatus, TaskPriority
+from backend.services.export_service import EXPORT_FIELDS, TaskExportService
+
+
+def make_row(**overrides):
+    """Создать строку задачи как из БД."""
+    row = {field: None for field in EXPORT_FIELDS}
+    row.update(
+        id=uuid4(),
+        name="Task",
+        priority=TaskPriority.HIGH,
+        status=TaskStatus.COMPLETED,
+        created_at=datetime(2024, 1, 2, 3, 4, 5),
+        result={"value": 1},
+    )
+    row.update(overrides)
+    return row
+
+
+async def batches_of(*batches):
+    """Асинхронный поток пачек строк."""
+    for batch in batches:
+        yield batch
+
+
+async def collect(chunks):
+    """Собрать асинхронный поток в bytes."""
+    return b"".join([chunk async for chunk in chunks])
+
+
+class TestTaskExport:
+    """Тесты для выгрузки задач."""
+    
+    def test_ndjson_stream(self):
+        """Тест выгрузки в NDJSON."""
+        rows = [make_row(), make_row(name="Second")]
+        
+        body = asyncio.run(collect(ndjson_stream(batches_of(rows[:1], rows[1:]))))
+        
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        assert [line["name"] for line in lines] == ["Task", "Second"]
+        assert lines[0]["id"] == str(rows[0]["id"])
+        assert lines[0]["status"] == "COMPLETED"
+        assert lines[0]["result"] == {"value": 1}
+    
+    def test_csv_stream(self):
+        """Тест выгрузки в CSV."""
+        row = make_row(description='with "quotes", commas')
+        
+        body = asyncio.run(collect(csv_stream(batches_of([row], []), EXPORT_FIELDS)))
+        
+        records = list(csv.DictReader(io.StringIO(body.decode())))
+        assert len(records) == 1
+        assert records[0]["description"] == 'with "quotes", commas'
+        assert records[0]["priority"] == "HIGH"
+        assert records[0]["created_at"] == "2024-01-02T03:04:05"
+        assert json.loads(records[0]["result"]) == {"value": 1}
+        assert records[0]["error_message"] == ""
+    
+    def test_csv_stream_empty(self):
+        """Тест выгрузки в CSV без строк (только заголовок)."""
+        body = asyncio.run(collect(csv_stream(batches_of(), EXPORT_FIELDS)))
+        
+        assert body.decode().strip() == ",".join(EXPORT_FIELDS)
+    
+    def test_stream_batches_uses_own_session(self, mock_session):
+        """Тест, что выгрузка открывает собственную сессию и передает фильтры."""
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        rows = [make_row()]
+        
+        with patch('backend.services.export_service.TaskRepository') as mock_repo:
+            mock_repo.stream_rows = MagicMock(return_value=batches_of(rows))
+            
+            service = TaskExportService(session_factory=session_factory, batch_size=50)
+            
+            async def read():
+                return [batch async for batch in service.stream_batches(status=TaskStatus.COMPLETED)]
+            
+            assert asyncio.run(read()) == [rows]
+            
+            call_args = mock_repo.stream_rows.call_args
+            assert call_args[0][0] == mock_session
+            assert call_args[1]["status"] == TaskStatus.COMPLETED
+            assert call_args[1]["batch_size"] == 50
+        
+        session_factory.return_value.__aexit__.assert_called_once()
@@ -0,0 +1,55 @@
+"""Unit тесты для фильтров списка задач."""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.exceptions import InvalidTaskFilterError
+from backend.repository.task_repository import TaskRepository
+from backend.schemas import TaskFilterQueryParams
+
+
+class TestTaskFilters:
+    """Тесты для фильтров списка задач."""
+    
+    def test_result_filter(self):
+        """Тест разбора фильтра result_contains."""
+        params = TaskFilterQueryParams(result_contains='{"status": "partial"}')
+        
+        assert params.result_filter() == {"status": "partial"}
+        assert TaskFilterQueryParams().result_filter() is None
+    
+    @pytest.mark.parametrize("value", ["not json", "[1, 2]", '"text"'])
+    def test_result_filter_invalid(self, value):
+        """Тест некорректного фильтра result_contains."""
+        params = TaskFilterQueryParams(result_contains=value)
+        
+        with pytest.raises(InvalidTaskFilterError):
+            params.result_filter()
+    
+    def test_result_contains_condition(self):
+        """Тест, что фильтр превращается в условие @> по JSONB."""
+        filters = TaskRepository._build_filters(result_contains={"status": "partial"})
+        
+        conditions = TaskRepository._build_conditions(filters)
+        
+        assert len(conditions) == 1
+        sql = str(conditions[0].compile(dialect=postgresql.dialect()))
+        assert "tasks.result @>" in sql
+    
+    def test_search_condition_and_order(self):
+        """Тест полнотекстового фильтра и сортировки по релевантности."""
+        filters = TaskRepository._build_filters(q="invoice report")
+        
+        conditions = TaskRepository._build_conditions(filters)
+        order = TaskRepository._build_order(filters)
+        
+        dialect = postgresql.dialect()
+        assert "tasks.search_vector @@ websearch_to_tsquery" in str(conditions[0].compile(dialect=dialect))
+        assert "ts_rank_cd(tasks.search_vector" in str(order[0].compile(dialect=dialect))
+        assert len(order) == 2
+    
+    def test_order_without_search(self):
+        """Тест сортировки по дате создания без поиска."""
+        order = TaskRepository._build_order({})
+        
+        assert len(order) == 1
+        assert "tasks.created_at DESC" in str(order[0])
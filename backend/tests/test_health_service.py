@@ -0,0 +1,96 @@
+"""Unit тесты для HealthMonitor."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import Mock, AsyncMock, MagicMock
+
+from backend.services.health_service import HealthMonitor
+
+
+def make_engine(fail: bool = False, pending: int = 0):
+    """Создать мок движка БД."""
+    conn = AsyncMock()
+    conn.scalar = AsyncMock(return_value=pending)
+    if fail:
+        conn.execute.side_effect = ConnectionError("db down")
+        conn.scalar.side_effect = ConnectionError("db down")
+    engine = Mock()
+    engine.connect = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine
+
+
+def make_broker(depth: int = 0, connected: bool = True):
+    """Создать мок сервиса RabbitMQ."""
+    broker = Mock()
+    broker.get_queue_stats = AsyncMock(return_value=(depth, 1))
+    broker.is_connected = Mock(return_value=connected)
+    return broker
+
+
+class TestHealthMonitor:
+    """Тесты для HealthMonitor."""
+
+    def test_not_ready_before_first_check(self):
+        """Тест, что без проверок сервис не готов."""
+        monitor = HealthMonitor(db_engine=make_engine(), broker=make_broker())
+
+        assert monitor.is_ready() is False
+        assert monitor.readiness().status == "not_ready"
+
+    def test_ready_after_refresh(self):
+        """Тест готовности после успешной проверки."""
+        monitor = HealthMonitor(db_engine=make_engine(pending=40), broker=make_broker(depth=5))
+
+        state = asyncio.run(monitor.refresh())
+
+        assert state.database is True
+        assert state.broker is True
+        # Глубина — задачи в PENDING, а не сообщения (конверт несет несколько задач)
+        assert state.queue_depth == 40
+        assert state.queue_messages == 5
+        assert monitor.is_ready() is True
+
+    def test_database_failure(self):
+        """Тест недоступной БД."""
+        monitor = HealthMonitor(db_engine=make_engine(fail=True), broker=make_broker())
+
+        state = asyncio.run(monitor.refresh())
+
+        assert state.database is False
+        assert state.queue_depth is None
+        assert "database" in state.errors
+        assert monitor.is_ready() is False
+
+    def test_queue_backlog_threshold(self):
+        """Тест превышения порога очереди."""
+        monitor = HealthMonitor(
+            db_engine=make_engine(pending=100),
+            broker=make_broker(depth=2),
+            max_queue_backlog=10,
+        )
+
+        asyncio.run(monitor.refresh())
+
+        assert monitor.is_ready() is False
+
+    def test_stale_state(self):
+        """Тест устаревшего состояния."""
+        monitor = HealthMonitor(db_engine=make_engine(), broker=make_broker(), interval=1)
+        asyncio.run(monitor.refresh())
+
+        monitor.state.checked_at = datetime.utcnow() - timedelta(seconds=10)
+
+        assert monitor.is_ready() is False
+
+    def test_readiness_does_not_do_io(self):
+        """Тест, что readiness читает только кэш."""
+        broker = make_broker()
+        monitor = HealthMonitor(db_engine=make_engine(), broker=broker)
+        asyncio.run(monitor.refresh())
+        broker.get_queue_stats.reset_mock()
+
+        for _ in range(100):
+            monitor.readiness()
+
+        broker.get_queue_stats.assert_not_called()
@@ -0,0 +1,192 @@
+"""Unit тесты для аренды задач и возврата зависших задач."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.models import Task, TaskPriority, TaskStatus
+from backend.repository import TaskRepository
+from backend.services.lease_service import LeaseKeeper, TaskReaper, new_worker_id
+
+
+def session_factory():
+    """Фабрика, возвращающая один mock сессии."""
+    session = MagicMock()
+    session.commit = AsyncMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory, session
+
+
+def expired_task(attempts):
+    """Задача в IN_PROGRESS с истекшей арендой."""
+    return Task(
+        id=uuid4(),
+        name="Task",
+        priority=TaskPriority.MEDIUM,
+        status=TaskStatus.IN_PROGRESS,
+        tenant_id="default",
+        created_at=datetime.utcnow(),
+        attempts=attempts,
+        lease_owner="host:1:abc",
+        lease_expires_at=datetime.utcnow() - timedelta(minutes=1),
+    )
+
+
+class TestLeaseKeeper:
+    """Тесты для LeaseKeeper."""
+
+    def test_worker_id_unique(self):
+        """Тест уникальности идентификатора worker."""
+        assert new_worker_id() != new_worker_id()
+
+    def test_heartbeat_batches_in_flight(self):
+        """Тест продления аренды всех задач worker одним запросом."""
+        factory, session = session_factory()
+        keeper = LeaseKeeper("w1", session_factory=factory, ttl=60)
+        first, second = uuid4(), uuid4()
+        keeper.track(first)
+        keeper.track(second)
+        keeper.release(first)
+        now = datetime(2026, 1, 1, 12, 0, 0)
+
+        with patch('backend.services.lease_service.TaskRepository') as mock_repo, \
+                patch('backend.services.lease_service.WorkerRepository') as mock_workers:
+            mock_repo.extend_leases = AsyncMock(return_value=1)
+            mock_workers.heartbeat = AsyncMock()
+
+            assert asyncio.run(keeper.heartbeat(now)) == 1
+
+        mock_repo.extend_leases.assert_called_once_with(
+            session, [second], "w1", now + timedelta(seconds=60)
+        )
+        heartbeat_args = mock_workers.heartbeat.call_args.args
+        assert heartbeat_args[1] == "w1"
+        assert heartbeat_args[-2:] == (now, 1)
+        session.commit.assert_called_once()
+
+
+    def test_cancel_interrupts_handler(self):
+        """Тест прерывания обработки задачи по сигналу отмены."""
+        keeper = LeaseKeeper("w1", session_factory=MagicMock())
+        task_id = uuid4()
+
+        async def run():
+            handler = asyncio.create_task(asyncio.sleep(10))
+            keeper.track(task_id, handler)
+            await asyncio.sleep(0)
+            # Чужие задачи и повторный сигнал игнорируются
+            assert keeper.cancel([uuid4(), task_id, task_id]) == 1
+            try:
+                await handler
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        assert asyncio.run(run()) is True
+        assert keeper.is_cancelled(task_id)
+        keeper.release(task_id)
+        assert not keeper.is_cancelled(task_id)
+        assert keeper.in_flight == 0
+
+
+class TestTaskReaper:
+    """Тесты для TaskReaper."""
+
+    def test_requeues_with_attempts_left(self):
+        """Тест возврата задачи в очередь, пока остаются попытки."""
+        factory, session = session_factory()
+        publish = AsyncMock()
+        reaper = TaskReaper(publish, session_factory=factory, max_attempts=3)
+        task = expired_task(attempts=1)
+
+        with patch('backend.services.lease_service.TaskRepository') as mock_repo, \
+                patch('backend.services.lease_service.WorkerRepository') as mock_workers:
+            mock_repo.lock_expired_leases = AsyncMock(return_value=[task])
+            mock_repo.finish_dependents = AsyncMock()
+            mock_workers.delete_stale = AsyncMock()
+
+            assert asyncio.run(reaper.reap()) == 1
+
+        assert task.status == TaskStatus.PENDING
+        assert task.lease_owner is None
+        assert task.lease_expires_at is None
+        mock_repo.finish_dependents.assert_not_called()
+        mock_workers.delete_stale.assert_called_once()
+        session.commit.assert_called_once()
+        publish.assert_called_once_with([(task.id, "default")])
+
+    def test_fails_after_max_attempts(self):
+        """Тест провала задачи и зависимых задач после исчерпания попыток."""
+        factory, session = session_factory()
+        publish = AsyncMock()
+        reaper = TaskReaper(publish, session_factory=factory, max_attempts=3)
+        task = expired_task(attempts=3)
+        now = datetime.utcnow()
+
+        with patch('backend.services.lease_service.TaskRepository') as mock_repo, \
+                patch('backend.services.lease_service.WorkerRepository') as mock_workers:
+            mock_repo.lock_expired_leases = AsyncMock(return_value=[task])
+            mock_repo.finish_dependents = AsyncMock(return_value=0)
+            mock_workers.delete_stale = AsyncMock()
+
+            asyncio.run(reaper.reap(now))
+
+        assert task.status == TaskStatus.FAILED
+        assert task.completed_at == now
+        assert "3 attempts" in task.error_message
+        assert mock_repo.finish_dependents.call_args.args[2] == TaskStatus.FAILED
+        publish.assert_not_called()
+
+    def test_requeued_published_in_one_batch(self):
+        """Тест отправки возвращенных задач одной пачкой и ошибки отправки."""
+        factory, session = session_factory()
+        publish = AsyncMock(side_effect=Exception("down"))
+        reaper = TaskReaper(publish, session_factory=factory)
+        tasks = [expired_task(attempts=1), expired_task(attempts=1)]
+
+        with patch('backend.services.lease_service.TaskRepository') as mock_repo, \
+                patch('backend.services.lease_service.WorkerRepository') as mock_workers:
+            mock_repo.lock_expired_leases = AsyncMock(return_value=tasks)
+            mock_workers.delete_stale = AsyncMock()
+
+            assert asyncio.run(reaper.reap()) == 2
+
+        publish.assert_called_once_with([(task.id, "default") for task in tasks])
+        session.commit.assert_called_once()
+
+    def test_stale_worker_cannot_finish_requeued_task(self):
+        """Тест, что worker с истекшей арендой не завершит возвращенную reaper задачу."""
+        factory, _ = session_factory()
+        reaper = TaskReaper(AsyncMock(), session_factory=factory, max_attempts=3)
+        task = expired_task(attempts=1)
+
+        with patch('backend.services.lease_service.TaskRepository') as mock_repo, \
+                patch('backend.services.lease_service.WorkerRepository') as mock_workers:
+            mock_repo.lock_expired_leases = AsyncMock(return_value=[task])
+            mock_workers.delete_stale = AsyncMock()
+            asyncio.run(reaper.reap())
+
+        assert task.status == TaskStatus.PENDING
+
+        # Итоговая запись worker фильтруется по статусу и владельцу аренды
+        result = MagicMock()
+        result.first.return_value = None
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+        session.run_sync = AsyncMock()
+
+        row = asyncio.run(TaskRepository.finish_processing(
+            session, task.id, TaskStatus.COMPLETED, datetime.utcnow(), lease_owner="host:1:abc"
+        ))
+
+        assert row is None
+        session.run_sync.assert_not_called()
+        statement = session.execute.call_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "tasks.status = 'IN_PROGRESS'" in sql
+        assert "tasks.lease_owner = 'host:1:abc'" in sql
+        assert "lease_expires_at=NULL" in sql.replace(" ", "")
@@ -0,0 +1,86 @@
+"""Unit тесты для неблокирующего логирования."""
+import json
+import logging
+import queue
+
+from backend.logging_config import JsonFormatter, NonBlockingQueueHandler, TaskLogSampler
+
+
+def make_record(level=logging.INFO, msg="message %s", args=("arg",), **extra):
+    """Создать LogRecord с дополнительными полями."""
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter:
+    """Тесты для JsonFormatter."""
+
+    def test_format_includes_extra_fields(self):
+        """Тест сериализации сообщения и полей extra."""
+        record = make_record(task_id="abc", attempt=2)
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert payload["message"] == "message arg"
+        assert payload["level"] == "INFO"
+        assert payload["logger"] == "test"
+        assert payload["task_id"] == "abc"
+        assert payload["attempt"] == 2
+
+
+class TestTaskLogSampler:
+    """Тесты для TaskLogSampler."""
+
+    def test_records_without_task_id_pass(self):
+        """Тест, что записи без task_id не фильтруются."""
+        sampler = TaskLogSampler(sample_rate=0.0)
+
+        assert sampler.filter(make_record()) is True
+
+    def test_warnings_always_pass(self):
+        """Тест, что WARNING и выше не сэмплируются."""
+        sampler = TaskLogSampler(sample_rate=0.0)
+
+        assert sampler.filter(make_record(level=logging.WARNING, task_id="abc")) is True
+
+    def test_sampling_is_consistent_per_task(self):
+        """Тест, что решение о сэмплировании стабильно для одной задачи."""
+        sampler = TaskLogSampler(sample_rate=0.5)
+
+        decisions = {sampler.filter(make_record(task_id="task-1")) for _ in range(10)}
+
+        assert len(decisions) == 1
+
+    def test_rate_limit(self):
+        """Тест ограничения частоты записей."""
+        sampler = TaskLogSampler(rate_limit=5)
+
+        passed = sum(sampler.filter(make_record(task_id=str(i))) for i in range(20))
+
+        assert passed == 5
+        assert sampler.dropped == 15
+
+
+class TestNonBlockingQueueHandler:
+    """Тесты для NonBlockingQueueHandler."""
+
+    def test_drops_when_queue_full(self):
+        """Тест отбрасывания записей при переполнении очереди."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+    def test_prepare_merges_args(self):
+        """Тест подготовки записи: аргументы подставлены в сообщение."""
+        handler = NonBlockingQueueHandler(queue.Queue())
+
+        prepared = handler.prepare(make_record())
+
+        assert prepared.msg == "message arg"
+        assert prepared.args is None
@@ -0,0 +1,138 @@
+"""Unit тесты для PartitionService."""
+import asyncio
+from datetime import date, datetime
+from unittest.mock import Mock, AsyncMock, MagicMock, patch
+
+import pytest
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.services.partition_service import (
+    PartitionService,
+    create_initial_partitions,
+    partition_maintenance_loop,
+    next_month,
+    partition_name,
+)
+
+
+def make_result(rows=None, first=None):
+    """Создать мок результата запроса."""
+    result = Mock()
+    result.__iter__ = Mock(return_value=iter(rows or []))
+    result.first = Mock(return_value=first)
+    return result
+
+
+class TestPartitionService:
+    """Тесты для PartitionService."""
+
+    def test_month_helpers(self):
+        """Тест вычисления границ и имен секций."""
+        assert next_month(date(2024, 1, 1)) == date(2024, 2, 1)
+        assert next_month(date(2024, 12, 1)) == date(2025, 1, 1)
+        assert partition_name(date(2024, 3, 1)) == "tasks_p202403"
+
+    def test_ensure_partitions(self, mock_session):
+        """Тест создания недостающих секций на текущий и будущие месяцы."""
+        mock_session.execute = AsyncMock(side_effect=[
+            make_result(),
+            make_result(rows=[("tasks_p202411",)]),
+            make_result(),
+            make_result(),
+            make_result(),
+        ])
+        mock_session.commit = AsyncMock()
+        mock_session.begin_nested = MagicMock()
+        mock_session.begin_nested.return_value.__aenter__ = AsyncMock()
+        mock_session.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+        service = PartitionService(mock_session)
+
+        names = asyncio.run(service.ensure_partitions(2, today=date(2024, 11, 15)))
+
+        assert names == ["tasks_p202411", "tasks_p202412", "tasks_p202501"]
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        assert "pg_advisory_xact_lock" in statements[0]
+        # Существующая секция tasks_p202411 не пересоздается
+        assert all("FROM ('2024-11-01')" not in statement for statement in statements)
+        assert "FROM ('2024-12-01') TO ('2025-01-01')" in statements[2]
+        assert "tasks_default PARTITION OF tasks DEFAULT" in statements[-1]
+        mock_session.commit.assert_called_once()
+
+    def test_ensure_partitions_default_conflict(self, mock_session):
+        """Тест пропуска месяца, строки которого уже попали в секцию DEFAULT."""
+        conflict = IntegrityError("CREATE TABLE", {}, Exception("would be violated by some row"))
+        mock_session.execute = AsyncMock(side_effect=[
+            make_result(),
+            make_result(rows=[("tasks_default",)]),
+            conflict,
+            make_result(),
+        ])
+        mock_session.commit = AsyncMock()
+        mock_session.begin_nested = MagicMock()
+        mock_session.begin_nested.return_value.__aenter__ = AsyncMock()
+        mock_session.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+        service = PartitionService(mock_session)
+
+        names = asyncio.run(service.ensure_partitions(1, today=date(2024, 11, 15)))
+
+        assert names == ["tasks_p202412"]
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        assert all("DEFAULT" not in statement for statement in statements)
+        mock_session.commit.assert_called_once()
+
+    def test_drop_expired_partitions(self, mock_session):
+        """Тест удаления устаревших секций без незавершенных задач."""
+        mock_session.execute = AsyncMock(side_effect=[
+            make_result(),
+            make_result(rows=[("tasks_p202401",), ("tasks_p202402",), ("tasks_p202406",), ("tasks_default",)]),
+            make_result(first=None),
+            make_result(),
+            make_result(),
+            make_result(first=(1,)),
+        ])
+        mock_session.commit = AsyncMock()
+        service = PartitionService(mock_session)
+
+        dropped = asyncio.run(
+            service.drop_expired_partitions(30, now=datetime(2024, 4, 15))
+        )
+
+        assert dropped == ["tasks_p202401"]
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        assert "DETACH PARTITION tasks_p202401" in statements[3]
+        assert "DROP TABLE tasks_p202401" in statements[4]
+        assert all("tasks_p202406" not in statement for statement in statements)
+        mock_session.commit.assert_called_once()
+
+    def test_initial_partitions_with_table(self):
+        """Тест создания секций вместе с таблицей tasks."""
+        connection = Mock()
+
+        with patch('backend.services.partition_service.settings') as mock_settings:
+            mock_settings.tasks_partition_months_ahead = 1
+            create_initial_partitions(None, connection)
+
+        statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+        assert len(statements) == 3
+        assert "PARTITION OF tasks FOR VALUES FROM" in statements[0]
+        assert "tasks_default PARTITION OF tasks DEFAULT" in statements[-1]
+
+    def test_maintenance_retried_until_first_success(self):
+        """Тест повтора обслуживания с нарастающей задержкой до первого успеха."""
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+            if len(delays) == 5:
+                raise asyncio.CancelledError
+
+        maintenance = AsyncMock(side_effect=[ConnectionError("no table"), ConnectionError("no table"), None, None, None])
+        with patch('backend.services.partition_service.run_partition_maintenance', maintenance), \
+             patch('backend.services.partition_service.asyncio.sleep', sleep), \
+             patch('backend.services.partition_service.settings') as mock_settings:
+            mock_settings.partition_maintenance_interval = 3600
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(partition_maintenance_loop(retry_delay=5.0))
+
+        assert delays == [5.0, 10.0, 3600, 3600, 3600]
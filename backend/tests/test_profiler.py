@@ -0,0 +1,63 @@
+"""Unit тесты для SamplingProfiler."""
+import threading
+import time
+
+import pytest
+
+from backend.profiler import SamplingProfiler
+from backend.exceptions import ProfilerAlreadyRunningError
+
+
+def busy_loop(stop_event):
+    """Функция, которая должна попасть в профиль."""
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Тесты для SamplingProfiler."""
+
+    def test_collects_collapsed_stacks(self):
+        """Тест сбора стеков рабочего потока."""
+        stop_event = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop_event,), name="busy")
+        worker.start()
+
+        profiler = SamplingProfiler(interval=0.001)
+        try:
+            profiler.start(0.1)
+            profiler.wait()
+        finally:
+            stop_event.set()
+            worker.join()
+
+        output = profiler.collapsed()
+
+        assert profiler.sample_count > 0
+        assert "busy;" in output
+        assert "busy_loop (test_profiler.py:" in output
+        for line in output.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+
+    def test_start_twice_raises(self):
+        """Тест повторного запуска профилировщика."""
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        try:
+            with pytest.raises(ProfilerAlreadyRunningError):
+                profiler.start()
+        finally:
+            profiler.stop()
+
+        assert not profiler.is_running
+
+    def test_stop_before_deadline(self):
+        """Тест досрочной остановки."""
+        profiler = SamplingProfiler(interval=0.001)
+        started = time.monotonic()
+
+        profiler.start(10)
+        profiler.stop()
+
+        assert time.monotonic() - started < 1
@@ -0,0 +1,140 @@
+"""Unit тесты для повторяющихся задач."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.exceptions import InvalidCronExpressionError, RecurringTaskNotFoundError
+from backend.models import Task, TaskPriority, TaskStatus
+from backend.schemas import RecurringTaskCreate
+from backend.services.recurring_service import RecurringTaskScheduler, RecurringTaskService
+
+
+def make_scheduler(session) -> RecurringTaskScheduler:
+    """Создать планировщик с моком БД."""
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return RecurringTaskScheduler(
+        dsn="postgresql://localhost/test",
+        lock_key=1,
+        session_factory=factory,
+        lookahead=60,
+    )
+
+
+def make_definition(cron: str, next_run_at: datetime, jitter_seconds: int = 0) -> Mock:
+    """Создать мок определения повторяющейся задачи."""
+    return Mock(
+        description="report",
+        priority=TaskPriority.LOW,
+        tenant_id="acme",
+        cron=cron,
+        jitter_seconds=jitter_seconds,
+        next_run_at=next_run_at,
+        last_run_at=None,
+    )
+
+
+class TestRecurringTaskService:
+    """Тесты для RecurringTaskService."""
+
+    def test_create_sets_next_run_at(self):
+        """Тест вычисления первого запуска при создании."""
+        service = RecurringTaskService(AsyncMock())
+        data = RecurringTaskCreate(name="Report", cron="0 * * * *")
+
+        with patch('backend.services.recurring_service.RecurringTaskRepository') as mock_repo:
+            mock_repo.create = AsyncMock(side_effect=lambda session, values: values)
+            values = asyncio.run(service.create(data))
+
+        now = datetime.utcnow()
+        assert values["next_run_at"].minute == 0
+        assert now < values["next_run_at"] <= now + timedelta(hours=1)
+
+    def test_create_invalid_cron(self):
+        """Тест отказа при некорректном расписании."""
+        service = RecurringTaskService(AsyncMock())
+
+        with patch('backend.services.recurring_service.RecurringTaskRepository') as mock_repo:
+            with pytest.raises(InvalidCronExpressionError):
+                asyncio.run(service.create(RecurringTaskCreate(name="Report", cron="61 * * * *")))
+            mock_repo.create.assert_not_called()
+
+    def test_delete_not_found(self):
+        """Тест удаления несуществующей повторяющейся задачи."""
+        service = RecurringTaskService(AsyncMock())
+
+        with patch('backend.services.recurring_service.RecurringTaskRepository') as mock_repo:
+            mock_repo.delete = AsyncMock(return_value=False)
+            with pytest.raises(RecurringTaskNotFoundError):
+                asyncio.run(service.delete(uuid4()))
+
+
+class TestRecurringTaskScheduler:
+    """Тесты для RecurringTaskScheduler."""
+
+    def test_materialize_creates_scheduled_task(self):
+        """Тест создания задачи с задержкой и переноса следующего запуска."""
+        session = MagicMock()
+        session.commit = AsyncMock()
+        scheduler = make_scheduler(session)
+        now = datetime(2026, 10, 19, 10, 0, 30)
+        definition = make_definition("* * * * *", datetime(2026, 10, 19, 10, 1), jitter_seconds=30)
+
+        with patch('backend.services.recurring_service.RecurringTaskRepository') as mock_repo:
+            mock_repo.lock_due = AsyncMock(return_value=[definition])
+            created = asyncio.run(scheduler.materialize(now))
+
+        assert created == 1
+        assert mock_repo.lock_due.call_args.args[1] == now + timedelta(seconds=60)
+        task = session.add.call_args.args[0]
+        assert isinstance(task, Task)
+        assert task.status == TaskStatus.SCHEDULED
+        assert task.priority == TaskPriority.LOW
+        assert task.tenant_id == "acme"
+        assert datetime(2026, 10, 19, 10, 1) <= task.run_at <= datetime(2026, 10, 19, 10, 1, 30)
+        assert definition.last_run_at == datetime(2026, 10, 19, 10, 1)
+        assert definition.next_run_at == datetime(2026, 10, 19, 10, 2)
+        session.commit.assert_awaited_once()
+
+    def test_materialize_skips_missed_runs(self):
+        """Тест, что пропущенные запуски не догоняются."""
+        session = MagicMock()
+        session.commit = AsyncMock()
+        scheduler = make_scheduler(session)
+        now = datetime(2026, 10, 19, 10, 0, 30)
+        definition = make_definition("*/5 * * * *", datetime(2026, 10, 19, 8, 0))
+
+        with patch('backend.services.recurring_service.RecurringTaskRepository') as mock_repo:
+            mock_repo.lock_due = AsyncMock(return_value=[definition])
+            asyncio.run(scheduler.materialize(now))
+
+        assert session.add.call_count == 1
+        assert session.add.call_args.args[0].run_at == datetime(2026, 10, 19, 8, 0)
+        assert definition.next_run_at == datetime(2026, 10, 19, 10, 5)
+
+    def test_only_leader_materializes(self):
+        """Тест, что без advisory lock задачи не создаются."""
+        scheduler = make_scheduler(MagicMock())
+        scheduler.interval = 0.01
+        connection = MagicMock()
+        connection.fetchval = AsyncMock(return_value=False)
+        connection.close = AsyncMock()
+
+        async def run():
+            with patch('backend.services.recurring_service.asyncpg.connect', AsyncMock(return_value=connection)):
+                with patch.object(scheduler, 'materialize', AsyncMock()) as materialize:
+                    scheduler.start()
+                    await asyncio.sleep(0.05)
+                    await scheduler.stop()
+            return materialize
+
+        materialize = asyncio.run(run())
+
+        materialize.assert_not_called()
+        assert scheduler.is_leader is False
+        assert connection.fetchval.await_args.args == ("SELECT pg_try_advisory_lock($1)", 1)
+        connection.close.assert_awaited()
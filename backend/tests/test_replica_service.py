@@ -0,0 +1,90 @@
+"""Unit тесты для ReplicaRouter."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import Mock, AsyncMock, MagicMock
+
+from backend.services.replica_service import REPLICA_LAG_SQL, ReplicaRouter
+
+
+def make_engine(lag: float = 0.0, fail: bool = False):
+    """Создать мок движка реплики."""
+    conn = AsyncMock()
+    if fail:
+        conn.execute.side_effect = ConnectionError("replica down")
+    else:
+        conn.execute.return_value = Mock(scalar_one=Mock(return_value=lag))
+    engine = Mock()
+    engine.connect = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine
+
+
+def make_router(replica=None, max_lag: float = 5.0) -> ReplicaRouter:
+    """Создать маршрутизатор с фабриками-заглушками."""
+    return ReplicaRouter(
+        replica=replica,
+        replica_sessions=Mock(name="replica_sessions"),
+        primary_sessions=Mock(name="primary_sessions"),
+        max_lag=max_lag,
+    )
+
+
+class TestReplicaRouter:
+    """Тесты для ReplicaRouter."""
+
+    def test_without_replica(self):
+        """Тест, что без реплики чтение идет с основной БД."""
+        router = make_router()
+
+        assert router.use_replica() is False
+        assert router.session_factory() is router.primary_sessions
+
+    def test_not_used_before_first_check(self):
+        """Тест, что без измерения задержки реплика не используется."""
+        router = make_router(replica=make_engine())
+
+        assert router.use_replica() is False
+
+    def test_replica_within_lag(self):
+        """Тест чтения с реплики при допустимой задержке."""
+        router = make_router(replica=make_engine(lag=0.5))
+
+        assert asyncio.run(router.refresh()) == 0.5
+        assert router.use_replica() is True
+        assert router.session_factory() is router.replica_sessions
+
+    def test_fallback_on_lag(self):
+        """Тест переключения на основную БД при большой задержке."""
+        router = make_router(replica=make_engine(lag=12.0), max_lag=5.0)
+
+        asyncio.run(router.refresh())
+
+        assert router.use_replica() is False
+        assert router.session_factory() is router.primary_sessions
+
+    def test_fallback_when_not_streaming(self):
+        """Тест, что реплика без потоковой репликации считается отстающей."""
+        router = make_router(replica=make_engine(lag=float("inf")))
+
+        asyncio.run(router.refresh())
+
+        assert "pg_stat_wal_receiver" in REPLICA_LAG_SQL
+        assert "status = 'streaming'" in REPLICA_LAG_SQL
+        assert router.use_replica() is False
+
+    def test_fallback_on_failure(self):
+        """Тест переключения на основную БД при недоступной реплике."""
+        router = make_router(replica=make_engine(fail=True))
+
+        assert asyncio.run(router.refresh()) is None
+        assert router.use_replica() is False
+
+    def test_stale_measurement(self):
+        """Тест, что устаревшее измерение не используется."""
+        router = make_router(replica=make_engine(lag=0.1))
+        asyncio.run(router.refresh())
+
+        router.checked_at = datetime.utcnow() - timedelta(seconds=router.interval * 4)
+
+        assert router.use_replica() is False
@@ -0,0 +1,129 @@
+"""Unit тесты для планировщика отложенных задач."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from uuid import uuid4
+
+from backend.services.scheduler_service import TaskScheduler, TimerWheel, timestamp
+from backend.services.task_events_service import RESYNC
+
+
+def make_session_factory():
+    """Создать мок фабрики сессий."""
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=MagicMock())
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def make_scheduler(batch_size: int = 100) -> TaskScheduler:
+    """Создать планировщик с моками очереди и БД."""
+    return TaskScheduler(
+        publish=AsyncMock(),
+        session_factory=make_session_factory(),
+        window=60,
+        tick=0.1,
+        batch_size=batch_size,
+    )
+
+
+class TestTimerWheel:
+    """Тесты для TimerWheel."""
+
+    def test_fires_not_before_deadline(self):
+        """Тест срабатывания таймера в первом тике после его времени."""
+        wheel = TimerWheel(tick=1.0, slots=10, now=100.0)
+        wheel.add("a", 102.5, "a")
+        wheel.add("b", 104.0, "b")
+
+        assert wheel.advance(102.9) == []
+        assert wheel.advance(103.0) == ["a"]
+        assert wheel.advance(110.0) == ["b"]
+        assert len(wheel) == 0
+
+    def test_overdue_and_duplicates(self):
+        """Тест просроченного и повторно добавленного таймера."""
+        wheel = TimerWheel(tick=1.0, slots=10, now=100.0)
+        wheel.add("a", 50.0, "a")
+        wheel.add("a", 105.0, "a")
+
+        assert "a" in wheel
+        assert wheel.advance(101.0) == ["a"]
+
+    def test_rejects_beyond_one_revolution(self):
+        """Тест, что таймер дальше одного оборота не добавляется."""
+        wheel = TimerWheel(tick=1.0, slots=10, now=100.0)
+
+        assert wheel.add("far", 111.0, "far") is False
+        assert wheel.add("near", 109.0, "near") is True
+
+    def test_long_pause(self):
+        """Тест продвижения больше чем на оборот за один вызов."""
+        wheel = TimerWheel(tick=1.0, slots=4, now=0.0)
+        wheel.add("a", 2.0, "a")
+        wheel.add("b", 3.0, "b")
+
+        assert sorted(wheel.advance(100.0)) == ["a", "b"]
+
+
+class TestTaskScheduler:
+    """Тесты для TaskScheduler."""
+
+    def test_refresh_and_dispatch(self):
+        """Тест загрузки окна и отправки наступивших задач."""
+        scheduler = make_scheduler()
+        now = datetime.utcnow()
+        due = Mock(id=uuid4(), created_at=now, run_at=now - timedelta(seconds=1))
+        later = Mock(id=uuid4(), created_at=now, run_at=now + timedelta(seconds=30))
+
+        with patch('backend.services.scheduler_service.TaskRepository') as mock_repo:
+            mock_repo.get_scheduled = AsyncMock(return_value=[due, later])
+            mock_repo.claim_scheduled = AsyncMock(return_value=[(due.id, "acme")])
+
+            assert asyncio.run(scheduler.refresh(now)) == 2
+            fired = scheduler.wheel.advance(timestamp(now + timedelta(seconds=1)))
+            dispatched = asyncio.run(scheduler.dispatch(fired, now))
+
+            assert fired == [(due.id, due.created_at)]
+            assert dispatched == [due.id]
+            assert later.id in scheduler.wheel
+            assert scheduler.loaded_until == now + timedelta(seconds=60)
+            scheduler.publish.assert_called_once_with([(due.id, "acme")])
+
+    def test_truncated_refresh(self):
+        """Тест, что при неполной загрузке окно ограничивается последней задачей."""
+        scheduler = make_scheduler(batch_size=2)
+        now = datetime.utcnow()
+        rows = [
+            Mock(id=uuid4(), created_at=now, run_at=now + timedelta(seconds=seconds))
+            for seconds in (1, 2)
+        ]
+
+        with patch('backend.services.scheduler_service.TaskRepository') as mock_repo:
+            mock_repo.get_scheduled = AsyncMock(return_value=rows)
+            asyncio.run(scheduler.refresh(now))
+
+        assert scheduler.loaded_until == rows[-1].run_at
+        assert scheduler._next_refresh < now + timedelta(seconds=2)
+
+    def test_on_event(self):
+        """Тест добавления задачи ближайшего окна по событию."""
+        scheduler = make_scheduler()
+        now = datetime.utcnow()
+        scheduler.loaded_until = now + timedelta(seconds=60)
+        scheduler._next_refresh = now + timedelta(seconds=30)
+        near, far = uuid4(), uuid4()
+
+        for task_id, seconds in ((near, 5), (far, 600)):
+            scheduler.on_event({
+                "id": str(task_id),
+                "status": "SCHEDULED",
+                "created_at": now.isoformat(),
+                "run_at": (now + timedelta(seconds=seconds)).isoformat(),
+            })
+
+        assert near in scheduler.wheel
+        assert far not in scheduler.wheel
+
+        scheduler.on_event(RESYNC)
+        assert scheduler._next_refresh is None
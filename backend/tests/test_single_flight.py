@@ -0,0 +1,117 @@
+"""Unit тесты для SingleFlight."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from backend.models import Task
+from backend.services.single_flight import SingleFlight, task_content_key
+
+
+class TestSingleFlight:
+    """Тесты для SingleFlight."""
+
+    def test_concurrent_calls_run_once(self):
+        """Тест, что одновременные вызовы с одним ключом выполняются один раз."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        async def run():
+            return await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 5
+
+    def test_error_shared_and_not_cached(self):
+        """Тест, что ошибка доставляется всем ожидающим и не кэшируется."""
+        flight = SingleFlight(ttl=60)
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.run("key", work) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, ValueError) for result in results)
+        with pytest.raises(ValueError):
+            asyncio.run(flight.run("key", work))
+        assert len(calls) == 2
+
+    def test_leader_cancelled(self):
+        """Тест, что при отмене ведущего вызова ожидающий выполняет работу сам."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01 if len(calls) > 1 else 10)
+            return len(calls)
+
+        async def run():
+            leader = asyncio.create_task(flight.run("key", work))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flight.run("key", work)) for _ in range(2)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            results = await asyncio.gather(leader, *followers, return_exceptions=True)
+            return results, flight._inflight
+
+        (leader_result, *follower_results), inflight = asyncio.run(run())
+
+        assert isinstance(leader_result, asyncio.CancelledError)
+        # Один из ожидающих стал ведущим, второй получил его результат
+        assert follower_results == [2, 2]
+        assert len(calls) == 2
+        assert inflight == {}
+
+    def test_cache_reuse_window(self):
+        """Тест повторного использования результата в пределах ttl."""
+        flight = SingleFlight(ttl=10, max_size=2)
+        calls = []
+
+        async def work():
+            calls.append(1)
+            return len(calls)
+
+        with patch("backend.services.single_flight.time.monotonic", return_value=100.0):
+            assert asyncio.run(flight.run("key", work)) == 1
+            assert asyncio.run(flight.run("key", work)) == 1
+
+        with patch("backend.services.single_flight.time.monotonic", return_value=111.0):
+            assert asyncio.run(flight.run("key", work)) == 2
+
+    def test_cache_is_bounded(self):
+        """Тест вытеснения давно использованных результатов."""
+        flight = SingleFlight(ttl=60, max_size=2)
+
+        async def work():
+            return "value"
+
+        for key in ("a", "b", "c"):
+            asyncio.run(flight.run(key, work))
+
+        assert list(flight._cache) == ["b", "c"]
+
+    def test_task_content_key(self):
+        """Тест, что ключ зависит только от входных данных задачи."""
+        first = Task(name="Report", description="2024")
+        second = Task(name="Report", description="2024")
+        other = Task(name="Report", description="2025")
+
+        assert task_content_key(first) == task_content_key(second)
+        assert task_content_key(first) != task_content_key(other)
@@ -0,0 +1,133 @@
+"""Unit тесты для статистики задач."""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from backend.exceptions import InvalidTaskFilterError
+from backend.models import Task, TaskStatus, TaskPriority
+from backend.repository.stats_repository import (
+    METRIC_QUEUE_WAIT,
+    METRIC_RUN_DURATION,
+    bin_bounds,
+    collect_task_transitions,
+    latency_bin,
+)
+from backend.services.stats_service import StatsService, histogram_percentile
+
+
+class TestLatencyHistogram:
+    """Тесты для логарифмической гистограммы."""
+    
+    @pytest.mark.parametrize("duration_ms", [1.5, 10, 250, 3600 * 1000])
+    def test_bin_contains_value(self, duration_ms):
+        """Тест, что длительность попадает в границы своей корзины."""
+        lower, upper = bin_bounds(latency_bin(duration_ms))
+        
+        assert lower < duration_ms <= upper
+        assert upper / lower == pytest.approx(2 ** 0.25)
+    
+    def test_small_durations(self):
+        """Тест корзины для длительностей до 1 мс."""
+        assert latency_bin(0) == 0
+        assert latency_bin(1) == 0
+        assert bin_bounds(0) == (0.0, 1.0)
+    
+    def test_percentile(self):
+        """Тест оценки перцентилей."""
+        histogram = {latency_bin(10): 90, latency_bin(1000): 10}
+        
+        p50 = histogram_percentile(histogram, 0.5)
+        p99 = histogram_percentile(histogram, 0.99)
+        
+        assert bin_bounds(latency_bin(10))[0] <= p50 <= bin_bounds(latency_bin(10))[1]
+        assert bin_bounds(latency_bin(1000))[0] <= p99 <= bin_bounds(latency_bin(1000))[1]
+        assert histogram_percentile({}, 0.5) is None
+
+
+class TestTaskTransitions:
+    """Тесты для сбора переходов задач."""
+    
+    def test_new_task(self):
+        """Тест учета новой задачи."""
+        session = Session()
+        session.add(Task(id=uuid4(), name="a", priority=TaskPriority.HIGH, status=TaskStatus.NEW))
+        
+        counts, latencies = collect_task_transitions(session)
+        
+        assert list(counts.values()) == [1]
+        (bucket, status, priority), = counts.keys()
+        assert (status, priority) == (TaskStatus.NEW, TaskPriority.HIGH)
+        assert bucket.second == 0 and bucket.microsecond == 0
+        assert latencies == {}
+    
+    def test_latencies(self):
+        """Тест учета длительностей при начале и завершении обработки."""
+        created = datetime(2024, 1, 1, 12, 0, 0)
+        session = Session()
+        session.add(Task(
+            id=uuid4(), name="a", priority=TaskPriority.LOW, status=TaskStatus.IN_PROGRESS,
+            created_at=created, started_at=created + timedelta(milliseconds=300),
+        ))
+        session.add(Task(
+            id=uuid4(), name="b", priority=TaskPriority.LOW, status=TaskStatus.COMPLETED,
+            created_at=created, started_at=created,
+            completed_at=created + timedelta(seconds=2),
+        ))
+        
+        counts, latencies = collect_task_transitions(session)
+        
+        metrics = {(metric, bin_number) for _, metric, bin_number in latencies}
+        assert metrics == {
+            (METRIC_QUEUE_WAIT, latency_bin(300)),
+            (METRIC_RUN_DURATION, latency_bin(2000)),
+        }
+
+
+class TestStatsService:
+    """Тесты для StatsService."""
+    
+    def test_get_stats(self, mock_session):
+        """Тест сборки статистики из агрегатов."""
+        bucket = datetime(2024, 1, 1, 12, 0)
+        
+        with patch('backend.services.stats_service.StatsRepository') as mock_repo:
+            mock_repo.get_status_counts = AsyncMock(return_value=[
+                (TaskStatus.COMPLETED, TaskPriority.HIGH, 5),
+            ])
+            mock_repo.get_throughput = AsyncMock(return_value=[
+                (bucket, TaskStatus.COMPLETED, 5),
+                (bucket, TaskStatus.FAILED, 1),
+            ])
+            mock_repo.get_histograms = AsyncMock(return_value={
+                METRIC_RUN_DURATION: {latency_bin(100): 6},
+            })
+            
+            service = StatsService(session=mock_session)
+            
+            stats = asyncio.run(service.get_stats(
+                window_from=datetime(2024, 1, 1, 11, 30, 15),
+                window_to=datetime(2024, 1, 1, 12, 30, 15),
+            ))
+            
+            assert stats.window_from == datetime(2024, 1, 1, 11, 30)
+            assert stats.window_to == datetime(2024, 1, 1, 12, 31)
+            assert stats.counts[0].count == 5
+            assert len(stats.throughput) == 1
+            assert (stats.throughput[0].completed, stats.throughput[0].failed) == (5, 1)
+            assert stats.run_duration.count == 6
+            assert stats.queue_wait.count == 0
+            assert stats.queue_wait.p50 is None
+    
+    def test_invalid_window(self, mock_session):
+        """Тест окна, у которого начало позже конца."""
+        service = StatsService(session=mock_session)
+        
+        with pytest.raises(InvalidTaskFilterError):
+            asyncio.run(service.get_stats(
+                window_from=datetime(2024, 1, 2),
+                window_to=datetime(2024, 1, 1),
+            ))
@@ -0,0 +1,157 @@
+"""Unit тесты для событий смены статуса задач."""
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from backend.models import Task, TaskStatus
+from backend.repository.task_events import collect_task_events
+from backend.services.task_events_service import (
+    RESYNC,
+    TaskEventHub,
+    task_status_events,
+)
+
+
+def make_hub(queue_size: int = 10) -> TaskEventHub:
+    """Создать хаб без подключения к БД."""
+    return TaskEventHub(dsn="postgresql://test", channel="task_events", queue_size=queue_size)
+
+
+def make_session_factory():
+    """Создать мок фабрики сессий."""
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=MagicMock())
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def event(task_id, status: TaskStatus) -> str:
+    """JSON события NOTIFY."""
+    return json.dumps({"id": str(task_id), "status": status.value})
+
+
+class TestTaskEventHub:
+    """Тесты для TaskEventHub."""
+    
+    def test_dispatch_to_subscribers(self):
+        """Тест раздачи события только подписчикам задачи."""
+        hub = make_hub()
+        task_id, other_id = uuid4(), uuid4()
+        
+        async def run():
+            async with hub.subscribe([task_id]) as queue, hub.subscribe([other_id]) as other:
+                hub.dispatch(event(task_id, TaskStatus.IN_PROGRESS))
+                assert other.empty()
+                assert hub.subscriber_count == 2
+                return await queue.get()
+        
+        assert asyncio.run(run())["status"] == "IN_PROGRESS"
+        assert hub.subscriber_count == 0
+    
+    def test_overflow_sends_resync(self):
+        """Тест, что переполненная очередь заменяется сигналом RESYNC."""
+        hub = make_hub(queue_size=2)
+        task_id = uuid4()
+        
+        async def run():
+            async with hub.subscribe([task_id]) as queue:
+                for _ in range(3):
+                    hub.dispatch(event(task_id, TaskStatus.IN_PROGRESS))
+                return [queue.get_nowait() for _ in range(queue.qsize())]
+        
+        assert asyncio.run(run()) == [RESYNC]
+    
+    def test_waiter_woken_by_terminal_event(self):
+        """Тест, что ожидающий просыпается только от конечного статуса."""
+        hub = make_hub()
+        task_id = uuid4()
+        
+        async def run():
+            async with hub.wait_for_terminal(task_id) as waiter:
+                hub.dispatch(event(task_id, TaskStatus.IN_PROGRESS))
+                assert not waiter.done()
+                assert hub.waiter_count == 1
+                hub.dispatch(event(task_id, TaskStatus.COMPLETED))
+                return await waiter
+        
+        assert asyncio.run(run())["status"] == "COMPLETED"
+        assert hub.waiter_count == 0
+    
+    def test_waiters_woken_by_resync(self):
+        """Тест, что после переподключения ожидающие перечитывают статус."""
+        hub = make_hub()
+        
+        async def run():
+            async with hub.wait_for_terminal(uuid4()) as first, hub.wait_for_terminal(uuid4()) as second:
+                hub._broadcast_resync()
+                return first.result(), second.result()
+        
+        assert asyncio.run(run()) == (RESYNC, RESYNC)
+
+
+class TestTaskStatusEvents:
+    """Тесты для потока событий подписчика."""
+    
+    def test_snapshot_then_updates_until_terminal(self):
+        """Тест снимка статусов, событий и завершения потока."""
+        hub = make_hub()
+        task_id, missing_id = uuid4(), uuid4()
+        row = MagicMock(
+            id=task_id,
+            status=TaskStatus.PENDING,
+            created_at=datetime(2024, 1, 1),
+            run_at=None,
+            started_at=None,
+            completed_at=None,
+        )
+        
+        async def run():
+            events = task_status_events(
+                hub, [task_id, missing_id], 0.01, session_factory=make_session_factory()
+            )
+            received = [await events.__anext__(), await events.__anext__()]
+            hub.dispatch(event(task_id, TaskStatus.COMPLETED))
+            received += [item async for item in events]
+            return received
+        
+        with patch('backend.services.task_events_service.TaskRepository') as mock_repo:
+            mock_repo.get_statuses = AsyncMock(return_value=[row])
+            
+            received = asyncio.run(run())
+        
+        assert received[0] == ("status", {
+            "id": str(task_id),
+            "status": "PENDING",
+            "created_at": "2024-01-01T00:00:00",
+            "run_at": None,
+            "started_at": None,
+            "completed_at": None,
+        })
+        assert received[1] == ("not_found", {"id": str(missing_id)})
+        assert received[-1] == ("status", {"id": str(task_id), "status": "COMPLETED"})
+        assert all(item is None for item in received[2:-1])
+
+
+class TestCollectTaskEvents:
+    """Тесты для сбора событий при сохранении задач."""
+    
+    def test_new_task(self):
+        """Тест события для новой задачи."""
+        session = Session()
+        task = Task(id=uuid4(), name="a", status=TaskStatus.NEW, created_at=datetime(2024, 1, 1))
+        session.add(task)
+        
+        payloads = [json.loads(payload) for payload in collect_task_events(session)]
+        
+        assert payloads == [{
+            "id": str(task.id),
+            "status": "NEW",
+            "created_at": "2024-01-01T00:00:00",
+            "run_at": None,
+            "started_at": None,
+            "completed_at": None,
+        }]
@@ -0,0 +1,201 @@
+"""Unit тесты для формата сообщений очереди задач."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.services.rabbitmq_service import RabbitMQService
+from backend.services.task_messages import (
+    TASK_MESSAGE_CONTENT_TYPE,
+    AckTracker,
+    EnvelopeAck,
+    decode_task_ids,
+    encode_json_task_id,
+    encode_task_ids,
+)
+
+
+def make_service():
+    """Сервис RabbitMQ с моком канала и двумя под-очередями."""
+    with patch('backend.services.rabbitmq_service.settings') as mock_settings:
+        mock_settings.rabbitmq_queue = "tasks"
+        mock_settings.task_queue_shards = 2
+        service = RabbitMQService()
+    channel = MagicMock()
+    channel.default_exchange.publish = AsyncMock()
+    service.get_channel = AsyncMock(return_value=channel)
+    service._get_queue = AsyncMock()
+    return service, channel
+
+
+class TestTaskMessageCodec:
+    """Тесты кодирования ID задач."""
+
+    def test_binary_round_trip(self):
+        """Тест упаковки нескольких задач в конверт."""
+        task_ids = [uuid4() for _ in range(3)]
+
+        body = encode_task_ids(task_ids)
+
+        assert len(body) == 7 + 16 * 3
+        assert decode_task_ids(body) == task_ids
+
+    def test_legacy_json(self):
+        """Тест разбора сообщений прежнего JSON-формата."""
+        first, second = uuid4(), uuid4()
+
+        assert decode_task_ids(encode_json_task_id(first)) == [first]
+        body = json.dumps({"task_ids": [str(first), str(second)]}).encode()
+        assert decode_task_ids(body) == [first, second]
+
+    @pytest.mark.parametrize("body", [
+        b"TQ\x01",
+        b"TQ\x02\x00\x00\x00\x00",
+        encode_task_ids([uuid4()])[:-1],
+        b"not json",
+        b'{"id": "x"}',
+    ])
+    def test_malformed(self, body):
+        """Тест ошибки разбора поврежденного сообщения."""
+        with pytest.raises(ValueError):
+            decode_task_ids(body)
+
+    def test_envelope_ack_after_last_task(self):
+        """Тест подтверждения сообщения после обработки всех его задач."""
+        tracker = MagicMock()
+        message = MagicMock()
+        ack = EnvelopeAck(message, 2, tracker)
+
+        asyncio.run(ack.done())
+        tracker.ack.assert_not_called()
+        asyncio.run(ack.done())
+        tracker.ack.assert_called_once_with(message)
+
+
+class TestSendTasksToQueue:
+    """Тесты пакетной отправки задач."""
+
+    def test_groups_by_queue_and_chunks(self):
+        """Тест группировки по очередям и разбиения на конверты."""
+        service, channel = make_service()
+        tasks = [(uuid4(), "acme") for _ in range(3)] + [(uuid4(), None)]
+
+        with patch('backend.services.rabbitmq_service.settings') as mock_settings:
+            mock_settings.task_message_format = "binary"
+            mock_settings.task_message_batch_size = 2
+            mock_settings.worker_batch_size = 8
+            assert asyncio.run(service.send_tasks_to_queue(tasks)) == 4
+
+        calls = channel.default_exchange.publish.call_args_list
+        routed = {}
+        for call in calls:
+            message = call.args[0]
+            assert message.content_type == TASK_MESSAGE_CONTENT_TYPE
+            routed.setdefault(call.kwargs["routing_key"], []).extend(decode_task_ids(message.body))
+        assert len(calls) == 3
+        assert routed[service.queue_for("acme")] == [task_id for task_id, _ in tasks[:3]]
+        assert routed["tasks"] == [tasks[3][0]]
+
+    def test_envelope_capped_by_worker_batch(self):
+        """Тест ограничения размера конверта пачкой worker."""
+        service, channel = make_service()
+        tasks = [(uuid4(), None) for _ in range(10)]
+
+        with patch('backend.services.rabbitmq_service.settings') as mock_settings:
+            mock_settings.task_message_format = "binary"
+            mock_settings.task_message_batch_size = 1000
+            mock_settings.worker_batch_size = 4
+            asyncio.run(service.send_tasks_to_queue(tasks))
+
+        sizes = [
+            len(decode_task_ids(call.args[0].body))
+            for call in channel.default_exchange.publish.call_args_list
+        ]
+        assert sizes == [4, 4, 2]
+
+    def test_json_format_during_rollout(self):
+        """Тест отправки по задаче в сообщении в формате json."""
+        service, channel = make_service()
+        tasks = [(uuid4(), None), (uuid4(), None)]
+
+        with patch('backend.services.rabbitmq_service.settings') as mock_settings:
+            mock_settings.task_message_format = "json"
+            asyncio.run(service.send_tasks_to_queue(tasks))
+
+        bodies = [call.args[0].body for call in channel.default_exchange.publish.call_args_list]
+        assert [json.loads(body) for body in bodies] == [{"task_id": str(task_id)} for task_id, _ in tasks]
+
+    def test_unavailable_broker(self):
+        """Тест, что недоступность RabbitMQ не пробрасывается."""
+        service, _ = make_service()
+        service.get_channel = AsyncMock(return_value=None)
+
+        assert asyncio.run(service.send_tasks_to_queue([(uuid4(), None)])) == 0
+
+
+def incoming(tag, channel):
+    """Mock входящего сообщения с номером доставки."""
+    message = MagicMock(delivery_tag=tag, channel=channel)
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
+
+
+class TestAckTracker:
+    """Тесты для AckTracker."""
+
+    def test_multiple_ack_stops_at_unsettled(self):
+        """Тест, что multiple=True не подтверждает необработанные сообщения."""
+        tracker = AckTracker()
+        channel = object()
+        messages = [incoming(tag, channel) for tag in range(1, 6)]
+        for message in messages:
+            tracker.register(message)
+
+        for message in (messages[0], messages[1], messages[3]):
+            tracker.ack(message)
+        asyncio.run(tracker.flush())
+
+        messages[1].ack.assert_called_once_with(multiple=True)
+        messages[0].ack.assert_not_called()
+        # После необработанного сообщения 3 — отдельное подтверждение
+        messages[3].ack.assert_called_once_with()
+        assert tracker.unsettled == 2
+
+        asyncio.run(tracker.nack(messages[2]))
+        tracker.ack(messages[4])
+        asyncio.run(tracker.flush())
+
+        messages[2].nack.assert_called_once_with(requeue=True)
+        messages[4].ack.assert_called_once_with(multiple=True)
+        assert tracker.unsettled == 0
+
+    def test_new_channel_resets(self):
+        """Тест сброса отметок после переподключения канала."""
+        tracker = AckTracker()
+        old = incoming(1, object())
+        tracker.register(old)
+        new = incoming(1, object())
+        tracker.register(new)
+
+        tracker.ack(new)
+        asyncio.run(tracker.flush())
+
+        new.ack.assert_called_once_with(multiple=True)
+        old.ack.assert_not_called()
+
+    def test_envelope_nacked_when_task_retried(self):
+        """Тест возврата в очередь конверта с задачей для повтора."""
+        tracker = AckTracker()
+        message = incoming(1, object())
+        tracker.register(message)
+        ack = EnvelopeAck(message, 2, tracker)
+
+        asyncio.run(ack.done(retry=True))
+        asyncio.run(ack.done())
+        asyncio.run(tracker.flush())
+
+        message.nack.assert_called_once_with(requeue=True)
+        message.ack.assert_not_called()
@@ -1,10 +1,16 @@
 """Unit тесты для TaskProcessingService."""
 import asyncio
+import gzip
+import hashlib
+import json
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch
 from uuid import uuid4
 
+from sqlalchemy.dialects import postgresql
+
+from backend.services.single_flight import SingleFlight
 from backend.services.task_processing_service import TaskProcessingService
 from backend.models import Task, TaskStatus
 from backend.exceptions import TaskNotFoundError
@@ -19,18 +25,39 @@ class TestTaskProcessingService:
         
         assert service.session == mock_session
     
-    def test_process_task(self, mock_session):
+    def test_process_task(self, mock_session, sample_task):
         """Тест обработки задачи."""
-        task_id = uuid4()
-        
         service = TaskProcessingService(session=mock_session)
         
-        result = asyncio.run(service.process_task(task_id))
+        result = asyncio.run(service.compute_result(sample_task))
         
-        assert result["task_id"] == str(task_id)
+        assert result["task_id"] == str(sample_task.id)
         assert "processed_at" in result
         assert result["message"] == "Task processed successfully"
     
+    def test_compute_result_coalesced(self, mock_session, sample_task):
+        """Тест, что одинаковые задачи получают результат одного запуска со своим task_id."""
+        twin = Task(id=uuid4(), name=sample_task.name, description=sample_task.description)
+        flight = SingleFlight()
+        service = TaskProcessingService(session=mock_session, single_flight=flight)
+        
+        async def process_task(task):
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+        
+        with patch.object(TaskProcessingService, "process_task", new=AsyncMock(side_effect=process_task)) as process:
+            async def run():
+                return await asyncio.gather(
+                    service.compute_result(sample_task),
+                    service.compute_result(twin),
+                )
+            
+            assert asyncio.run(run()) == [
+                {"task_id": str(sample_task.id), "ok": True},
+                {"task_id": str(twin.id), "ok": True},
+            ]
+            process.assert_called_once_with(sample_task)
+    
     def test_start_processing(self, mock_session, sample_task):
         """Тест начала обработки задачи."""
         in_progress_task = Task(
@@ -54,6 +81,26 @@ class TestTaskProcessingService:
             assert call_args[1]["task_id"] == sample_task.id
             assert call_args[1]["status"] == TaskStatus.IN_PROGRESS
             assert "started_at" in call_args[1]
+            assert call_args[1]["lease_expires_at"] is None
+    
+    def test_start_processing_with_lease(self, mock_session, sample_task):
+        """Тест начала обработки с арендой задачи worker."""
+        lease_expires_at = datetime.utcnow() + timedelta(seconds=60)
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.update_status = AsyncMock(return_value=sample_task)
+            
+            service = TaskProcessingService(session=mock_session)
+            
+            asyncio.run(service.start_processing(
+                sample_task.id,
+                lease_owner="host:1:abc",
+                lease_expires_at=lease_expires_at,
+            ))
+            
+            call_args = mock_repo.update_status.call_args
+            assert call_args[1]["lease_owner"] == "host:1:abc"
+            assert call_args[1]["lease_expires_at"] == lease_expires_at
     
     def test_start_processing_not_found(self, mock_session):
         """Тест начала обработки несуществующей задачи."""
@@ -69,44 +116,215 @@ class TestTaskProcessingService:
             
             mock_repo.update_status.assert_called_once()
     
+    def test_claim_tasks(self, mock_session):
+        """Тест взятия пачки задач в обработку одним запросом."""
+        task_ids = [uuid4(), uuid4()]
+        lease_expires_at = datetime.utcnow() + timedelta(seconds=60)
+        claimed = [Mock(id=task_ids[0])]
+        mock_session.commit = AsyncMock()
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.claim_for_processing = AsyncMock(return_value=claimed)
+            
+            service = TaskProcessingService(session=mock_session)
+            
+            assert asyncio.run(service.claim_tasks(task_ids, "host:1:abc", lease_expires_at)) == claimed
+            
+            call_args = mock_repo.claim_for_processing.call_args[0]
+            assert call_args[:4] == (mock_session, task_ids, "host:1:abc", lease_expires_at)
+            mock_session.commit.assert_called_once()
+    
+    def test_release_for_retry(self, mock_session):
+        """Тест возврата задач в PENDING только из аренды этого worker."""
+        task_ids = [uuid4()]
+        mock_session.commit = AsyncMock()
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.bulk_update_status = AsyncMock(return_value=[Mock()])
+            
+            service = TaskProcessingService(session=mock_session)
+            
+            assert asyncio.run(service.release_for_retry(task_ids, "host:1:abc")) == 1
+            
+            call_args = mock_repo.bulk_update_status.call_args
+            assert call_args[0][1:3] == ((TaskStatus.IN_PROGRESS,), TaskStatus.PENDING)
+            assert call_args[1]["task_ids"] == task_ids
+            assert call_args[1]["lease_owner"] == "host:1:abc"
+            assert call_args[1]["values"] == {"lease_owner": None, "lease_expires_at": None}
+            mock_session.commit.assert_called_once()
+    
     def test_complete_processing(self, mock_session, sample_task):
         """Тест успешного завершения обработки."""
         result = {
             "task_id": str(sample_task.id),
             "message": "Task completed"
         }
+        mock_session.commit = AsyncMock()
         
         with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
-            mock_repo.update_status = AsyncMock()
+            mock_repo.finish_processing = AsyncMock(return_value=Mock())
+            mock_repo.release_children = AsyncMock(return_value=[])
             
             service = TaskProcessingService(session=mock_session)
             
+            assert asyncio.run(service.complete_processing(sample_task.id, result, lease_owner="w1")) is True
+            
+            mock_repo.finish_processing.assert_called_once()
+            call_args = mock_repo.finish_processing.call_args
+            assert call_args[0][:3] == (mock_session, sample_task.id, TaskStatus.COMPLETED)
+            assert call_args[1]["lease_owner"] == "w1"
+            assert call_args[1]["values"] == {"result": result}
+            mock_session.commit.assert_called_once()
+    
+    def test_complete_processing_offloads_large_result(self, mock_session, sample_task):
+        """Тест выноса крупного результата во внешнее хранилище."""
+        result = {"data": "x" * 20000}
+        blob_store = Mock()
+        blob_store.put = AsyncMock()
+        mock_session.commit = AsyncMock()
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.finish_processing = AsyncMock(return_value=Mock())
+            mock_repo.release_children = AsyncMock(return_value=[])
+            
+            service = TaskProcessingService(session=mock_session, blob_store=blob_store)
+            
             asyncio.run(service.complete_processing(sample_task.id, result))
             
-            mock_repo.update_status.assert_called_once()
-            call_args = mock_repo.update_status.call_args
-            assert call_args[0][0] == mock_session
-            assert call_args[1]["task_id"] == sample_task.id
-            assert call_args[1]["status"] == TaskStatus.COMPLETED
-            assert call_args[1]["result"] == result
-            assert "completed_at" in call_args[1]
+            key, data = blob_store.put.call_args[0]
+            assert str(sample_task.id) in key
+            assert json.loads(gzip.decompress(data)) == result
+            
+            values = mock_repo.finish_processing.call_args[1]["values"]
+            assert "result" not in values
+            assert values["result_ref"] == key
+            assert values["result_size"] == len(gzip.decompress(data))
+            assert values["result_checksum"] == hashlib.sha256(gzip.decompress(data)).hexdigest()
+    
+    def test_complete_processing_after_lease_lost(self, mock_session, sample_task, mock_rabbitmq_service):
+        """Тест, что результат отбрасывается, если reaper уже вернул задачу в очередь."""
+        blob_store = Mock()
+        blob_store.put = AsyncMock()
+        mock_session.commit = AsyncMock()
+        mock_session.rollback = AsyncMock()
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            # Аренда истекла: задача в PENDING или уже в аренде другого worker
+            mock_repo.finish_processing = AsyncMock(return_value=None)
+            mock_repo.release_children = AsyncMock(return_value=[Mock(status=TaskStatus.PENDING)])
+            
+            service = TaskProcessingService(
+                session=mock_session,
+                blob_store=blob_store,
+                rabbitmq_service=mock_rabbitmq_service,
+            )
+            
+            assert asyncio.run(service.complete_processing(
+                sample_task.id, {"data": "x" * 20000}, lease_owner="w1"
+            )) is False
+            
+            mock_session.rollback.assert_called_once()
+            mock_session.commit.assert_not_called()
+            blob_store.put.assert_not_called()
+            mock_repo.release_children.assert_not_called()
+            mock_rabbitmq_service.send_tasks_to_queue.assert_not_called()
+    
+    def test_complete_cancelled_task_without_signal(self, sample_task, mock_rabbitmq_service):
+        """Тест, что worker, пропустивший сигнал отмены, не перезапишет CANCELLED."""
+        result = Mock()
+        # Задача отменена в БД: условие status = IN_PROGRESS не выполняется
+        result.first.return_value = None
+        session = Mock()
+        session.execute = AsyncMock(return_value=result)
+        session.run_sync = AsyncMock()
+        session.commit = AsyncMock()
+        session.rollback = AsyncMock()
+        
+        service = TaskProcessingService(session=session, rabbitmq_service=mock_rabbitmq_service)
+        
+        assert asyncio.run(service.complete_processing(sample_task.id, {"value": 1}, lease_owner="w1")) is False
+        
+        # Единственный запрос — условная итоговая запись, зависимые задачи не освобождаются
+        session.execute.assert_called_once()
+        compiled = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        where = str(compiled).split(" WHERE ")[1]
+        assert "tasks.status = " in where
+        assert TaskStatus.IN_PROGRESS in compiled.params.values()
+        session.rollback.assert_called_once()
+        session.commit.assert_not_called()
+        mock_rabbitmq_service.send_tasks_to_queue.assert_not_called()
     
     def test_fail_processing(self, mock_session, sample_task):
         """Тест завершения обработки с ошибкой."""
         error_message = "Processing failed"
+        mock_session.commit = AsyncMock()
         
         with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
-            mock_repo.update_status = AsyncMock()
+            mock_repo.finish_processing = AsyncMock(return_value=Mock())
+            mock_repo.finish_dependents = AsyncMock(return_value=0)
             
             service = TaskProcessingService(session=mock_session)
             
-            asyncio.run(service.fail_processing(sample_task.id, error_message))
+            assert asyncio.run(service.fail_processing(sample_task.id, error_message, lease_owner="w1")) is True
             
-            mock_repo.update_status.assert_called_once()
-            call_args = mock_repo.update_status.call_args
-            assert call_args[0][0] == mock_session
-            assert call_args[1]["task_id"] == sample_task.id
-            assert call_args[1]["status"] == TaskStatus.FAILED
-            assert call_args[1]["error_message"] == error_message
-            assert "completed_at" in call_args[1]
-
+            call_args = mock_repo.finish_processing.call_args
+            assert call_args[0][:3] == (mock_session, sample_task.id, TaskStatus.FAILED)
+            assert call_args[1]["lease_owner"] == "w1"
+            assert call_args[1]["values"] == {"error_message": error_message}
+            mock_session.commit.assert_called_once()
+    
+    def test_fail_processing_after_lease_lost(self, mock_session, sample_task):
+        """Тест, что ошибка не записывается и зависимые задачи не трогаются без аренды."""
+        mock_session.commit = AsyncMock()
+        mock_session.rollback = AsyncMock()
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.finish_processing = AsyncMock(return_value=None)
+            mock_repo.finish_dependents = AsyncMock(return_value=0)
+            
+            service = TaskProcessingService(session=mock_session)
+            
+            assert asyncio.run(service.fail_processing(sample_task.id, "boom", lease_owner="w1")) is False
+            
+            mock_repo.finish_dependents.assert_not_called()
+            mock_session.rollback.assert_called_once()
+            mock_session.commit.assert_not_called()
+    
+    def test_complete_processing_releases_children(self, mock_session, sample_task, mock_rabbitmq_service):
+        """Тест отправки в очередь зависимых задач, дождавшихся всех родителей."""
+        ready = Mock(id=uuid4(), status=TaskStatus.PENDING)
+        scheduled = Mock(id=uuid4(), status=TaskStatus.SCHEDULED)
+        calls = []
+        mock_session.commit = AsyncMock(side_effect=lambda: calls.append("commit"))
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.finish_processing = AsyncMock(
+                side_effect=lambda *args, **kwargs: calls.append("finish") or Mock()
+            )
+            mock_repo.release_children = AsyncMock(
+                side_effect=lambda *args: calls.append("release") or [ready, scheduled]
+            )
+            
+            service = TaskProcessingService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            asyncio.run(service.complete_processing(sample_task.id, {"value": 1}))
+            
+            # Счетчики уменьшаются в транзакции завершения родителя
+            assert calls == ["finish", "release", "commit"]
+            assert mock_repo.release_children.call_args.args[1] == sample_task.id
+            mock_rabbitmq_service.send_tasks_to_queue.assert_called_once_with([(ready.id, ready.tenant_id)])
+    
+    def test_fail_processing_fails_dependents(self, mock_session, sample_task):
+        """Тест провала ожидающих зависимых задач вместе с родителем."""
+        mock_session.commit = AsyncMock()
+        
+        with patch('backend.services.task_processing_service.TaskRepository') as mock_repo:
+            mock_repo.finish_dependents = AsyncMock(return_value=2)
+            mock_repo.finish_processing = AsyncMock(return_value=Mock())
+            
+            service = TaskProcessingService(session=mock_session)
+            asyncio.run(service.fail_processing(sample_task.id, "boom"))
+            
+            args = mock_repo.finish_dependents.call_args.args
+            assert args[1] == sample_task.id
+            assert args[2] == TaskStatus.FAILED
+            assert str(sample_task.id) in args[3]
@@ -1,14 +1,31 @@
 """Unit тесты для TaskService."""
 import asyncio
+import gzip
+import json
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch
 from uuid import uuid4
 
-from backend.services.task_service import TaskService
-from backend.schemas import TaskCreate
+from backend.api.responses import FastJSONResponse
+from backend.services.task_service import TaskService, request_hash
+from backend.schemas import TaskBulkRequest, TaskCreate, TaskListResponse
 from backend.models import Task, TaskStatus, TaskPriority
-from backend.exceptions import TaskNotFoundError, TaskCannotBeCancelledError
+from backend.exceptions import (
+    InvalidTaskDependencyError,
+    IdempotencyKeyReusedError,
+    TaskNotFoundError,
+    TaskCannotBeCancelledError,
+    TaskResultUnavailableError,
+    TaskServiceError,
+)
+from backend.services.blob_store import LocalFileBlobStore
+from backend.services.task_events_service import TaskEventHub
+
+
+async def collect(chunks):
+    """Собрать асинхронный поток в bytes."""
+    return b"".join([chunk async for chunk in chunks])
 
 
 class TestTaskService:
@@ -70,7 +87,7 @@ class TestTaskService:
             
             mock_repo.create.assert_called_once()
             mock_repo.update_status.assert_called_once()
-            mock_rabbitmq_service.send_task_to_queue.assert_called_once_with(sample_task.id)
+            mock_rabbitmq_service.send_task_to_queue.assert_called_once_with(sample_task.id, task_pending.tenant_id)
             
             assert result.status == TaskStatus.PENDING
             assert result.name == task_data.name
@@ -109,6 +126,117 @@ class TestTaskService:
             mock_repo.create.assert_called_once()
             mock_repo.update_status.assert_called_once()
     
+    def test_create_scheduled_task(self, mock_session, mock_rabbitmq_service, sample_task):
+        """Тест создания задачи с run_at в будущем: без отправки в очередь."""
+        run_at = datetime.utcnow() + timedelta(hours=1)
+        task_data = TaskCreate(name="Scheduled", run_at=run_at)
+        sample_task.run_at = run_at
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.create = AsyncMock(return_value=sample_task)
+            mock_repo.update_status = AsyncMock(return_value=sample_task)
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            asyncio.run(service.create_task(task_data))
+            
+            assert mock_repo.update_status.call_args.kwargs["status"] == TaskStatus.SCHEDULED
+            mock_rabbitmq_service.send_task_to_queue.assert_not_called()
+    
+    def test_run_at_normalized_to_utc(self):
+        """Тест приведения run_at с часовым поясом к UTC."""
+        task_data = TaskCreate(name="Scheduled", run_at="2030-01-01T12:00:00+03:00")
+        
+        assert task_data.run_at == datetime(2030, 1, 1, 9, 0)
+    
+    def test_create_task_once_claims_key(self, mock_session, mock_rabbitmq_service, sample_task_pending):
+        """Тест создания задачи с новым ключом идемпотентности."""
+        task_data = TaskCreate(name="Test Task")
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo, \
+             patch('backend.services.task_service.IdempotencyRepository') as mock_keys:
+            mock_keys.claim = AsyncMock(return_value=True)
+            mock_repo.create = AsyncMock(return_value=sample_task_pending)
+            mock_repo.update_status = AsyncMock(return_value=sample_task_pending)
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            task, created = asyncio.run(service.create_task_once(task_data, "key-1"))
+            
+            assert created is True
+            assert task is sample_task_pending
+            claim = mock_keys.claim.call_args.kwargs
+            data = mock_repo.create.call_args.args[1]
+            assert claim["task_id"] == data["id"]
+            assert claim["task_created_at"] == data["created_at"]
+            assert claim["request_hash"] == request_hash(task_data)
+            mock_rabbitmq_service.send_task_to_queue.assert_called_once()
+    
+    def test_create_task_once_replays(self, mock_session, mock_rabbitmq_service, sample_task_pending):
+        """Тест повтора запроса с тем же ключом: без вставки и публикации."""
+        task_data = TaskCreate(name="Test Task")
+        record = Mock(request_hash=request_hash(task_data), task_id=sample_task_pending.id)
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo, \
+             patch('backend.services.task_service.IdempotencyRepository') as mock_keys:
+            mock_keys.claim = AsyncMock(return_value=False)
+            mock_keys.get = AsyncMock(return_value=record)
+            mock_repo.create = AsyncMock()
+            mock_repo.get_by_id = AsyncMock(return_value=sample_task_pending)
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            task, created = asyncio.run(service.create_task_once(task_data, "key-1"))
+            
+            assert created is False
+            assert task is sample_task_pending
+            # Время создания из ключа ограничивает чтение одной секцией
+            mock_repo.get_by_id.assert_called_once_with(
+                mock_session, sample_task_pending.id, created_at=record.task_created_at,
+            )
+            mock_repo.create.assert_not_called()
+            mock_rabbitmq_service.send_task_to_queue.assert_not_called()
+    
+    def test_create_task_once_key_reused(self, mock_session):
+        """Тест повторного использования ключа с другим телом запроса."""
+        record = Mock(request_hash=request_hash(TaskCreate(name="Other")))
+        
+        with patch('backend.services.task_service.IdempotencyRepository') as mock_keys:
+            mock_keys.claim = AsyncMock(return_value=False)
+            mock_keys.get = AsyncMock(return_value=record)
+            
+            service = TaskService(session=mock_session)
+            
+            with pytest.raises(IdempotencyKeyReusedError):
+                asyncio.run(service.create_task_once(TaskCreate(name="Test Task"), "key-1"))
+    
+    def test_find_replay(self, mock_session, sample_task_pending):
+        """Тест поиска задачи по действующему ключу до проверки лимитов."""
+        task_data = TaskCreate(name="Test Task")
+        record = Mock(
+            request_hash=request_hash(task_data),
+            task_id=sample_task_pending.id,
+            expires_at=datetime.utcnow() + timedelta(hours=1),
+        )
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo, \
+             patch('backend.services.task_service.IdempotencyRepository') as mock_keys:
+            mock_keys.get = AsyncMock(return_value=record)
+            mock_repo.get_by_id = AsyncMock(return_value=sample_task_pending)
+            service = TaskService(session=mock_session)
+            
+            assert asyncio.run(service.find_replay(task_data, "key-1")) is sample_task_pending
+            
+            record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+            assert asyncio.run(service.find_replay(task_data, "key-1")) is None
+            
+            mock_keys.get = AsyncMock(return_value=None)
+            assert asyncio.run(service.find_replay(task_data, "key-2")) is None
+            
+            mock_keys.get = AsyncMock(return_value=Mock(
+                request_hash=request_hash(TaskCreate(name="Other")),
+                expires_at=datetime.utcnow() + timedelta(hours=1),
+            ))
+            with pytest.raises(IdempotencyKeyReusedError):
+                asyncio.run(service.find_replay(task_data, "key-1"))
+    
     def test_get_task_by_id(self, mock_session, sample_task):
         """Тест получения задачи по ID."""
         with patch('backend.services.task_service.TaskRepository') as mock_repo:
@@ -119,7 +247,7 @@ class TestTaskService:
             result = asyncio.run(service.get_task_by_id(sample_task.id))
             
             assert result == sample_task
-            mock_repo.get_by_id.assert_called_once_with(mock_session, sample_task.id)
+            mock_repo.get_by_id.assert_called_once_with(mock_session, sample_task.id, created_at=None)
     
     def test_get_task_by_id_not_found(self, mock_session):
         """Тест получения несуществующей задачи."""
@@ -133,7 +261,7 @@ class TestTaskService:
             with pytest.raises(TaskNotFoundError):
                 asyncio.run(service.get_task_by_id(task_id))
             
-            mock_repo.get_by_id.assert_called_once_with(mock_session, task_id)
+            mock_repo.get_by_id.assert_called_once_with(mock_session, task_id, created_at=None)
     
     def test_get_tasks(self, mock_session, sample_task, sample_task_pending):
         """Тест получения списка задач."""
@@ -174,10 +302,137 @@ class TestTaskService:
                 priority=TaskPriority.MEDIUM,
                 created_from=None,
                 created_to=None,
+                result_contains=None,
+                q=None,
                 page=1,
                 page_size=10
             )
     
+    def test_get_tasks_page(self, mock_session, sample_task):
+        """Тест быстрого пути получения списка задач."""
+        row = {
+            "id": sample_task.id,
+            "name": sample_task.name,
+            "description": sample_task.description,
+            "priority": sample_task.priority,
+            "status": sample_task.status,
+            "tenant_id": sample_task.tenant_id,
+            "created_at": sample_task.created_at,
+            "run_at": None,
+            "pending_parents": 0,
+            "started_at": None,
+            "completed_at": None,
+            "result": {"value": 1},
+            "result_size": None,
+            "result_checksum": None,
+            "error_message": None,
+        }
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.get_list_rows = AsyncMock(return_value=([row], 11))
+            
+            service = TaskService(session=mock_session)
+            
+            result = asyncio.run(service.get_tasks_page(page=2, page_size=10))
+            
+            assert result["items"] == [row]
+            assert result["total"] == 11
+            assert result["page"] == 2
+            assert result["pages"] == 2
+        
+        fast_json = json.loads(FastJSONResponse(result).body)
+        legacy_json = json.loads(TaskListResponse(**result).model_dump_json())
+        assert fast_json == legacy_json
+    
+    def test_get_task_result_failed(self, mock_session, sample_task):
+        """Тест получения результата проваленной задачи."""
+        sample_task.status = TaskStatus.FAILED
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.get_by_id = AsyncMock(return_value=sample_task)
+            
+            service = TaskService(session=mock_session)
+            
+            with pytest.raises(TaskResultUnavailableError):
+                asyncio.run(service.get_task_result(sample_task.id))
+    
+    def test_wait_for_result(self, mock_session, sample_task_pending, sample_task_completed):
+        """Тест long-poll ожидания результата по событию завершения."""
+        hub = TaskEventHub(dsn="postgresql://test", channel="task_events")
+        hub._task = Mock()
+        mock_session.rollback = AsyncMock()
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.get_by_id = AsyncMock(side_effect=[sample_task_pending, sample_task_completed])
+            
+            service = TaskService(session=mock_session, event_hub=hub)
+            
+            async def run():
+                waiting = asyncio.create_task(service.wait_for_result(sample_task_pending.id, 30))
+                while not hub.waiter_count:
+                    await asyncio.sleep(0)
+                hub.dispatch(json.dumps({"id": str(sample_task_pending.id), "status": "COMPLETED"}))
+                return await asyncio.wait_for(waiting, 1)
+            
+            assert asyncio.run(run()) is sample_task_completed
+            mock_session.rollback.assert_called_once()
+            assert mock_repo.get_by_id.call_count == 2
+            assert hub.waiter_count == 0
+    
+    def test_wait_for_result_timeout(self, mock_session, sample_task_pending):
+        """Тест, что по истечении ожидания возвращается незавершенная задача."""
+        hub = TaskEventHub(dsn="postgresql://test", channel="task_events")
+        hub._task = Mock()
+        mock_session.rollback = AsyncMock()
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.get_by_id = AsyncMock(return_value=sample_task_pending)
+            
+            service = TaskService(session=mock_session, event_hub=hub)
+            task = asyncio.run(service.wait_for_result(sample_task_pending.id, 0.01))
+            
+            assert task.status == TaskStatus.PENDING
+    
+    def test_wait_for_result_without_events(self, mock_session, sample_task_pending):
+        """Тест, что без хаба событий задача читается один раз без ожидания."""
+        hub = TaskEventHub(dsn="postgresql://test", channel="task_events")
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.get_by_id = AsyncMock(return_value=sample_task_pending)
+            
+            service = TaskService(session=mock_session, event_hub=hub)
+            task = asyncio.run(asyncio.wait_for(service.wait_for_result(sample_task_pending.id, 30), 1))
+            
+            assert task is sample_task_pending
+            mock_repo.get_by_id.assert_called_once()
+            assert hub.waiter_count == 0
+    
+    def test_stream_result(self, mock_session, sample_task_completed, tmp_path):
+        """Тест потоковой выдачи результата из хранилища."""
+        payload = json.dumps({"rows": list(range(50000))}).encode()
+        store = LocalFileBlobStore(str(tmp_path))
+        asyncio.run(store.put("ab/result.json.gz", gzip.compress(payload)))
+        sample_task_completed.result_ref = "ab/result.json.gz"
+        
+        service = TaskService(session=mock_session, blob_store=store)
+        
+        async def read(compressed):
+            return await collect(
+                await service.stream_result(sample_task_completed, compressed=compressed)
+            )
+        
+        assert asyncio.run(read(False)) == payload
+        assert gzip.decompress(asyncio.run(read(True))) == payload
+    
+    def test_stream_result_missing(self, mock_session, sample_task_completed, tmp_path):
+        """Тест отсутствующего объекта результата."""
+        sample_task_completed.result_ref = "ab/missing.json.gz"
+        
+        service = TaskService(session=mock_session, blob_store=LocalFileBlobStore(str(tmp_path)))
+        
+        with pytest.raises(TaskServiceError):
+            asyncio.run(service.stream_result(sample_task_completed))
+    
     def test_cancel_task(self, mock_session, sample_task_pending):
         """Тест отмены задачи."""
         cancelled_task = Task(
@@ -191,6 +446,7 @@ class TestTaskService:
         with patch('backend.services.task_service.TaskRepository') as mock_repo:
             mock_repo.get_by_id = AsyncMock(return_value=sample_task_pending)
             mock_repo.cancel = AsyncMock(return_value=cancelled_task)
+            mock_repo.finish_dependents = AsyncMock(return_value=0)
             
             service = TaskService(session=mock_session)
             
@@ -200,6 +456,75 @@ class TestTaskService:
             mock_repo.get_by_id.assert_called_once_with(mock_session, sample_task_pending.id)
             mock_repo.cancel.assert_called_once_with(mock_session, sample_task_pending.id)
     
+    def test_cancel_task_in_progress_signals_worker(self, mock_session, mock_rabbitmq_service, sample_task):
+        """Тест сигнала отмены worker при отмене обрабатываемой задачи."""
+        sample_task.status = TaskStatus.IN_PROGRESS
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.get_by_id = AsyncMock(return_value=sample_task)
+            mock_repo.cancel = AsyncMock(return_value=sample_task)
+            mock_repo.finish_dependents = AsyncMock(return_value=0)
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            
+            asyncio.run(service.cancel_task(sample_task.id))
+            
+            mock_rabbitmq_service.send_cancellations.assert_called_once_with([sample_task.id])
+    
+    def test_bulk_cancel_by_ids(self, mock_session, mock_rabbitmq_service):
+        """Тест массовой отмены по списку ID с одним сигналом worker."""
+        mock_session.commit = AsyncMock()
+        pending, running = uuid4(), uuid4()
+        rows = [
+            Mock(id=pending, previous_status=TaskStatus.PENDING),
+            Mock(id=running, previous_status=TaskStatus.IN_PROGRESS),
+        ]
+        request = TaskBulkRequest(task_ids=[pending, running, uuid4()])
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.bulk_update_status = AsyncMock(return_value=rows)
+            mock_repo.finish_dependents_of = AsyncMock(return_value=0)
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            
+            result = asyncio.run(service.bulk_cancel(request))
+            
+            assert result == [pending, running]
+            call = mock_repo.bulk_update_status.call_args
+            assert call.args[2] == TaskStatus.CANCELLED
+            assert TaskStatus.COMPLETED not in call.args[1]
+            assert call.args[3] == 3
+            assert call.kwargs["task_ids"] == request.task_ids
+            assert mock_repo.finish_dependents_of.call_args.args[1] == [pending, running]
+            mock_session.commit.assert_called_once()
+            mock_rabbitmq_service.send_cancellations.assert_called_once_with([running])
+    
+    def test_bulk_cancel_by_filter(self, mock_session, mock_rabbitmq_service):
+        """Тест массовой отмены по фильтру: ничего не изменено — сигнала нет."""
+        mock_session.commit = AsyncMock()
+        request = TaskBulkRequest(filter={"tenant_id": "acme", "status": "PENDING"}, limit=50)
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.bulk_update_status = AsyncMock(return_value=[])
+            mock_repo.finish_dependents_of = AsyncMock()
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            
+            assert asyncio.run(service.bulk_cancel(request)) == []
+            
+            call = mock_repo.bulk_update_status.call_args
+            assert call.args[3] == 50
+            assert call.kwargs["filters"] == {"tenant_id": "acme", "status": TaskStatus.PENDING}
+            mock_repo.finish_dependents_of.assert_not_called()
+            mock_rabbitmq_service.send_cancellations.assert_not_called()
+    
+    def test_bulk_request_requires_ids_or_filter(self):
+        """Тест, что задается ровно одно из task_ids и filter."""
+        with pytest.raises(ValueError):
+            TaskBulkRequest()
+        with pytest.raises(ValueError):
+            TaskBulkRequest(task_ids=[uuid4()], filter={})
+    
     def test_cancel_task_not_found(self, mock_session):
         """Тест отмены несуществующей задачи."""
         task_id = uuid4()
@@ -242,4 +567,60 @@ class TestTaskService:
             
             with pytest.raises(TaskCannotBeCancelledError):
                 asyncio.run(service.cancel_task(failed_task.id))
-
+    
+    def test_create_task_waiting_for_parents(self, mock_session, mock_rabbitmq_service):
+        """Тест создания задачи с незавершенными родителями: WAITING без отправки в очередь."""
+        done, running = uuid4(), uuid4()
+        task_data = TaskCreate(name="Child", depends_on=[done, running, done])
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.lock_parents = AsyncMock(return_value=[
+                Mock(id=done, status=TaskStatus.COMPLETED),
+                Mock(id=running, status=TaskStatus.IN_PROGRESS),
+            ])
+            mock_repo.add_dependencies = AsyncMock()
+            mock_repo.create = AsyncMock(side_effect=lambda session, data: Task(**data))
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            task = asyncio.run(service.create_task(task_data))
+            
+            assert task.status == TaskStatus.WAITING
+            assert task.pending_parents == 1
+            mock_repo.lock_parents.assert_called_once_with(mock_session, [done, running])
+            mock_repo.add_dependencies.assert_called_once_with(
+                mock_session, task.id, task.created_at, [running]
+            )
+            mock_repo.update_status.assert_not_called()
+            mock_rabbitmq_service.send_task_to_queue.assert_not_called()
+    
+    def test_create_task_parents_completed(self, mock_session, mock_rabbitmq_service, sample_task_pending):
+        """Тест создания задачи, все родители которой уже завершены: сразу в очередь."""
+        parent = uuid4()
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.lock_parents = AsyncMock(return_value=[Mock(id=parent, status=TaskStatus.COMPLETED)])
+            mock_repo.add_dependencies = AsyncMock()
+            mock_repo.create = AsyncMock(side_effect=lambda session, data: Task(**data))
+            mock_repo.update_status = AsyncMock(return_value=sample_task_pending)
+            
+            service = TaskService(session=mock_session, rabbitmq_service=mock_rabbitmq_service)
+            asyncio.run(service.create_task(TaskCreate(name="Child", depends_on=[parent])))
+            
+            mock_repo.add_dependencies.assert_not_called()
+            assert "depends_on" not in mock_repo.create.call_args.args[1]
+            mock_rabbitmq_service.send_task_to_queue.assert_called_once_with(sample_task_pending.id, "default")
+    
+    @pytest.mark.parametrize("status", [None, TaskStatus.FAILED, TaskStatus.CANCELLED])
+    def test_create_task_invalid_parent(self, mock_session, status):
+        """Тест отказа при несуществующем, проваленном или отмененном родителе."""
+        parent = uuid4()
+        rows = [] if status is None else [Mock(id=parent, status=status)]
+        
+        with patch('backend.services.task_service.TaskRepository') as mock_repo:
+            mock_repo.lock_parents = AsyncMock(return_value=rows)
+            mock_repo.create = AsyncMock()
+            
+            service = TaskService(session=mock_session)
+            with pytest.raises(InvalidTaskDependencyError):
+                asyncio.run(service.create_task(TaskCreate(name="Child", depends_on=[parent])))
+            mock_repo.create.assert_not_called()
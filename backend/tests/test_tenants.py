@@ -0,0 +1,162 @@
+"""Unit тесты для лимитов и справедливой обработки по арендаторам."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from backend.exceptions import TenantRateLimitedError
+from backend.services.fair_dispatch import FairDispatcher
+from backend.services.rabbitmq_service import RabbitMQService
+from backend.services.rate_limit import TokenBucketLimiter
+
+
+class TestTokenBucketLimiter:
+    """Тесты для TokenBucketLimiter."""
+
+    def test_burst_then_refill(self):
+        """Тест исчерпания корзины и пополнения со временем."""
+        limiter = TokenBucketLimiter(rate=2, burst=3)
+
+        assert [limiter.acquire("a", now=0.0) for _ in range(3)] == [0, 0, 0]
+        assert limiter.acquire("a", now=0.0) == pytest.approx(0.5)
+        assert limiter.acquire("a", now=0.5) == 0
+        # Другой арендатор не затронут
+        assert limiter.acquire("b", now=0.5) == 0
+
+    def test_disabled(self):
+        """Тест, что при нулевой скорости ограничения нет."""
+        limiter = TokenBucketLimiter(rate=0, burst=1)
+
+        assert all(limiter.acquire("a", now=0.0) == 0 for _ in range(100))
+
+    def test_evicts_least_recent(self):
+        """Тест ограничения количества корзин в памяти."""
+        limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2)
+        limiter.acquire("a", now=0.0)
+        limiter.acquire("b", now=0.0)
+        limiter.acquire("c", now=0.0)
+
+        assert list(limiter._buckets) == ["b", "c"]
+
+    def test_check_raises_with_retry_after(self):
+        """Тест отказа с временем до появления токена."""
+        limiter = TokenBucketLimiter(rate=0.5, burst=1)
+        limiter.check("a")
+
+        with pytest.raises(TenantRateLimitedError) as exc_info:
+            limiter.check("a")
+        assert 0 < exc_info.value.retry_after <= 2
+
+
+class TestTenantQueues:
+    """Тесты распределения арендаторов по под-очередям."""
+
+    def test_single_queue_by_default(self):
+        """Тест, что без шардирования используется очередь по умолчанию."""
+        with patch('backend.services.rabbitmq_service.settings') as mock_settings:
+            mock_settings.rabbitmq_queue = "tasks"
+            mock_settings.task_queue_shards = 1
+            service = RabbitMQService()
+
+        assert service.queue_for("acme") == "tasks"
+        assert service.queue_names() == ["tasks"]
+
+    def test_sharded_queues(self):
+        """Тест стабильного выбора под-очереди по арендатору."""
+        with patch('backend.services.rabbitmq_service.settings') as mock_settings:
+            mock_settings.rabbitmq_queue = "tasks"
+            mock_settings.task_queue_shards = 4
+            service = RabbitMQService()
+
+        names = service.queue_names()
+        assert names == ["tasks", "tasks.0", "tasks.1", "tasks.2", "tasks.3"]
+        assert service.queue_for("acme") in names[1:]
+        assert service.queue_for("acme") == service.queue_for("acme")
+        assert service.queue_for(None) == "tasks"
+
+
+class TestFairDispatcher:
+    """Тесты для FairDispatcher."""
+
+    def test_round_robin(self):
+        """Тест чередования очередей: шумная очередь не задерживает остальные."""
+        dispatcher = FairDispatcher(handler=None, concurrency=1)
+        for number in range(5):
+            dispatcher.put("noisy", f"n{number}")
+        dispatcher.put("quiet", "q0")
+        dispatcher.put("other", "o0")
+        dispatcher.put("quiet", "q1")
+
+        order = [dispatcher.next_message() for _ in range(8)]
+
+        assert order == ["n0", "q0", "o0", "n1", "q1", "n2", "n3", "n4"]
+        assert dispatcher.pending == 0
+
+    def test_concurrency_limit(self):
+        """Тест ограничения числа одновременно обрабатываемых сообщений."""
+        active = 0
+        peak = 0
+        handled = []
+
+        async def handler(messages):
+            nonlocal active, peak
+            active += len(messages)
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            handled.extend(messages)
+            active -= len(messages)
+
+        async def run():
+            dispatcher = FairDispatcher(handler, concurrency=2)
+            dispatcher.start()
+            for number in range(6):
+                await dispatcher.consumer(f"q{number % 3}")(number)
+            while len(handled) < 6:
+                await asyncio.sleep(0.01)
+            await dispatcher.stop()
+
+        asyncio.run(run())
+
+        assert peak == 2
+        assert sorted(handled) == list(range(6))
+
+    def test_batch_limited_by_free_slots(self):
+        """Тест, что пачка не превышает batch_size и число свободных мест."""
+        batches = []
+
+        async def handler(messages):
+            batches.append(messages)
+            await asyncio.sleep(0.01)
+
+        async def run():
+            dispatcher = FairDispatcher(handler, concurrency=3, batch_size=2)
+            for number in range(4):
+                dispatcher.put(f"q{number % 2}", number)
+            dispatcher.start()
+            while sum(map(len, batches)) < 4:
+                await asyncio.sleep(0.01)
+            await dispatcher.stop()
+
+        asyncio.run(run())
+
+        assert batches == [[0, 1], [2], [3]]
+
+    def test_batch_waits_for_messages(self):
+        """Тест ожидания сообщений для неполной пачки."""
+        batches = []
+
+        async def handler(messages):
+            batches.append(messages)
+
+        async def run():
+            dispatcher = FairDispatcher(handler, concurrency=4, batch_size=4, batch_wait=0.05)
+            dispatcher.start()
+            dispatcher.put("q0", 0)
+            await asyncio.sleep(0.01)
+            dispatcher.put("q1", 1)
+            await asyncio.sleep(0.1)
+            await dispatcher.stop()
+
+        asyncio.run(run())
+
+        assert batches == [[0, 1]]
@@ -1,117 +1,292 @@
 """Worker для обработки задач из RabbitMQ."""
 import asyncio
-import json
 import logging
+import signal
+from typing import Any, Awaitable, Callable, List, Set
 from uuid import UUID
 
-import aio_pika
 from aio_pika.abc import AbstractIncomingMessage
 
 from backend.config import settings
 from backend.database import AsyncSessionLocal
 from backend.services.task_processing_service import TaskProcessingService
-from backend.exceptions import TaskNotFoundError
+from backend.exceptions import ProfilerAlreadyRunningError
+from backend.logging_config import setup_logging
+from backend.profiler import dump_profile
+from backend.services.fair_dispatch import FairDispatcher
+from backend.services.health_service import health_monitor, serve_health
+from backend.services.lease_service import create_lease_keeper, create_task_reaper
+from backend.services.partition_service import partition_maintenance_loop
+from backend.services.rabbitmq_service import rabbitmq_service
+from backend.services.recurring_service import create_recurring_scheduler
+from backend.services.scheduler_service import create_task_scheduler
+from backend.services.single_flight import SingleFlight
+from backend.services.task_messages import AckTracker, EnvelopeAck, TaskDelivery, decode_task_ids
+from backend.services.task_events_service import task_event_hub
 
 logger = logging.getLogger(__name__)
 
+task_single_flight = (
+    SingleFlight(ttl=settings.worker_dedup_cache_ttl, max_size=settings.worker_dedup_cache_size)
+    if settings.worker_dedup_enabled
+    else None
+)
 
-async def handle_message(message: AbstractIncomingMessage):
-    """Обработчик сообщения из очереди с retry логикой."""
-    max_retries = 3
-    retry_count = message.headers.get("x-retry-count", 0) if message.headers else 0
+task_leases = create_lease_keeper()
+
+
+message_acks = AckTracker()
+
+
+def task_consumer(dispatcher: FairDispatcher, queue_name: str) -> Callable[[AbstractIncomingMessage], Awaitable[None]]:
+    """
+    Callback потребителя очереди задач.
+
+    Сообщение может нести несколько задач: каждая передается в
+    dispatcher отдельно, а сообщение подтверждается после обработки
+    всех его задач.
+    """
+    async def on_message(message: AbstractIncomingMessage) -> None:
+        try:
+            task_ids = decode_task_ids(message.body)
+        except ValueError as e:
+            logger.error("Error handling message: %s", e)
+            await message.ack()
+            return
+        if not task_ids:
+            await message.ack()
+            return
+        message_acks.register(message)
+        ack = EnvelopeAck(message, len(task_ids), message_acks)
+        for task_id in task_ids:
+            dispatcher.put(queue_name, TaskDelivery(queue_name, task_id, ack))
+    return on_message
+
+
+async def process_task(task: Any) -> bool:
+    """
+    Обработать взятую в работу задачу.
+
+    Args:
+        task: Строка задачи (см. TaskRepository.claim_for_processing)
+
+    Returns:
+        True, если задачу нужно повторить
+    """
+    log_extra = {"task_id": str(task.id), "attempt": task.attempts}
+    logger.info(
+        "Processing task %s (attempt %d/%d)",
+        task.id, task.attempts, settings.task_max_attempts,
+        extra=log_extra,
+    )
     
+    task_leases.track(task.id, asyncio.current_task())
     try:
-        body = json.loads(message.body.decode())
-        task_id = UUID(body["task_id"])
-        
-        logger.info(f"Processing task {task_id} (attempt {retry_count + 1}/{max_retries + 1})")
-        
         async with AsyncSessionLocal() as session:
-            processing_service = TaskProcessingService(session)
-            
+            processing_service = TaskProcessingService(
+                session,
+                single_flight=task_single_flight,
+                rabbitmq_service=rabbitmq_service,
+            )
             try:
-                await processing_service.start_processing(task_id)
-                
-                result = await processing_service.process_task(task_id)
-                
-                await processing_service.complete_processing(task_id, result)
+                result = await processing_service.compute_result(task)
                 
-                logger.info(f"Task {task_id} completed successfully")
-                await message.ack()
-                
-            except TaskNotFoundError:
-                logger.error(f"Task {task_id} not found")
-                await message.ack()
-                return
+                if await processing_service.complete_processing(
+                    task.id, result, lease_owner=task_leases.worker_id
+                ):
+                    logger.info("Task %s completed successfully", task.id, extra=log_extra)
+                return False
+            
+            except asyncio.CancelledError:
+                if not task_leases.is_cancelled(task.id):
+                    raise
+                # Задача уже отменена в БД, статус не меняется
+                logger.info("Task %s cancelled during processing", task.id, extra=log_extra)
+                return False
                 
             except Exception as e:
-                logger.error(f"Error processing task {task_id}: {e}")
+                logger.error("Error processing task %s: %s", task.id, e, extra=log_extra)
+                await session.rollback()
                 
-                if retry_count < max_retries:
-                    logger.info(f"Retrying task {task_id} (attempt {retry_count + 1}/{max_retries})")
-                    await message.nack(requeue=True)
-                    return
+                if task.attempts < settings.task_max_attempts:
+                    logger.info(
+                        "Retrying task %s (attempt %d/%d)",
+                        task.id, task.attempts, settings.task_max_attempts,
+                        extra=log_extra,
+                    )
+                    return True
                 
                 await processing_service.fail_processing(
-                    task_id,
-                    f"Failed after {max_retries + 1} attempts: {str(e)}",
+                    task.id,
+                    f"Failed after {task.attempts} attempts: {str(e)}",
+                    lease_owner=task_leases.worker_id,
                 )
-                await message.ack()
-                
+                return False
+    
+    finally:
+        task_leases.release(task.id)
+
+
+async def handle_batch(deliveries: List[TaskDelivery]) -> None:
+    """
+    Обработчик пачки задач из очередей.
+
+    Задачи берутся в работу одним запросом и обрабатываются параллельно.
+    Задачи не в статусе PENDING (повторная доставка, отмена) пропускаются.
+    Сообщения с задачами, которые нужно повторить, возвращаются в очередь,
+    остальные подтверждаются одним basic.ack с multiple=True.
+    """
+    task_ids = list(dict.fromkeys(delivery.task_id for delivery in deliveries))
+    retry: Set[UUID] = set()
+    try:
+        async with AsyncSessionLocal() as session:
+            tasks = await TaskProcessingService(session).claim_tasks(
+                task_ids,
+                lease_owner=task_leases.worker_id,
+                lease_expires_at=task_leases.expires_at(),
+            )
     except Exception as e:
-        logger.error(f"Error handling message: {e}")
-        await message.ack()
+        logger.error("Failed to claim %d tasks: %s", len(task_ids), e)
+        tasks = []
+        retry.update(task_ids)
+    
+    claimed = {task.id for task in tasks}
+    for task_id in task_ids:
+        if task_id not in claimed and task_id not in retry:
+            logger.info("Task %s is not pending, skipping", task_id, extra={"task_id": str(task_id)})
+    
+    outcomes = await asyncio.gather(*(process_task(task) for task in tasks), return_exceptions=True)
+    for task, outcome in zip(tasks, outcomes):
+        if isinstance(outcome, BaseException):
+            # Задача остается в аренде worker: по её истечении задачу вернет в очередь TaskReaper
+            logger.error(
+                "Error handling task %s: %s", task.id, outcome,
+                extra={"task_id": str(task.id)},
+            )
+        elif outcome:
+            retry.add(task.id)
+    
+    retry_leased = [task.id for task in tasks if task.id in retry]
+    if retry_leased:
+        try:
+            async with AsyncSessionLocal() as session:
+                await TaskProcessingService(session).release_for_retry(retry_leased, task_leases.worker_id)
+        except Exception as e:
+            # Повторно доставленное сообщение будет пропущено, задачу вернет TaskReaper
+            logger.error("Failed to release %d tasks for retry: %s", len(retry_leased), e)
+    
+    for delivery in deliveries:
+        await delivery.ack.done(retry=delivery.task_id in retry)
+    await message_acks.flush()
+
+
+def dump_worker_profile() -> None:
+    """Снять профиль worker по сигналу SIGUSR1."""
+    try:
+        dump_profile("worker", settings.profiler_signal_duration)
+    except ProfilerAlreadyRunningError:
+        logger.warning("Profiler is already running, signal ignored")
 
 
 async def main():
     """Главная функция worker."""
     logger.info("Starting worker...")
     
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(
+        signal.SIGUSR1,
+        lambda: loop.run_in_executor(None, dump_worker_profile),
+    )
+    
     max_retries = 10
     retry_delay = 5
     
     for attempt in range(max_retries):
         try:
-            connection = await aio_pika.connect_robust(
-                settings.rabbitmq_url,
-                timeout=10
-            )
+            await rabbitmq_service.connect(timeout=10)
             logger.info("Connected to RabbitMQ")
             break
         except Exception as e:
             if attempt < max_retries - 1:
-                logger.warning(f"Failed to connect to RabbitMQ (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {retry_delay}s...")
+                logger.warning(
+                    "Failed to connect to RabbitMQ (attempt %d/%d): %s. Retrying in %ds...",
+                    attempt + 1, max_retries, e, retry_delay,
+                )
                 await asyncio.sleep(retry_delay)
             else:
-                logger.error(f"Failed to connect to RabbitMQ after {max_retries} attempts: {e}")
+                logger.error("Failed to connect to RabbitMQ after %d attempts: %s", max_retries, e)
                 raise
     
-    channel = await connection.channel()
+    channel = await rabbitmq_service.get_channel()
+    # prefetch на каждого потребителя: буфер одной под-очереди не вытесняет остальные;
+    # конверт несет не больше WORKER_BATCH_SIZE задач, так что в буфере очереди
+    # не больше WORKER_CONCURRENCY * WORKER_BATCH_SIZE задач
+    await channel.set_qos(prefetch_count=settings.worker_concurrency)
     
-    queue = await channel.declare_queue(
-        settings.rabbitmq_queue,
-        durable=True,
+    dispatcher = FairDispatcher(
+        handle_batch,
+        settings.worker_concurrency,
+        batch_size=settings.worker_batch_size,
+        batch_wait=settings.worker_batch_wait_ms / 1000,
     )
+    dispatcher.start()
+    queue_names = rabbitmq_service.queue_names()
+    for queue_name in queue_names:
+        queue = await channel.declare_queue(queue_name, durable=True)
+        await queue.consume(task_consumer(dispatcher, queue_name))
+    await rabbitmq_service.consume_cancellations(task_leases.cancel)
     
-    logger.info(f"Waiting for messages in queue '{settings.rabbitmq_queue}'...")
+    logger.info("Waiting for messages in queues %s...", ", ".join(queue_names))
     
-    await queue.consume(handle_message)
+    health_monitor.start()
+    task_leases.start()
+    reaper = None
+    if settings.task_reaper_enabled:
+        reaper = create_task_reaper(rabbitmq_service.send_tasks_to_queue)
+        reaper.start()
+    maintenance_task = asyncio.create_task(partition_maintenance_loop())
+    scheduler = None
+    if settings.scheduler_enabled:
+        scheduler = create_task_scheduler(rabbitmq_service.send_tasks_to_queue)
+        if settings.task_events_enabled:
+            task_event_hub.add_handler(scheduler.on_event)
+            task_event_hub.start()
+        scheduler.start()
+    recurring_scheduler = None
+    if settings.scheduler_enabled and settings.recurring_enabled:
+        # Созданные задачи отправляет в очередь планировщик отложенных задач
+        recurring_scheduler = create_recurring_scheduler()
+        recurring_scheduler.start()
+    health_server = None
+    if settings.worker_health_port:
+        health_server = await serve_health(
+            health_monitor,
+            settings.worker_health_host,
+            settings.worker_health_port,
+        )
+        logger.info("Health checks available on port %d", settings.worker_health_port)
     
     try:
         await asyncio.Future()
-    except KeyboardInterrupt:
+    finally:
         logger.info("Stopping worker...")
-        await connection.close()
+        maintenance_task.cancel()
+        await dispatcher.stop()
+        if reaper is not None:
+            await reaper.stop()
+        await task_leases.stop()
+        if recurring_scheduler is not None:
+            await recurring_scheduler.stop()
+        if scheduler is not None:
+            await scheduler.stop()
+        await task_event_hub.stop()
+        if health_server is not None:
+            health_server.close()
+        await health_monitor.stop()
+        await rabbitmq_service.disconnect()
 
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(settings.log_file),
-            logging.StreamHandler(),
-        ],
-    )
+    setup_logging()
     asyncio.run(main())
 
@@ -20,11 +20,13 @@ show_help() {
     echo "  test-cov        Запустить тесты с покрытием"
     echo "  test-docker     Запустить тесты в Docker"
     echo "  test-docker-clean  Запустить тесты в Docker с очисткой"
+    echo "  bench           Запустить бенчмарк сериализации списка задач"
     echo "  migrate         Применить миграции"
     echo "  migrate-up      Применить миграции"
     echo "  migrate-down    Откатить последнюю миграцию"
     echo "  migrate-create  Создать новую миграцию (требует MESSAGE='описание')"
     echo "  migrate-docker  Применить миграции в Docker контейнере"
+    echo "  partitions      Создать секции таблицы задач на текущий и будущие месяцы"
     echo "  shell-backend   Открыть shell в backend контейнере"
     echo "  shell-db        Открыть psql в базе данных"
     echo "  help            Показать эту справку"
@@ -107,6 +109,10 @@ cmd_test_docker_clean() {
     docker compose -f $COMPOSE_TEST_FILE down -v
 }
 
+cmd_bench() {
+    $PYTHON -m backend.benchmarks.task_list_serialization "$@"
+}
+
 cmd_migrate() {
     cmd_migrate_up
 }
@@ -132,6 +138,10 @@ cmd_migrate_docker() {
     docker compose -f $COMPOSE_FILE exec backend alembic upgrade head
 }
 
+cmd_partitions() {
+    $PYTHON -m backend.services.partition_service
+}
+
 cmd_shell_backend() {
     docker compose -f $COMPOSE_FILE exec backend /bin/bash
 }
@@ -185,6 +195,9 @@ case $COMMAND in
     test-docker-clean)
         cmd_test_docker_clean
         ;;
+    bench)
+        cmd_bench "$@"
+        ;;
     migrate)
         cmd_migrate
         ;;
@@ -200,6 +213,9 @@ case $COMMAND in
     migrate-docker)
         cmd_migrate_docker
         ;;
+    partitions)
+        cmd_partitions
+        ;;
     shell-backend)
         cmd_shell_backend
         ;;